@@ -0,0 +1,79 @@
+"""
+    Cold start of the client: the time to import sumapi.api and to create a SumAPI that logs in lazily, each measured
+    in a fresh interpreter.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 20 --max-import-ms 60      fail if the median import is slower than 60 ms
+    python benchmarks/import_time.py --importtime                       also list the slowest modules it imports
+"""
+import subprocess
+import statistics
+import argparse
+import json
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# modules a client must not load before it sends its first request
+HEAVY_MODULES = ['requests', 'urllib3', 'tqdm', 'asyncio', 'concurrent.futures', 'pandas']
+
+PROGRAM = f"""
+import time, sys, json
+start = time.perf_counter()
+import sumapi.api
+imported = time.perf_counter()
+api = sumapi.api.SumAPI(username='username', password='password', login='lazy')
+constructed = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1e3,
+    'construct_us': (constructed - imported) * 1e6,
+    'loaded': [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def run_once(*options):
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    process = subprocess.run([sys.executable, *options, '-c', PROGRAM], capture_output=True, text=True, env=environment, check=True)
+    return json.loads(process.stdout), process.stderr
+
+
+def slowest_imports(stderr, count):
+    """
+        Returns the count modules with the largest cumulative import time in the output of -X importtime.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--max-import-ms', type=float, help='fail if the median import takes longer')
+    parser.add_argument('--importtime', action='store_true', help='list the slowest imports of one run')
+    args = parser.parse_args(argv)
+
+    results = [run_once()[0] for _ in range(args.runs)]
+    import_ms = statistics.median(result['import_ms'] for result in results)
+    construct_us = statistics.median(result['construct_us'] for result in results)
+    print(f'import sumapi.api             {import_ms:>10.1f} ms')
+    print(f"SumAPI(login='lazy')          {construct_us:>10.1f} us")
+    print(f'heavy modules loaded          {", ".join(results[0]["loaded"]) or "none"}')
+
+    if args.importtime:
+        _, stderr = run_once('-X', 'importtime')
+        for microseconds, name in slowest_imports(stderr, 15):
+            print(f'{microseconds / 1000:>10.1f} ms  {name}')
+
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f'import takes {import_ms:.1f} ms, more than {args.max_import_ms:.1f} ms')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
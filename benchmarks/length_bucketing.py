@@ -0,0 +1,34 @@
+"""
+    Compares multi_request with and without sort_by_length against a local server whose latency grows with padded batch size.
+
+    python benchmarks/length_bucketing.py
+"""
+from sumapi.api import SumAPI
+from sumapi.config import URL
+from sumapi.fake_server import FakeServer, padded_latency
+import pandas as pd
+import random
+import time
+
+
+def make_data(rows, seed=0):
+    generator = random.Random(seed)
+    lengths = [generator.choice([10, 100, 1000, 10000]) for _ in range(rows)]
+    return pd.DataFrame([{'body': 'a' * length, 'model_name': 'sentiment', 'domain': 'general'} for length in lengths])
+
+
+def main(rows=2000, packet_size=100):
+    data = make_data(rows)
+    with FakeServer(latency=padded_latency()) as server:
+        URL.update(server.urls())
+        api = SumAPI(username='username', password='password')
+        for sort_by_length in (False, True):
+            start = time.perf_counter()
+            response = api.multi_request(data, packet_size=packet_size, sort_by_length=sort_by_length)
+            elapsed = time.perf_counter() - start
+            assert [row['body'] for row in response['evaluations']] == list(data['body'])
+            print(f'sort_by_length={sort_by_length}: {elapsed:.2f}s, {rows / elapsed:.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
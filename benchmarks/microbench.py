@@ -0,0 +1,206 @@
+"""
+    CPU time and memory the client spends on its own, with the network replaced by an in-process transport.
+
+    python benchmarks/microbench.py run                    print the results
+    python benchmarks/microbench.py run --save             store them as the baseline
+    python benchmarks/microbench.py compare                fail if a benchmark is more than 20% slower than the baseline
+    python benchmarks/microbench.py compare --threshold 0.1
+
+    Baselines depend on the machine, save new ones before comparing on another, and run both on a quiet machine.
+"""
+from sumapi.api import SumAPI, encode_row, encode_packet
+from sumapi.endpoints import ENDPOINTS_BY_NAME
+from unittest import mock
+from requests.adapters import BaseAdapter
+from requests.models import Response
+import pandas as pd
+import tracemalloc
+import gc
+import argparse
+import json
+import time
+import sys
+import os
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'microbench.json')
+PACKET_ROWS = 10000
+# differences smaller than these are timer and allocator noise, not regressions
+MIN_CPU_US = 0.5
+MIN_PEAK_KIB = 1.0
+
+
+class FakeTransport(BaseAdapter):
+    """
+        Answers every request in memory like the server would, so only the client's work is timed.
+    """
+    def send(self, request, **kwargs):
+        response = Response()
+        response.status_code = 200
+        response.request = request
+        response.url = request.url
+        response.headers['Content-Type'] = 'application/json'
+        if request.url.endswith('/arguments'):
+            rows = json.loads(request.body)['argList']
+            body = {'evaluations': [{'body': row['body'], 'evaluation': {'label': 'positive', 'score': 0.99}} for row in rows]}
+        else:
+            body = {'body': json.loads(request.body).get('body'), 'evaluation': {'label': 'positive', 'score': 0.99}}
+        response._content = json.dumps(body).encode('utf-8')
+        return response
+
+    def close(self):
+        pass
+
+
+def make_api():
+    with mock.patch.object(SumAPI, '_get_token', return_value={'access_token': 'token', 'token_type': 'bearer'}):
+        api = SumAPI(username='username', password='password')
+    transport = FakeTransport()
+    api.session.mount('http://', transport)
+    api.session.mount('https://', transport)
+    return api
+
+
+def make_rows(count):
+    return [{'body': f'Bu harika bir filmdi, oyuncular da çok iyiydi. {index}', 'model_name': 'sentiment', 'domain': 'general'}
+            for index in range(count)]
+
+
+def benchmarks():
+    """
+        Returns (name, setup) pairs, setup returns the function to time.
+    """
+    def build_body():
+        build = ENDPOINTS_BY_NAME['summarization'].build
+        return lambda: build('Bu harika bir filmdi.', 0.5, None, 'SumExtraction-TR')
+
+    def timeout_check():
+        api = make_api()
+        response_json = {'body': 'Bu harika bir filmdi.', 'evaluation': {'label': 'positive', 'score': 0.99}}
+        return lambda: api.timeout_check(response_json, api.headers)
+
+    def single_call():
+        api = make_api()
+        return lambda: api.sentiment_analysis('Bu harika bir filmdi.')
+
+    def encode_packet_10k():
+        records = make_rows(PACKET_ROWS)
+        return lambda: encode_packet([encode_row(record) for record in records])
+
+    def decode_packet_10k():
+        response = Response()
+        response._content = json.dumps({'evaluations': [{'body': row['body'], 'evaluation': {'label': 'positive', 'score': 0.99}}
+                                                         for row in make_rows(PACKET_ROWS)]}).encode('utf-8')
+        return lambda: response.json()
+
+    def multi_request_list_10k():
+        api = make_api()
+        rows = make_rows(PACKET_ROWS)
+        return lambda: api.multi_request(rows, packet_size=PACKET_ROWS, max_packet_bytes=1 << 30, progress=False)
+
+    def multi_request_dataframe_10k():
+        api = make_api()
+        df = pd.DataFrame(make_rows(PACKET_ROWS))
+        return lambda: api.multi_request(df, packet_size=PACKET_ROWS, max_packet_bytes=1 << 30, progress=False)
+
+    return [
+        ('build_body', build_body),
+        ('timeout_check', timeout_check),
+        ('single_call', single_call),
+        ('encode_packet_10k', encode_packet_10k),
+        ('decode_packet_10k', decode_packet_10k),
+        ('multi_request_list_10k', multi_request_list_10k),
+        ('multi_request_dataframe_10k', multi_request_dataframe_10k),
+    ]
+
+
+def measure(function, min_seconds=1.0, rounds=7):
+    """
+        Returns the CPU microseconds of one call, the best of several rounds, and the peak KiB allocated by one call.
+    """
+    function()
+    calls = 1
+    while True:
+        start = time.process_time()
+        for _ in range(calls):
+            function()
+        if time.process_time() - start >= min_seconds / rounds or calls >= 1 << 20:
+            break
+        calls *= 2
+
+    # like timeit, the garbage collector is kept from running in the middle of a round
+    best = float('inf')
+    for _ in range(rounds):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.process_time()
+            for _ in range(calls):
+                function()
+            best = min(best, (time.process_time() - start) / calls)
+        finally:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'cpu_us': best * 1e6, 'peak_kib': peak / 1024}
+
+
+def run():
+    results = {}
+    for name, setup in benchmarks():
+        results[name] = measure(setup())
+        print(f'{name:<30} {results[name]["cpu_us"]:>12.1f} us  {results[name]["peak_kib"]:>10.1f} KiB')
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+        Returns the names of benchmarks more than threshold slower, or using more than threshold more memory, than the baseline.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f'{name:<30} no baseline')
+            continue
+        cpu = result['cpu_us'] / baseline[name]['cpu_us'] - 1
+        memory = (result['peak_kib'] - baseline[name]['peak_kib']) / max(baseline[name]['peak_kib'], MIN_PEAK_KIB)
+        regressed = ((cpu > threshold and result['cpu_us'] - baseline[name]['cpu_us'] > MIN_CPU_US)
+                     or (memory > threshold and result['peak_kib'] - baseline[name]['peak_kib'] > MIN_PEAK_KIB))
+        print(f'{name:<30} cpu {cpu:>+7.1%}  memory {memory:>+7.1%}{"  REGRESSION" if regressed else ""}')
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('command', choices=['run', 'compare'])
+    parser.add_argument('--save', action='store_true', help='store the results as the baseline')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.2, help='share a benchmark may get worse by before it fails')
+    args = parser.parse_args(argv)
+
+    results = run()
+    if args.command == 'run':
+        if args.save:
+            os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+            with open(args.baseline, 'w') as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+                file.write('\n')
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
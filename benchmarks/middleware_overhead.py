@@ -0,0 +1,49 @@
+"""
+    Measures what each middleware layer adds to a request, first on the chain alone and then against a local server.
+
+    python benchmarks/middleware_overhead.py
+"""
+from sumapi.api import SumAPI
+from sumapi.config import URL
+from sumapi.fake_server import FakeServer
+from sumapi.middleware import Call, chain
+import time
+
+
+def passthrough(call, send):
+    return send(call)
+
+
+def chain_cost(layers, calls=200000):
+    send = chain([passthrough] * layers, lambda call: None)
+    call = Call(None, 'sentimentURL', None, {}, b'{}', None, None, None)
+    start = time.perf_counter()
+    for _ in range(calls):
+        send(call)
+    return (time.perf_counter() - start) / calls
+
+
+def request_cost(api, calls=500):
+    api.sentiment_analysis('warm up')
+    start = time.perf_counter()
+    for _ in range(calls):
+        api.sentiment_analysis('Bu harika bir filmdi.')
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    base = chain_cost(0)
+    for layers in (0, 1, 2, 4, 8):
+        cost = chain_cost(layers)
+        per_layer = (cost - base) / layers if layers else 0
+        print(f'chain of {layers} layers: {cost * 1e9:.0f} ns per call, {per_layer * 1e9:.0f} ns per layer')
+
+    with FakeServer() as server:
+        URL.update(server.urls())
+        for layers in (0, 8):
+            api = SumAPI(username='username', password='password', middleware=[passthrough] * layers)
+            print(f'sentiment_analysis with {layers} layers: {request_cost(api) * 1e6:.0f} us per call')
+
+
+if __name__ == '__main__':
+    main()
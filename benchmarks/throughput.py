@@ -0,0 +1,144 @@
+"""
+    End-to-end throughput of every method and of multi_request, against a fake server running in its own process
+    so the client CPU time measured here is the client's alone.
+
+    python benchmarks/throughput.py
+    python benchmarks/throughput.py --median 0.05 --sigma 0.5 --error-rate 0.01 --output throughput.json
+"""
+from sumapi.api import SumAPI
+from sumapi.config import URL, build_urls
+import sumapi.api
+from sumapi.endpoints import ENDPOINTS, REQUIRED
+from sumapi.fake_server import FakeServer, lognormal_latency
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import multiprocessing
+import argparse
+import json
+import time
+
+SAMPLE_ARGUMENTS = {
+    'text': 'Bu harika bir filmdi, oyuncular da müzikler de çok iyiydi.',
+    'categories': 'talep,şikayet,öneri',
+    'context': 'Sait Faik Abasıyanık 23 Kasım 1906 tarihinde Adapazarı\'nda doğdu.',
+    'question': 'Sait Faik nerede doğdu?',
+}
+
+
+def serve(connection, median, sigma, error_rate):
+    latency = lognormal_latency(median, sigma, seed=0) if median else None
+    server = FakeServer(latency=latency, error_rate=error_rate, seed=0).start()
+    connection.send(server.base_url)
+    connection.recv()
+    server.stop()
+
+
+@contextmanager
+def server_process(median, sigma, error_rate):
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serve, args=(child, median, sigma, error_rate), daemon=True)
+    process.start()
+    try:
+        yield parent.recv()
+    finally:
+        parent.send(None)
+        process.join()
+
+
+class Timer:
+    """
+        Middleware keeping the latency of every request except logins.
+    """
+    def __init__(self):
+        self.latencies = []
+
+    def __call__(self, call, send):
+        start = time.perf_counter()
+        response = send(call)
+        if call.key != 'tokenURL':
+            self.latencies.append(time.perf_counter() - start)
+        return response
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))] if values else float('nan')
+
+
+def measure(name, run, timer, rows=None):
+    timer.latencies.clear()
+    cpu = time.process_time()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    requests = len(timer.latencies)
+    result = {
+        'name': name,
+        'requests': requests,
+        'seconds': elapsed,
+        'requests_per_second': requests / elapsed,
+        'rows_per_second': (rows or requests) / elapsed,
+        'p50_ms': percentile(timer.latencies, 0.5) * 1000,
+        'p99_ms': percentile(timer.latencies, 0.99) * 1000,
+        'cpu_seconds': cpu,
+        'cpu_ms_per_request': cpu / max(requests, 1) * 1000,
+    }
+    print(f'{name:<48} {result["requests_per_second"]:>9.0f} req/s {result["rows_per_second"]:>9.0f} rows/s '
+          f'p50 {result["p50_ms"]:>7.1f} ms  p99 {result["p99_ms"]:>7.1f} ms  cpu {result["cpu_ms_per_request"]:>6.2f} ms/req')
+    return result
+
+
+def bench_methods(api, timer, calls, concurrencies):
+    results = []
+    for endpoint in ENDPOINTS:
+        method = getattr(api, endpoint.name)
+        arguments = [SAMPLE_ARGUMENTS[name] for name, default in endpoint.params if default is REQUIRED]
+        for concurrency in concurrencies:
+            def run():
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    list(executor.map(lambda _: method(*arguments), range(calls)))
+            results.append(measure(f'{endpoint.name} x{concurrency}', run, timer))
+    return results
+
+
+def bench_multi_request(api, timer, rows, packet_sizes, workers):
+    data = [{'body': f'{SAMPLE_ARGUMENTS["text"]} {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(rows)]
+    results = []
+    for packet_size in packet_sizes:
+        for worker_count in workers:
+            run = lambda: api.multi_request(data, packet_size=packet_size, workers=worker_count, progress=False)
+            results.append(measure(f'multi_request packet_size={packet_size} workers={worker_count}', run, timer, rows))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--median', type=float, default=0.0, help='median server seconds per request')
+    parser.add_argument('--sigma', type=float, default=0.5, help='spread of the lognormal server latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 502')
+    parser.add_argument('--retry-wait', type=float, default=0.1, help='seconds multi_request sleeps after a 502')
+    parser.add_argument('--calls', type=int, default=200, help='calls per method and concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--rows', type=int, default=10000, help='rows sent by each multi_request run')
+    parser.add_argument('--packet-sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    with server_process(args.median, args.sigma, args.error_rate) as base_url:
+        URL.update(build_urls(base_url))
+        # packets that get a 502 are retried after these sleeps, the defaults of ten minutes and more would stall the run
+        sumapi.api.RETRY_WAITS = (args.retry_wait,) * 5
+        timer = Timer()
+        api = SumAPI(username='username', password='password', pool_size=max(args.concurrency + args.workers), middleware=[timer])
+        results = bench_methods(api, timer, args.calls, args.concurrency)
+        results += bench_multi_request(api, timer, args.rows, args.packet_sizes, args.workers)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
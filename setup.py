@@ -18,5 +18,6 @@ setuptools.setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent"
     ],
-    python_requires='>=3.5.5',
+    entry_points={"console_scripts": ["sumapi=sumapi.cli:main"]},
+    python_requires='>=3.7',
     install_requires=["requests","tqdm==4.59.0"])
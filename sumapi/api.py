@@ -1,15 +1,36 @@
-import requests
-from tqdm import tqdm
 import json
 from json import JSONDecodeError
-from .config import URL
+from .config import URL, PATHS, PACKET_SIZE, MAX_PACKET_BYTES, MAX_ROW_BYTES, RETRY_WAITS, RETRY_STATUSES, ROW_ERROR_STATUSES, TIMEOUT, PACKET_TIMEOUT
 import time
+import hashlib
+import threading
+import weakref
+import os
+import sys
+from .routing import Router
+from .hedging import Hedger
+from .deadline import DeadlineExceeded, as_deadline
+from .scheduler import INTERACTIVE, BULK
+from .metrics import Metrics, ROW_BUCKETS, BYTE_BUCKETS
+from .tracing import Tracer, span
+from .middleware import Call, chain
+from .endpoints import add_methods
+from .lazy import LazyModule
+
+requests = LazyModule('requests')
+futures = LazyModule('concurrent.futures')
 
 class SumAPI:
-    def __init__(self, username, password, log=True):
+    def __init__(self, username, password, log=True, pool_size=10, base_urls=None, hedge=None, scheduler=None, metrics=None, trace=None, middleware=None, transport=None, login='now'):
         """
             In order to send requests in the API, you need to define your token in this class.
 
+            One instance can be shared by many threads. Requests go through one pool of pool_size connections,
+            and when the token expires it is renewed once and swapped in for every thread.
+
+            An instance can also be created before a fork or sent to a multiprocessing pool. Each process gets its own
+            connection pool and keeps using the token it already has, without logging in again.
+
             Parameters
             ----------
             username : str
@@ -18,32 +39,183 @@ class SumAPI:
                 Your API Password
             log: Boolean
                 If you want data about your processed data to be stored on summarify servers, you must set it to True, if you do not want it to be False.
+            pool_size: int
+                Number of connections kept open to the server. Set it to the number of threads sharing the instance.
+            base_urls: list
+                Base urls of several hosts serving the API, like a private mirror and 'https://api.summarify.io'.
+                Each request goes to the host with the lowest recent latency and moves on to the next host on connection errors.
+                A sumapi.routing.Router can be passed instead to set its options or share it between clients.
+                If None, config.URL is used.
+            hedge: Boolean or sumapi.hedging.Hedger
+                If set, a single request that is slower than 95% of recent ones is sent again, and the first answer wins.
+                At most 5% extra requests are sent. Pass a Hedger to change these numbers. multi_request is never hedged.
+            scheduler: sumapi.scheduler.Scheduler
+                If set, every request waits for a slot in it. Single requests are 'interactive' and go ahead of queued
+                multi_request packets, which are 'bulk'. A scheduler can be shared by several clients.
+            metrics: sumapi.metrics.Metrics
+                Registry the client records request counts, latencies, bytes, retries and packet sizes in, readable as
+                api.metrics.snapshot() or api.metrics.prometheus(). A new one is made if None.
+            trace: Boolean or sumapi.tracing.Tracer
+                If set, the time of every phase of a call is recorded in api.tracer, from preparing the rows to decoding
+                the response, and can be saved as a Chrome trace. Off by default.
+            middleware: list
+                Callables every request goes through, the first one outermost, like sumapi.middleware.ResponseCache().
+                Each is called with a sumapi.middleware.Call and send, the rest of the chain, and returns the response.
+            transport: sumapi.cassette.Recorder or sumapi.cassette.Player
+                Records every exchange to a cassette file, or answers requests from one without a network.
+            login: str
+                When to log in. 'now' logs in before the client is returned and raises if the login fails.
+                'lazy' logs in on the first request, 'background' starts logging in on a thread and returns at once.
+                With both, a failed login is raised by the first request, and the next one tries again.
+                requests is only imported, and the connection pool made, when the first request is sent.
 
             Examples
             --------
             from sumapi.api import SumAPI
 
             api = SumAPI(username='<your_username>, password='<your_password>', log=True)
+            api = SumAPI(username='<your_username>, password='<your_password>', base_urls=['https://mirror.example.com', 'https://api.summarify.io'])
+            api = SumAPI(username='<your_username>, password='<your_password>', login='background')
         """
         self.username = username
         self.password = password
         self.log = log
+        self.pool_size = pool_size
+        self.transport = transport
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._token = None
+        self._headers = None
+        self._token_lock = threading.Lock()
+        self.router = base_urls if base_urls is None or isinstance(base_urls, Router) else Router(base_urls)
+        self.hedger = Hedger() if hedge is True else hedge or None
+        self.scheduler = scheduler
+        self.metrics = metrics or Metrics()
+        self.tracer = Tracer() if trace is True else trace or None
+        self.middleware = list(middleware or [])
+        self._handler = chain(self.middleware, self._transport)
+
+        if login == 'now':
+            self._login()
+        elif login == 'background':
+            threading.Thread(target=self._login_quietly, name='sumapi-login', daemon=True).start()
+        elif login != 'lazy':
+            raise ValueError(f"login must be 'now', 'lazy' or 'background', not {login!r}.")
+        _instances.add(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_session'], state['_session_lock'], state['_token_lock'], state['_handler']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_connections()
+        _instances.add(self)
+
+    def _reset_connections(self):
+        """
+            Gives this process its own connection pool and token lock, the ones of the parent process must not be shared.
+        """
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._token_lock = threading.Lock()
+        if getattr(self, 'hedger', None) is not None:
+            self.hedger.reset()
+        if getattr(self, 'scheduler', None) is not None:
+            self.scheduler.reset()
+        if getattr(self, 'metrics', None) is not None:
+            self.metrics.reset()
+        if getattr(self, 'transport', None) is not None:
+            self.transport.reset()
+        if getattr(self, 'tracer', None) is not None:
+            self.tracer.reset()
+        for layer in getattr(self, 'middleware', []):
+            if hasattr(layer, 'reset'):
+                layer.reset()
+        self._handler = chain(getattr(self, 'middleware', []), self._transport)
+
+    @property
+    def session(self):
+        """
+            The requests.Session every request is sent with, made on first use.
+        """
+        session = self._session
+        if session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = make_session(self.pool_size, self.transport)
+                session = self._session
+        return session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    @property
+    def token(self):
+        """
+            The access token, logging in first if the client has not yet.
+        """
+        self._logged_in()
+        return self._token
 
+    @token.setter
+    def token(self, token):
+        self._token = token
+
+    @property
+    def headers(self):
+        """
+            Headers carrying the access token, logging in first if the client has not yet.
+        """
+        return self._logged_in()
+
+    @headers.setter
+    def headers(self, headers):
+        self._headers = headers
+
+    def _logged_in(self, deadline=None):
+        """
+            Returns the headers, logging in under the token lock if there are none yet, within deadline.
+            Threads asking at the same time wait for one login instead of each making their own.
+        """
+        headers = self._headers
+        if headers is None:
+            with self._token_lock:
+                if self._headers is None:
+                    self._login(deadline)
+                headers = self._headers
+        return headers
+
+    def _login(self, deadline=None):
         try:
-            self.token =self._get_token()['access_token']
+            token = self._get_token(deadline)['access_token']
         except KeyError:
             raise KeyError("Error with Token, Try again by checking your username and password.")
         except TypeError:
             raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
 
+        self._token = token
+        self._headers = make_headers(token)
 
-        self.headers = {
-            'accept': 'application/json',
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json'}
+    def _login_quietly(self):
+        """
+            Logs in on the background thread. An error is dropped here, the first request logs in again and raises it.
+        """
+        try:
+            self._logged_in()
+        except Exception:
+            pass
 
+    def add_middleware(self, layer):
+        """
+            Adds a middleware inside the ones already added, closest to the network.
+        """
+        self.middleware.append(layer)
+        self._handler = chain(self.middleware, self._transport)
 
-    def _get_token(self):
+    def _get_token(self, deadline=None):
         """
         Returns
         -------
@@ -60,7 +232,7 @@ class SumAPI:
         }
 
         try:
-            response = requests.post(URL["tokenURL"], data=login_data)
+            response = self._send_any('tokenURL', TIMEOUT, as_deadline(deadline), data=login_data)
             response_json = response.json()
         except JSONDecodeError:
             return response
@@ -73,491 +245,253 @@ class SumAPI:
 
         return response_json
 
-    def timeout_check(self, response_json):
-        if "detail" in response_json.keys():
-            if response_json['detail'] == 'Could not validate credentials':
-                self.headers = {
-                    'accept': 'application/json',
-                    'Authorization': f"Bearer {self._get_token()['access_token']}",
-                    'Content-Type': 'application/json'}
-                return True
-        else:
-            return False
-
-    def prepare_data(self, body=None, domain=None, categories=None, context=None, question=None, percentage=None, word_count=None, max_length=None):
-        """
-            Function to create json for queries.
-        """
-        if percentage != None or word_count != None:
-            data = {
-                'body': body,
-                'percentage': percentage,
-                'domain': domain,
-                'sentence_count': word_count
-            }
-        elif categories != None:
-            data = {
-                'body': body,
-                'categories': categories
-            }
-        elif question != None:
-            data = {
-                'context': context,
-                'question': question
-            }
-        elif max_length != None:
-            data = {
-                'body': body,
-                'domain': domain,
-                'max_length': max_length
-            }
-        elif domain != None:
-            data = {
-                'body': body,
-                'domain': domain
-            }
-
-        return data
-
-    def sentiment_analysis(self, text, domain='general'):
+    def timeout_check(self, response_json, headers=None, deadline=None):
         """
-            It makes sentiment analysis prediction for the sentences / samples you send.
+            Renews the token if the response says it has expired.
 
             Parameters
             ----------
-            text : str
-                Your sample text.
-            domain: str
-                Model Domain ['general']
+            response_json: dict
+                Response of the server.
+            headers: dict
+                Headers the request was sent with. If another thread has renewed the token since, it is not renewed again.
+            deadline: Deadline
+                Deadline of the call, logging in again must fit in it.
 
             Returns
             -------
-            dict:
-                body: str
-                    Your sample text.
-                evaluation: dict
-                    label: str
-                        Predicted label positive/negative
-                    score: float
-                        Prediction probability
-
-            Examples
-            --------
-            from sumapi.api import SumAPI
-
-            api = SumAPI(username='<your_username>', password='<your_password')
-
-            api.sentiment_analysis('Bu harika bir filmdi.', domain='general')
+            Boolean:
+                True if the request should be sent again with self.headers.
         """
-        data = self.prepare_data(body=text, domain=domain)
-
-        try:
-            response = requests.post(URL['sentimentURL'], headers=self.headers, json=data)
-            response_json = response.json()
-            if self.timeout_check(response_json) == True:
-                response = requests.post(URL['sentimentURL'], headers=self.headers, json=data)
-                response_json = response.json()
-                return response_json
-        except JSONDecodeError:
-            return response.content
-        except ConnectionError:
-            raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
-        
-
-        return response_json
+        if isinstance(response_json, dict) and response_json.get('detail') == 'Could not validate credentials':
+            self._refresh_token(headers, deadline)
+            return True
+        return False
 
-    def named_entity_recognition(self, text, domain='general'):
+    def _refresh_token(self, stale_headers=None, deadline=None):
         """
-            It makes named entitity recognition prediction for the sentences / samples you send.
-
-            Parameters
-            ----------
-            text : str
-                Your sample text.
-            domain: str
-                Model Domain ['general']
-
-            Returns
-            -------
-            dict:
-                body: str
-                    Your sample text.
-                evaluation: dict
-                    index_num: dict
-                        word: str
-                            Predicted word
-                        score: float
-                            Prediction probability
-                        entitity: str
-                            Predicted Entitity ['LOC','ORG','MISC','PERSON']
-                        index: integer
-                            The word's index in a sentence
-            Examples
-            --------
-            from sumapi.api import SumAPI
-
-            api = SumAPI(username='<your_username>', password='<your_password')
-
-            api.named_entity_recognition("GPT-3, Elon Musk ve Sam Altman tarafından kurulan OpenAI'in üzerinde birkaç yıldır çalışma yürüttüğü bir yapay zekâ teknolojisi.", domain='general')
+            Logs in again and replaces self.headers with a new dict in one assignment, so readers never see a half updated token.
+            Threads that failed with the same expired token wait on the lock and then reuse the token the first one got.
         """
-        data = self.prepare_data(body=text, domain=domain)
-        try:
-            response = requests.post(URL['nerURL'], headers=self.headers, json=data)
-            response_json = response.json()
-            if self.timeout_check(response_json) == True:
-                response = requests.post(URL['nerURL'], headers=self.headers, json=data)
-                response_json = response.json()
-                return response_json
-        except JSONDecodeError:
-            return response.content
-        except ConnectionError:
-            raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
-        
-
-        return response_json
-
-    def classification(self, text, domain='general'):
+        with self._token_lock:
+            if stale_headers is None or self._headers is stale_headers:
+                self.metrics.inc('token_refreshes_total')
+                token = self._get_token(deadline)['access_token']
+                self._token = token
+                self._headers = make_headers(token)
+            return self._headers
+
+    def _base_urls(self, key):
         """
-            It makes classification prediction for the sentences / samples you send.
-
-            Parameters
-            ----------
-            text : str
-                Your sample text.
-            domain: str
-                Model Domain ['general','finance']
-
-            Returns
-            -------
-            dict:
-                body: str
-                    Your sample text.
-                evaluation: dict
-                    label: str
-                        Predicted class / label
-                    score: float
-                        Prediction probability
-
-            Examples
-            --------
-            from sumapi.api import SumAPI
-
-            api = SumAPI(username='<your_username>', password='<your_password')
-
-            api.classification("GPT-3, Elon Musk ve Sam Altman tarafından kurulan OpenAI'in üzerinde birkaç yıldır çalışma yürüttüğü bir yapay zekâ teknolojisi", domain='general')
-            api.classification('Bankanızdan hiç memnun değilim, kredi ürününüz iyi çalışmıyor.', domain='finance')
+            Returns the hosts to try for the endpoint named key in order, [None] meaning config.URL when there is no router.
         """
-        data = self.prepare_data(body=text, domain=domain)
-
-        try:
-            response = requests.post(URL['classificationURL'], headers=self.headers, json=data)
-            response_json = response.json()
-            if self.timeout_check(response_json) == True:
-                response = requests.post(URL['classificationURL'], headers=self.headers, json=data)
-                response_json = response.json()
-                return response_json
-        except JSONDecodeError:
-            return response.content
-        except ConnectionError:
-            raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
-        
+        return [None] if self.router is None else self.router.order(key)
 
-        return response_json
-
-    def zero_shot_classification(self, text, categories):
+    def _send(self, base_url, key, timeout, deadline, priority=INTERACTIVE, headers=None, data=None):
         """
-            It makes Zero Shot Classification prediction for the sentences / samples you send.
-
-            Parameters
-            ----------
-            text : str
-                Your sample text.
-            categories: str
-                Potential labels that may your sentence / sample be
-
-            Returns
-            -------
-            dict:
-                body: str
-                    Your sample text.
-                evaluation: dict
-                    sequence: str
-                        Your sample text.
-                    labels: list
-                        Potential labels you provide as input
-                    scores: list
-                        Prediction probabilities
-                    label: str
-                        Predicted label
-            Examples
-            --------
-            from sumapi.api import SumAPI
-
-            api = SumAPI(username='<your_username>', password='<your_password')
-
-            api.zero_shot_classification('Bu nasıl bir hizmet, gerçekten rezilsiniz.', categories='talep,şikayet,öneri')
+            Posts to the endpoint named key in config.URL on one host through the middleware. Every request goes through here.
         """
-        data = self.prepare_data(body=text, categories=categories)
-
-        try:
-            response = requests.post(URL['zeroshotURL'], headers=self.headers, json=data)
-            response_json = response.json()
-            if self.timeout_check(response_json) == True:
-                response = requests.post(URL['zeroshotURL'], headers=self.headers, json=data)
-                response_json = response.json()
-                return response_json
-        except JSONDecodeError:
-            return response.content
-        except ConnectionError:
-            raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
+        return self._handler(Call(self, key, base_url, headers, data, timeout, deadline, priority))
 
-        return response_json
-
-    def offensive_lang_detection(self, text, domain='general'):
+    def _transport(self, call):
         """
-            It makes Offensive Language Detection for Text.
-
-            Parameters
-            ----------
-            text : str
-                Your sample text
-            domain: str
-                Model Domain ['general']
-
-            Returns
-            -------
-            dict:
-                body: str
-                    Your sample text.
-                evaluation: dict
-                    label: str
-                        Predicted class / label
-                    score: float
-                        Prediction probability
-            
-            Examples
-            --------
-            from sumapi.api import SumAPI
-
-            api = SumAPI(username='<your_username>', password='<your_password')
-
-            api.offensive_lang_detection("hapisten çıkarsa gideceği tek yer musalla taşı olur tüm teröristlerle birlikte geber", domain='general')
+            The end of the middleware chain. With a scheduler, it first waits for a connection slot in its priority class.
         """
-        data = self.prepare_data(body=text, domain=domain)
+        if self.scheduler is not None:
+            with span(self.tracer, 'queue', priority=call.priority):
+                self.scheduler.acquire(call.priority, call.deadline.remaining())
+            try:
+                return self._send_now(call.base_url, call.key, call.deadline.timeout(call.timeout), headers=call.headers, data=call.data)
+            finally:
+                self.scheduler.release()
+        return self._send_now(call.base_url, call.key, call.deadline.timeout(call.timeout), headers=call.headers, data=call.data)
 
+    def _send_now(self, base_url, key, timeout, **kwargs):
+        """
+            Sends the request and tells the router how the host did.
+        """
+        endpoint = PATHS[key]
+        start = time.perf_counter()
         try:
-            response = requests.post(URL['offensiveLangURL'], headers=self.headers, json=data)
-            response_json = response.json()
-            if self.timeout_check(response_json) == True:
-                response = requests.post(URL['offensiveLangURL'], headers=self.headers, json=data)
-                response_json = response.json()
-                return response_json
-        except JSONDecodeError:
-            return response.content
-        except ConnectionError:
-            raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
+            response = self.session.post(URL[key] if base_url is None else base_url + endpoint, timeout=timeout, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self.metrics.inc('requests_total', endpoint=endpoint, status='error')
+            if base_url is not None and isinstance(e, requests.exceptions.ConnectionError):
+                self.router.failed(base_url)
+            raise
+        end = time.perf_counter()
+        elapsed = end - start
+        if self.tracer is not None:
+            headers_received = start + response.elapsed.total_seconds()
+            self.tracer.add('wait', start, headers_received, endpoint=endpoint, status=response.status_code)
+            self.tracer.add('download', headers_received, end, endpoint=endpoint)
+
+        body = response.request.body or b''
+        self.metrics.inc('requests_total', endpoint=endpoint, status=str(response.status_code))
+        self.metrics.observe('request_seconds', elapsed, endpoint=endpoint)
+        self.metrics.inc('sent_bytes_total', len(body) if isinstance(body, bytes) else len(body.encode()), endpoint=endpoint)
+        self.metrics.inc('received_bytes_total', len(response.content), endpoint=endpoint)
+
+        if base_url is None:
+            return response
+        if response.status_code >= 500:
+            self.router.failed(base_url)
+        else:
+            self.router.observe(base_url, elapsed, key)
+        return response
 
-        return response_json
+    def _send_any(self, key, timeout, deadline, attempt=0, **kwargs):
+        """
+            Posts to the endpoint named key, moving on to the next host on connection errors.
+            A hedged duplicate, attempt 1, starts from the second best host.
+        """
+        base_urls = self._base_urls(key)
+        base_urls = base_urls[attempt % len(base_urls):] + base_urls[:attempt % len(base_urls)]
+        for base_url in base_urls[:-1]:
+            try:
+                return self._send(base_url, key, timeout, deadline, **kwargs)
+            except requests.exceptions.ConnectionError:
+                self.metrics.inc('retries_total', endpoint=PATHS[key], reason='failover')
+        return self._send(base_urls[-1], key, timeout, deadline, **kwargs)
 
-    def question_answering(self, context, question):
+    def _post(self, key, data, timeout=None, deadline=None):
+        """
+            Posts data to the single request endpoint named key, renewing the token once if it has expired.
         """
-            It makes Question Answering with Context.
+        return self._post_response(key, data, timeout, deadline)[1]
 
-            Parameters
-            ----------
-            context : str
-                The context for your question.
-            question: str
-                Your question.
+    def _post_response(self, key, data, timeout=None, deadline=None):
+        """
+            Same as _post, returning the response too.
 
             Returns
             -------
-            dict:
-                body: str
-                    Your question.
-                evaluation: dict
-                    scores: str
-                        Prediction probability
-                    answer: str
-                        Predicted Answer
-            Examples
-            --------
-            from sumapi.api import SumAPI
-
-            api = SumAPI(username='<your_username>', password='<your_password')
-
-            context =
-            ABASIYANIK, Sait Faik. Hikayeci (Adapazarı 23 Kasım 1906-İstanbul 11 Mayıs 1954). İlk öğrenimine Adapazarı’nda Rehber-i Terakki Mektebi’nde başladı. İki yıl kadar Adapazarı İdadisi’nde okudu. İstanbul Erkek Lisesi’nde devam ettiği orta öğrenimini Bursa Lisesi’nde tamamladı (1928). İstanbul Edebiyat Fakültesi’ne iki yıl devam ettikten sonra babasının isteği üzerine iktisat öğrenimi için İsviçre’ye gitti. Kısa süre sonra iktisat öğrenimini bırakarak Lozan’dan Grenoble’a geçti. Üç yıl başıboş bir edebiyat öğrenimi gördükten sonra babası tarafından geri çağrıldı (1933). Bir müddet Halıcıoğlu Ermeni Yetim Mektebi'nde Türkçe grup dersleri öğretmenliği yaptı. Ticarete atıldıysa da tutunamadı. Bir ay Haber gazetesinde adliye muhabirliği yaptı (1942). Babasının ölümü üzerine aileden kalan emlakin geliri ile avare bir hayata başladı. Evlenemedi. Yazları Burgaz adasındaki köşklerinde, kışları Şişli’deki apartmanlarında annesi ile beraber geçen bu fazla içkili bohem hayatı ömrünün sonuna kadar sürdü.
-
-
-            api.question_answering(context=context, question="Sait Faik nerede doğdu?")
+            tuple:
+                The response and its decoded json, or its content if the body is not json.
         """
-        data = self.prepare_data(context=context, question=question)
-
+        timeout = timeout or TIMEOUT
+        deadline = as_deadline(deadline)
+        with span(self.tracer, 'call', endpoint=PATHS[key]):
+            if self.hedger is None:
+                return self._post_once(key, data, timeout, deadline)
+            return self.hedger.run(lambda attempt: self._post_once(key, data, timeout, deadline, attempt))
+
+    def _post_once(self, key, data, timeout, deadline, attempt=0):
+        body = json.dumps(data, allow_nan=False).encode('utf-8')
         try:
-            response = requests.post(URL['questionURL'], headers=self.headers, json=data)
-            response_json = response.json()
-            if self.timeout_check(response_json) == True:
-                response = requests.post(URL['questionURL'], headers=self.headers, json=data)
+            headers = self._logged_in(deadline)
+            response = self._send_any(key, timeout, deadline, attempt, headers=headers, data=body)
+            with span(self.tracer, 'decode'):
                 response_json = response.json()
-                return response_json
+            if self.timeout_check(response_json, headers, deadline) == True:
+                self.metrics.inc('retries_total', endpoint=PATHS[key], reason='token')
+                response = self._send_any(key, timeout, deadline, attempt, headers=self._logged_in(deadline), data=body)
+                with span(self.tracer, 'decode'):
+                    response_json = response.json()
+        except requests.exceptions.Timeout:
+            deadline.remaining()
+            raise
         except JSONDecodeError:
-            return response.content
+            return response, response.content
         except ConnectionError:
             raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
 
-        return response_json
+        return response, response_json
 
-    def summarization(self, text, percentage=None, word_count=None, domain='SumExtraction-TR'):
+    def prepare_data(self, body=None, domain=None, categories=None, context=None, question=None, percentage=None, word_count=None, max_length=None):
         """
-            It makes Summarization for the sentences / samples you send.
-
-            Parameters
-            ----------
-            text : str
-                Your sample text.
-            percentage: float
-                Percentage of the text you want to summarize. It takes values between 0 and 1. 1 gives the shortest summary and 0 the longest summary.
-            domain: str
-                Model Domain ['SumAbstraction-TR', 'SumExtraction-TR', 'SumExtraction-EN', 'SumAbstraction-EN']
-                    - SumExtraction-TR: Extraction Based Summarization with Statistical Algorithms for Turkish
-                    - SumAbstraction-TR: Abstraction Based Summarization with Cutting Edge Algorithms on News Domain for Turkish
-                    - SumExtraction-EN: Extraction Based Summarization with Statistical Algorithms for English 
-                    - SumAbstraction-EN: Abstraction Based Summarization with Cutting Edge Algorithms for English
-
-            Returns
-            -------
-            dict:
-                body: str
-                    Your sample text.
-                evaluation: dict
-                    summarized_text: str
-                        Summarized Text
-                    
-
-            Examples
-            --------
-            from sumapi.api import SumAPI
-
-            api = SumAPI(username='<your_username>', password='<your_password')
-            
-            sample_text = "First of all, numerous software patches must be conducted to keep systems up to date. Cyber ​​attackers that use malware are trying to infiltrate company networks via abusing some undetected vulnerabilities within their software. According to a survey by security company Tripwire, one in three IT professionals said their company was infiltrated through an unpatched vulnerability. Thus, the validity of the patches should be constantly in check. Secondly, the devices that are connected to the network should be frequently monitored. Recognizing requests from devices that are connected to the main network is one of the most important areas of protection against malware. If the monitoring is missed, an evil ransomware gang can detect some vulnerabilities of the remote access doors. The more preferable scenario is having ethical hackers discover those potentially infected computers. Moreover, the most important data should be determined and an effective backup strategy should be implemented. It is very important to operate backups of important data to protect it against cyber attackers. If crypto ransomware enters the system and captures some devices, the data can be restored thanks to a recent backup, and the related devices can become operational in a short time. Yet, the first move of a hacker is almost always to cut access to those backups, so strong protection of those backups is also essential."
-
-            api.summarization(text=sample_text, percentage=0.5, domain='SumExtraction-TR')
-            api.summarization(text=sample_text, percentage=0.5, domain='SumAbstraction-TR')
-            api.summarization(text=sample_text, word_count=100, domain='SumExtraction-EN')
-            api.summarization(text=sample_text, word_count=100, domain='SumAbstraction-EN')
+            Function to create json for queries. The endpoint methods no longer use it, their bodies are built by
+            the compiled builders of sumapi.endpoints.
         """
-        data = self.prepare_data(body=text, domain=domain, percentage=percentage, word_count=word_count)
+        if percentage != None or word_count != None:
+            data = {
+                'body': body,
+                'percentage': percentage,
+                'domain': domain,
+                'sentence_count': word_count
+            }
+        elif categories != None:
+            data = {
+                'body': body,
+                'categories': categories
+            }
+        elif question != None:
+            data = {
+                'context': context,
+                'question': question
+            }
+        elif max_length != None:
+            data = {
+                'body': body,
+                'domain': domain,
+                'max_length': max_length
+            }
+        elif domain != None:
+            data = {
+                'body': body,
+                'domain': domain
+            }
 
-        try:
-            response = requests.post(URL['summarizationURL'], headers=self.headers, json=data)
-            response_json = response.json()
-            if self.timeout_check(response_json) == True:
-                response = requests.post(URL['summarizationURL'], headers=self.headers, json=data)
-                response_json = response.json()
-                return response_json
-        except JSONDecodeError:
-            return response.content
-        except ConnectionError:
-            raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
-        
+        return data
 
-        return response_json
-    
-    def spell_check(self, text, domain='general'):
+    def analyze(self, texts, models=('sentiment', 'classification', 'ner'), **kwargs):
         """
-            It makes spell checking for the sentences / samples you send.
+            It runs several products on every text, sending all of them together through multi_request.
 
             Parameters
             ----------
-            text : str
-                Your sample text.
-            domain: str
-                Model Domain ['general']
+            texts : list
+                Your sample texts.
+            models: list or dict
+                The products you want to run, as multi_request model names ['sentiment', 'classification', 'ner'].
+                A dict maps each model name to its domain, a list uses the 'general' domain for all.
+            kwargs:
+                Packet options passed on to multi_request, such as packet_size or sort_by_length.
 
             Returns
             -------
-            dict:
+            list:
+                One dict per text, in the order of texts.
                 body: str
                     Your sample text.
-                evaluation: dict
-                    evaluation: str
-                        Spell Checked Sentence
+                <model_name>: dict
+                    Evaluation of that model, or {'error': ...} if the server failed on it.
 
             Examples
             --------
             from sumapi.api import SumAPI
 
-            api = SumAPI(username='<your_username>', password='<your_password>')
+            api = SumAPI(username='<your_username>', password='<your_password')
 
-            api.spell_check('bu hstali cumle duzelexek gibi dutuyor.', domain='general')
+            api.analyze(['Bu harika bir filmdi.'], models=['sentiment', 'classification', 'ner'])
+            api.analyze(['Bankanızdan hiç memnun değilim.'], models={'sentiment': 'general', 'classification': 'finance'})
         """
-        data = self.prepare_data(body=text, domain=domain)
-
-        try:
-            response = requests.post(URL['spellCheckURL'], headers=self.headers, json=data)
-            response_json = response.json()
-            if self.timeout_check(response_json) == True:
-                response = requests.post(URL['spellCheckURL'], headers=self.headers, json=data)
-                response_json = response.json()
-                return response_json
-        except JSONDecodeError:
-            return response.content
-        except ConnectionError:
-            raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
-        return response_json
+        if not isinstance(models, dict):
+            models = {model_name: 'general' for model_name in models}
 
-    def next_character_prediction(self, text, domain='sumgpt-small', max_length=100):
-        """
-            It makes next character prediction for your text.
+        data = [{'body': text, 'model_name': model_name, 'domain': domain} for text in texts for model_name, domain in models.items()]
+        evaluations = iter(self.multi_request(data, **kwargs)['evaluations'])
 
-            Parameters
-            ----------
-            text : str
-                Your sample text.
-            domain: str
-                Model Domain ['sumgpt-small']
-            max_length: int
-                Parameter specifies the maximum number of tokens the text generator will produce, limiting the length of the generated text.
+        results = []
+        for text in texts:
+            result = {'body': text}
+            for model_name, evaluation in zip(models, evaluations):
+                result[model_name] = evaluation['evaluation'] if 'evaluation' in evaluation else {'error': evaluation.get('error')}
+            results.append(result)
+        return results
 
-            Returns
-            -------
-            dict:
-                body: str
-                    Your sample text.
-                evaluation: dict
-                    evaluation: str
-                        Predicted text
+    def _batch(self, texts, model_name, domain, **kwargs):
+        data = [{'body': text, 'model_name': model_name, 'domain': domain} for text in texts]
+        return self.multi_request(data, **kwargs)['evaluations']
 
-            Examples
-            --------
-            from sumapi.api import SumAPI
-
-            api = SumAPI(username='<your_username>', password='<your_password>')
-
-            api.next_character_prediction('Mustafa Kemal Atatürk', domain='general', max_length=100)
-        """
-        data = self.prepare_data(body=text, domain=domain, max_length=max_length)
-
-        try:
-            response = requests.post(URL['nextCharacterPredictionURL'], headers=self.headers, json=data)
-            response_json = response.json()
-            
-        except JSONDecodeError:
-            return response.content
-        except ConnectionError:
-            raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
-        return response_json
-
-    def multi_request(self, data, packet_size=250):
+    def multi_request(self, data, packet_size=PACKET_SIZE, max_packet_bytes=MAX_PACKET_BYTES, max_row_bytes=MAX_ROW_BYTES, sort_by_length=False, id_column=None, workers=1, progress=True, timeout=None, deadline=None, priority=BULK):
         """
             It allows you to make multiple queries to different products at the same time. We recommend this for large datasets.
 
             Parameters
             ----------
-            data : pandas.dataframe
-                Your requests dataframe, an example can be find on Examples page.
+            data : pandas.dataframe or list
+                Your requests dataframe, an example can be find on Examples page. A list of dicts with the same keys works too.
                 body: str
                     Your sample text.
                 model_name: str
@@ -567,11 +501,37 @@ class SumAPI:
                         sentiment : ['general']
                         classification: ['general', 'finance']
                         ner: ['general']
+            packet_size: int
+                Maximum number of rows sent in one packet.
+            max_packet_bytes: int
+                Maximum serialized size of one packet in bytes. Packets are closed early when the next row would exceed it.
+            max_row_bytes: int
+                Maximum serialized size of one row in bytes. Larger rows are not sent, they are returned with an error instead.
+            sort_by_length: Boolean
+                If True, rows are packed in order of body length so each packet holds rows of similar length.
+                The server pads a packet to its longest row, so this saves server time on mixed length data.
+                Evaluations are still returned in the order of data.
+            id_column: str
+                Column holding a unique id for every row. It is not sent to the server, it is returned as row_id.
+                If None, the dataframe index, or the list position, is used.
+            workers: int
+                Number of packets sent at the same time. Keep it at most pool_size.
+            progress: Boolean
+                Show a progress bar when there is more than one packet.
+            timeout: tuple
+                (connect, read) timeouts in seconds for every packet, defaults to config.PACKET_TIMEOUT.
+            deadline: float
+                Seconds the whole call may take, retries and sleeps included. Rows that could not be sent or answered
+                in time are listed with an error.
+            priority: str
+                Priority class of the packets when the client has a scheduler, 'bulk' by default.
 
             Returns
             -------
             evaluations: dict
                 Outputs of all models are listed one by one. The output may vary depending on the product you use.
+                Every output carries the row_id of its input row.
+                Rows larger than max_row_bytes, and rows the server fails on, are listed in their place as {'body': ..., 'error': ..., 'row_id': ...}.
 
 
             Examples
@@ -601,200 +561,247 @@ class SumAPI:
             api = SumAPI(username='<your_username>', password='<your_password')
 
             api.multi_request(data=df)
+            api.multi_request(data=df, packet_size=500, max_packet_bytes=1024 * 1024)
+            api.multi_request(data=df, sort_by_length=True)
         """
-        if len(data) > packet_size:
-            packet_count = int(len(data) / packet_size)
-            packet_odd = len(data) % packet_size
-            evaluations = []
-            try:
-                for packet in tqdm(range(1,packet_count+1), desc=f'Packet:'):
-                    if packet == packet_count:
-                        try:
-                            jdata = {"argList": json.loads(data[packet*packet_size-packet_size:packet*packet_size+packet_odd].to_json(orient='records'))}
-                            try:
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                if response.status_code == 502:
-                                    print('Something wrong with server, sleeping 10 mins.')
-                                    time.sleep(600)
-                                    response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                    if response.status_code == 502:
-                                        print('Something wrong with server, sleeping 20 mins.')
-                                        time.sleep(1200)
-                                        if self.timeout_check(response.json()) == True:
-                                            response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                            evaluations += response.json()['evaluations']
-                                        continue
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                                    if self.timeout_check(response.json()) == True:
-                                        response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                        evaluations += response.json()['evaluations']
-                                        continue
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                            except requests.exceptions.ConnectionError:
-                                print('Something wrong with server, sleeping 10 mins.')
-                                time.sleep(600)
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                if response.status_code == 502:
-                                        print('Something wrong with server, sleeping 20 mins.')
-                                        time.sleep(1200)
-                                        if self.timeout_check(response.json()) == True:
-                                            response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                            evaluations += response.json()['evaluations']
-                                            continue
-                                evaluations += response.json()['evaluations']
-                                continue
-                                if self.timeout_check(response.json()) == True:
-                                    response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                                evaluations += response.json()['evaluations']
-                                continue
-                            if self.timeout_check(response.json()) == True:
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                evaluations += response.json()['evaluations']
-                                continue
-                            evaluations += response.json()['evaluations']
-                        except KeyError:
-                            jdata = {"argList": json.loads(data[packet*packet_size-packet_size:packet*packet_size+packet_odd].to_json(orient='records'))}
-                            try:
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                if response.status_code == 502:
-                                    print('Something wrong with server, sleeping 10 mins.')
-                                    time.sleep(600)
-                                    response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                    if self.timeout_check(response.json()) == True:
-                                        response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                        evaluations += response.json()['evaluations']
-                                        continue
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                            except requests.exceptions.ConnectionError:
-                                print('Something wrong with server, sleeping 10 mins.')
-                                time.sleep(600)
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                if self.timeout_check(response.json()) == True:
-                                    response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                                evaluations += response.json()['evaluations']
-                                continue
-                            if self.timeout_check(response.json()) == True:
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                evaluations += response.json()['evaluations']
-                                continue
-                            evaluations += response.json()['evaluations']
-                    else:
-                        jdata = {"argList": json.loads(data[packet*packet_size-packet_size:packet*packet_size].to_json(orient='records'))}
-                        try:
-                            try:
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                if response.status_code == 502:
-                                    print('Something wrong with server, sleeping 10 mins.')
-                                    time.sleep(600)
-                                    response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                    if response.status_code == 502:
-                                        print('Something wrong with server, sleeping 20 mins.')
-                                        time.sleep(1200)
-                                        if self.timeout_check(response.json()) == True:
-                                            response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                            evaluations += response.json()['evaluations']
-                                            continue
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                                    if self.timeout_check(response.json()) == True:
-                                        response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                        evaluations += response.json()['evaluations']
-                                        continue
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                            except requests.exceptions.ConnectionError:
-                                print('Something wrong with server, sleeping 10 mins.')
-                                time.sleep(600)
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                if self.timeout_check(response.json()) == True:
-                                    response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                                evaluations += response.json()['evaluations']
-                                continue
-                            if self.timeout_check(response.json()) == True:
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                evaluations += response.json()['evaluations']
-                                continue
-                            evaluations += response.json()['evaluations']
-                        except KeyError:
-                            try:
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                if response.status_code == 502:
-                                    print('Something wrong with server, sleeping 10 mins.')
-                                    time.sleep(600)
-                                    response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                    if response.status_code == 502:
-                                        print('Something wrong with server, sleeping 20 mins.')
-                                        time.sleep(1200)
-                                        if self.timeout_check(response.json()) == True:
-                                            response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                            evaluations += response.json()['evaluations']
-                                            continue
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                                    if self.timeout_check(response.json()) == True:
-                                        response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                        evaluations += response.json()['evaluations']
-                                        continue
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                            except requests.exceptions.ConnectionError:
-                                print('Something wrong with server, sleeping 10 mins.')
-                                time.sleep(600)
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                if self.timeout_check(response.json()) == True:
-                                    response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                    evaluations += response.json()['evaluations']
-                                    continue
-                                evaluations += response.json()['evaluations']
-                                continue
-                            if self.timeout_check(response.json()) == True:
-                                response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                                evaluations += response.json()['evaluations']
-                                continue
-                            evaluations += response.json()['evaluations']
-                            
-            except JSONDecodeError:
-                return response.content
-            except ConnectionError:
-                raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
-            
-            return {'evaluations': evaluations}
+        with span(self.tracer, 'prepare', rows=len(data)):
+            if isinstance(data, list):
+                records = [dict(record) for record in data]
+                ids = list(range(len(records))) if id_column is None else [record.pop(id_column) for record in records]
+            elif id_column is None:
+                ids = data.index.tolist()
+                records = json.loads(data.to_json(orient='records'))
+            else:
+                ids = data[id_column].tolist()
+                records = json.loads(data.drop(columns=[id_column]).to_json(orient='records'))
+        if len(set(ids)) != len(ids):
+            raise ValueError("Row ids must be unique, set id_column to a column of unique values.")
+
+        with span(self.tracer, 'encode', rows=len(records)):
+            rows = [encode_row(record) for record in records]
+        evaluations = [None] * len(rows)
+
+        sendable = []
+        for index, row in enumerate(rows):
+            if len(row) > max_row_bytes:
+                evaluations[index] = {
+                    'body': records[index].get('body'),
+                    'error': f'Row is {len(row)} bytes, larger than max_row_bytes ({max_row_bytes}).',
+                    'row_id': ids[index]}
+            else:
+                sendable.append(index)
+        if sort_by_length:
+            sendable.sort(key=lambda index: len(records[index].get('body') or ''))
+
+        timeout = timeout or PACKET_TIMEOUT
+        deadline = as_deadline(deadline)
+        packets = list(packetize(sendable, [len(row) for row in rows], packet_size, max_packet_bytes))
+        from tqdm import tqdm
+        progress = tqdm(total=len(packets), desc=f'Packet:', disable=not progress or len(packets) <= 1)
+        try:
+            with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                sent = [executor.submit(self._send_rows, packet, rows, records, ids, evaluations, timeout, deadline, priority) for packet in packets]
+                try:
+                    for future in futures.as_completed(sent):
+                        future.result()
+                        progress.update()
+                finally:
+                    for future in sent:
+                        future.cancel()
+        except ConnectionError:
+            raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
+        finally:
+            progress.close()
+
+        return {'evaluations': evaluations}
+
+    def _send_rows(self, packet, rows, records, ids, evaluations, timeout=PACKET_TIMEOUT, deadline=None, priority=BULK):
+        """
+            Sends the rows of a packet and writes their evaluations by row index, tagged with their row_id.
+            Writing by index makes a resent packet overwrite its rows instead of adding them twice,
+            and lets packets finish in any order when several are sent at once.
+            If the server rejects the packet with a status a row can cause, ROW_ERROR_STATUSES, or answers without an
+            evaluation for every row, it is split in half until the failing rows are found alone, those rows get an error
+            and every other row is still evaluated. Any other error is given to every row of the packet without splitting it.
+            Rows of a packet that cannot finish before the deadline, or is still refused once every retry is spent, get
+            an error too, the other packets are not affected.
+        """
+        with span(self.tracer, 'encode', rows=len(packet)):
+            body = encode_packet([rows[index] for index in packet])
+        self.metrics.observe('packet_rows', len(packet), ROW_BUCKETS)
+        self.metrics.observe('packet_bytes', len(body), BYTE_BUCKETS)
+        try:
+            response, response_json = self._post_packet(body, timeout, deadline, priority)
+        except (DeadlineExceeded, ConnectionError) as e:
+            for index in packet:
+                evaluations[index] = {'body': records[index].get('body'), 'error': str(e), 'row_id': ids[index]}
+            return
+        error = packet_error(response, response_json, [records[index].get('body') for index in packet])
+        if error is None:
+            for index, evaluation in zip(packet, response_json['evaluations']):
+                evaluation['row_id'] = ids[index]
+                evaluations[index] = evaluation
+        elif len(packet) == 1 or (response.status_code >= 400 and response.status_code not in ROW_ERROR_STATUSES):
+            for index in packet:
+                evaluations[index] = {'body': records[index].get('body'), 'error': error, 'row_id': ids[index]}
         else:
-            try:
-                response = requests.post(URL['multirequestURL'], headers=self.headers, json={"argList":json.loads(data.to_json(orient='records'))})
-                if response.status_code == 502:
-                    print('Something wrong with server, sleeping 10 mins.')
-                    time.sleep(600)
-                    response = requests.post(URL['multirequestURL'], headers=self.headers, json={"argList":json.loads(data.to_json(orient='records'))})
-                    if response.status_code == 502:
-                        print('Something wrong with server, sleeping 20 mins.')
-                        time.sleep(1200)
-                        if self.timeout_check(response.json()) == True:
-                            response = requests.post(URL['multirequestURL'], headers=self.headers, json=jdata, timeout=3600)
-                            response_json = response.json()
-                            return response_json
-                    response_json = response.json()
-                    return response_json
-                    
-                response_json = response.json()
-                if self.timeout_check(response_json) == True:
-                    response = requests.post(URL['multirequestURL'], headers=self.headers, json={"argList":json.loads(data.to_json(orient='records'))})
-                    response_json = response.json()
-                    return response_json
-                return response_json
-            except JSONDecodeError:
-                return response.content
-            except ConnectionError:
-                raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
+            half = len(packet) // 2
+            self.metrics.inc('retries_total', endpoint=PATHS['multirequestURL'], reason='split')
+            self._send_rows(packet[:half], rows, records, ids, evaluations, timeout, deadline, priority)
+            self._send_rows(packet[half:], rows, records, ids, evaluations, timeout, deadline, priority)
+
+    def _post_packet(self, body, timeout=PACKET_TIMEOUT, deadline=None, priority=BULK, waits=None):
+        """
+            Sends one encoded packet to the multi request endpoint.
+            A host that is unavailable, or answers with one of RETRY_STATUSES, is skipped for the next one. When every host
+            is unavailable it sleeps for each of waits seconds, RETRY_WAITS if None, and tries again, then raises
+            ConnectionError. Timeouts and sleeps are cut short by the deadline.
+            Every attempt carries the same Idempotency-Key, a hash of the body, so the server can tell a retry from a new packet.
 
+            Returns
+            -------
+            tuple:
+                The response and its decoded json, which is None if the body is not json.
+        """
+        deadline = as_deadline(deadline)
+        idempotency_key = hashlib.sha256(body).hexdigest()
+        waits = list(RETRY_WAITS if waits is None else waits)
+        while True:
+            for base_url in self._base_urls('multirequestURL'):
+                headers = self._logged_in(deadline)
+                try:
+                    response = self._send(base_url, 'multirequestURL', timeout, deadline, priority, headers=dict(headers, **{'Idempotency-Key': idempotency_key}), data=body)
+                    if response.status_code not in RETRY_STATUSES:
+                        with span(self.tracer, 'decode'):
+                            response_json = decode(response)
+                        if self.timeout_check(response_json, headers, deadline) == True:
+                            self.metrics.inc('retries_total', endpoint=PATHS['multirequestURL'], reason='token')
+                            response = self._send(base_url, 'multirequestURL', timeout, deadline, priority, headers=dict(self._logged_in(deadline), **{'Idempotency-Key': idempotency_key}), data=body)
+                            with span(self.tracer, 'decode'):
+                                response_json = decode(response)
+                        return response, response_json
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    deadline.remaining()
+            self._back_off(waits, deadline)
+
+    def _back_off(self, waits, deadline):
+        """
+            Sleeps for the first of waits and removes it, or raises ConnectionError when none is left.
+        """
+        if not waits:
+            raise ConnectionError("Error with Connection, Check your Internet Connection or visit api.summarify.io/status for SumAPI Status")
+        wait = waits.pop(0)
+        print(f'Something wrong with server, sleeping {wait // 60} mins.', file=sys.stderr)
+        with span(self.tracer, 'retry-sleep', seconds=wait):
+            deadline.sleep(wait)
+        self.metrics.inc('retries_total', endpoint=PATHS['multirequestURL'], reason='unavailable')
+
+
+add_methods(SumAPI)
+
+_instances = weakref.WeakSet()
+
+
+def _after_fork():
+    for api in list(_instances):
+        api._reset_connections()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def make_session(pool_size, transport=None):
+    """
+        Returns a session whose connection pool holds pool_size connections per host, sending through transport if set.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    if transport is not None:
+        adapter = transport.adapter(adapter)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def make_headers(token):
+    return {
+        'accept': 'application/json',
+        'Authorization': f'Bearer {token}',
+        'Content-Type': 'application/json'}
+
+
+def decode(response):
+    """
+        Returns the json of a response, or None if the body is not json.
+    """
+    try:
+        return response.json()
+    except JSONDecodeError:
+        return None
+
+
+def packet_error(response, response_json, bodies):
+    """
+        Returns why a multi request packet failed, or None if every row has an evaluation.
+        Evaluations that echo a body are checked against the body sent in their place.
+    """
+    if response.status_code >= 400:
+        detail = response_json.get('detail') if isinstance(response_json, dict) else response.text[:200]
+        return f'Server returned {response.status_code}: {detail}'
+    if not isinstance(response_json, dict) or 'evaluations' not in response_json:
+        return f'Server returned no evaluations: {response.text[:200]}'
+    if len(response_json['evaluations']) != len(bodies):
+        return f'Server returned {len(response_json["evaluations"])} evaluations for {len(bodies)} rows.'
+    for body, evaluation in zip(bodies, response_json['evaluations']):
+        if isinstance(evaluation, dict) and 'body' in evaluation and evaluation['body'] != body:
+            return 'Server returned evaluations out of order.'
+    return None
+
+
+def encode_row(record):
+    """
+        Serializes one multi request row. The result is ASCII, so its length is its size in bytes.
+    """
+    return json.dumps(record, separators=(',', ':'))
+
+
+def encode_packet(rows):
+    """
+        Joins already encoded rows into a multi request body.
+    """
+    return ('{"argList":[' + ','.join(rows) + ']}').encode('utf-8')
+
+
+def packetize(indexes, sizes, packet_size, max_packet_bytes):
+    """
+        Groups row indexes into packets holding at most packet_size rows and max_packet_bytes serialized bytes.
+
+        Parameters
+        ----------
+        indexes: list
+            Row indexes in the order they should be sent.
+        sizes: list
+            Serialized size of every row, looked up by index.
+        packet_size: int
+            Maximum number of rows in a packet.
+        max_packet_bytes: int
+            Maximum size of a packet body in bytes. A row bigger than this on its own still gets a packet of its own.
 
-    
\ No newline at end of file
+        Returns
+        -------
+        generator:
+            Lists of row indexes, one list per packet.
+    """
+    packet = []
+    packet_bytes = len(encode_packet([]))
+    for index in indexes:
+        row_bytes = sizes[index] + 1
+        if packet and (len(packet) >= packet_size or packet_bytes + row_bytes > max_packet_bytes):
+            yield packet
+            packet = []
+            packet_bytes = len(encode_packet([]))
+        packet.append(index)
+        packet_bytes += row_bytes
+    if packet:
+        yield packet
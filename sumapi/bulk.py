@@ -0,0 +1,87 @@
+"""
+    Runs multi_request over very large inputs in several processes, so JSON encoding and decoding use every core.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from tqdm import tqdm
+import multiprocessing
+import tempfile
+import shutil
+import json
+import os
+
+
+def bulk_request(api, data, processes=None, shard_size=None, output=None, **kwargs):
+    """
+        Splits data into shards and runs multi_request on each shard in a pool of worker processes.
+        Every worker uses its own copy of api, with its own connections and the token api already has.
+        Workers write their evaluations to temp files as JSON lines, which are joined in input order.
+
+        Parameters
+        ----------
+        api : SumAPI
+            Your client, it is copied into every worker.
+        data : pandas.dataframe or list
+            Your requests, as for multi_request.
+        processes: int
+            Number of worker processes, defaults to the number of cores.
+        shard_size: int
+            Number of rows sent to a worker at a time, defaults to a quarter of an even split.
+        output: str
+            If set, evaluations are written to this file as JSON lines without being decoded in this process,
+            and the path is returned. Use this for the largest jobs.
+        kwargs:
+            Options passed on to multi_request in every worker, such as packet_size or id_column.
+
+        Returns
+        -------
+        evaluations: dict
+            Same as multi_request, or the output path if output is set.
+
+        Examples
+        --------
+        from sumapi.api import SumAPI
+        from sumapi.bulk import bulk_request
+
+        api = SumAPI(username='<your_username>', password='<your_password')
+
+        bulk_request(api, df, processes=8, packet_size=250)
+        bulk_request(api, df, processes=8, output='evaluations.jsonl')
+    """
+    processes = processes or os.cpu_count() or 1
+    shard_size = shard_size or max(1, -(-len(data) // (processes * 4)))
+    kwargs['progress'] = False
+
+    directory = tempfile.mkdtemp(prefix='sumapi-')
+    try:
+        shards = [(api, data[start:start + shard_size], start, os.path.join(directory, f'{start}.jsonl'), kwargs)
+                  for start in range(0, len(data), shard_size)]
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context()) as executor:
+            paths = list(tqdm(executor.map(_run_shard, shards), total=len(shards), desc=f'Shard:', disable=len(shards) <= 1))
+
+        if output is not None:
+            with open(output, 'wb') as destination:
+                for path in paths:
+                    with open(path, 'rb') as source:
+                        shutil.copyfileobj(source, destination)
+            return output
+
+        evaluations = []
+        for path in paths:
+            with open(path, encoding='utf-8') as source:
+                evaluations += [json.loads(line) for line in source]
+        return {'evaluations': evaluations}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _run_shard(shard):
+    api, data, start, path, kwargs = shard
+    evaluations = api.multi_request(data, **kwargs)['evaluations']
+    if isinstance(data, list) and kwargs.get('id_column') is None:
+        for evaluation in evaluations:
+            evaluation['row_id'] += start
+
+    with open(path, 'w', encoding='utf-8') as destination:
+        for evaluation in evaluations:
+            destination.write(json.dumps(evaluation) + '\n')
+    return path
@@ -0,0 +1,341 @@
+"""
+    Records the traffic of a client to a cassette file and plays it back without a network, for repeatable benchmarks.
+"""
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+from datetime import timedelta
+from .processlocal import ProcessLocal
+import threading
+import requests
+import atexit
+import glob
+import os
+import hashlib
+import gzip
+import json
+import time
+
+REDACTED = 'REDACTED'
+
+
+def open_cassette(path, mode):
+    """
+        Opens a cassette as text, gzipped if the path ends with .gz. Appending to a gzipped cassette adds a gzip member,
+        which reads back as one stream.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def body_hash(path, body):
+    """
+        Returns the key a request is matched by. Login bodies hold the password, so they are never hashed.
+    """
+    if body is None or path.endswith('/token'):
+        return None
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha256(body).hexdigest()
+
+
+class Recorder(ProcessLocal):
+    def __init__(self, path):
+        """
+            Appends every exchange of a client to a cassette, one JSON line each: the endpoint, a hash and the size of
+            the request body, the status, the response body and the seconds it took.
+            Request headers and login bodies are not written, and access tokens in responses are replaced by REDACTED.
+            The file is kept open, a gzipped one as a single stream, until close is called or the process exits.
+
+            A copy of the recorder in another process, forked or unpickled there, writes to a shard of its own,
+            shard_path(path, pid), and writes out every exchange at once, worker processes may exit without closing it.
+            Player reads the shards with the cassette.
+
+            Parameters
+            ----------
+            path: str
+                Cassette file, gzipped if it ends with .gz.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+            from sumapi.cassette import Recorder
+
+            with Recorder('session.jsonl.gz') as recorder:
+                api = SumAPI(username='<your_username>', password='<your_password>', transport=recorder)
+                api.multi_request(data=df)
+        """
+        self.path = path
+        self.pid = os.getpid()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _target(self):
+        """
+            Returns the file this process writes to, and whether it writes out every exchange.
+        """
+        pid = os.getpid()
+        if pid == self.pid:
+            return self.path, False
+        return shard_path(self.path, pid), True
+
+    def flush(self):
+        path, _ = self._target()
+        writer = _writers.get(path)
+        if writer is not None:
+            with writer.lock:
+                writer.file.flush()
+
+    def close(self):
+        """
+            Writes out and closes the cassette, a later exchange opens it again and appends.
+        """
+        path, _ = self._target()
+        with _writers_lock:
+            writer = _writers.pop(path, None)
+        if writer is not None:
+            with writer.lock:
+                writer.file.close()
+
+    def adapter(self, inner):
+        """
+            Returns the adapter a session mounts, sending through inner and recording what comes back.
+        """
+        return _RecordingAdapter(self, inner)
+
+    def record(self, request, response, elapsed):
+        path = urlsplit(request.url).path
+        content = response.content
+        if path.endswith('/token') and response.status_code == 200:
+            content = redact_token(content)
+        exchange = {
+            'method': request.method,
+            'path': path,
+            'request_hash': body_hash(path, request.body),
+            'request_bytes': len(request.body or b''),
+            'status': response.status_code,
+            'content_type': response.headers.get('Content-Type'),
+            'body': content.decode('utf-8', errors='replace'),
+            'elapsed': elapsed,
+        }
+        line = json.dumps(exchange, separators=(',', ':')) + '\n'
+        path, flush = self._target()
+        writer = _writer(path)
+        with writer.lock:
+            writer.file.write(line)
+            if flush:
+                writer.file.flush()
+
+
+def shard_path(path, pid):
+    """
+        Returns the file the process pid records to, like session.jsonl.1234.gz for session.jsonl.gz.
+    """
+    if path.endswith('.gz'):
+        return f'{path[:-3]}.{pid}.gz'
+    return f'{path}.{pid}'
+
+
+def shard_paths(path):
+    """
+        Returns the shards recorded next to path by other processes, ordered by pid.
+    """
+    stem, suffix = (path[:-3], '.gz') if path.endswith('.gz') else (path, '')
+    shards = {}
+    for name in glob.glob(glob.escape(stem) + '.*' + suffix):
+        pid = name[len(stem) + 1:len(name) - len(suffix)]
+        if pid.isdigit():
+            shards[int(pid)] = name
+    return [shards[pid] for pid in sorted(shards)]
+
+
+def read_exchanges(path):
+    exchanges = []
+    try:
+        with open_cassette(path, 'r') as file:
+            for line in file:
+                if line.strip():
+                    exchanges.append(json.loads(line))
+    except EOFError:
+        # a worker that exited without closing its gzipped shard leaves the stream without its end, every line is there
+        pass
+    return exchanges
+
+
+class _Writer:
+    __slots__ = ('file', 'lock')
+
+    def __init__(self, path):
+        self.file = open_cassette(path, 'a')
+        self.lock = threading.Lock()
+
+
+# one open file per cassette in this process, shared by every copy of a recorder, so a gzip stream is never interleaved
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def _writer(path):
+    writer = _writers.get(path)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(path)
+            if writer is None:
+                writer = _writers[path] = _Writer(path)
+    return writer
+
+
+def redact_token(content):
+    """
+        Returns a login response with the access token replaced by REDACTED, or just REDACTED if it is not a JSON object.
+    """
+    try:
+        token = json.loads(content)
+    except ValueError:
+        return REDACTED.encode('utf-8')
+    if not isinstance(token, dict):
+        return REDACTED.encode('utf-8')
+    return json.dumps(dict(token, access_token=REDACTED)).encode('utf-8')
+
+
+class _RecordingAdapter(BaseAdapter):
+    def __init__(self, recorder, inner):
+        super().__init__()
+        self.recorder = recorder
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = self.inner.send(request, **kwargs)
+        response.content
+        self.recorder.record(request, response, time.perf_counter() - start)
+        return response
+
+    def close(self):
+        self.inner.close()
+        self.recorder.flush()
+
+
+@atexit.register
+def _close_writers():
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        with writer.lock:
+            writer.file.close()
+
+
+def _after_fork():
+    """
+        Drops the files of the parent in a forked child. Their copies would write the parent's buffer, and a gzip
+        trailer, into its cassette when collected, so they are pointed at os.devnull first.
+    """
+    global _writers_lock
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    for writer in _writers.values():
+        os.dup2(devnull, writer.file.fileno())
+    os.close(devnull)
+    _writers.clear()
+    _writers_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+class Player(ProcessLocal):
+    PROCESS_LOCAL = ('_lock', '_by_body', '_by_path', '_used')
+
+    def __init__(self, path, speed=None):
+        """
+            Answers requests from a cassette instead of the network.
+            A request gets the next unused exchange recorded for the same endpoint and body, or for the same endpoint
+            when no body matches, so replaying the same calls with the same options gives the same responses.
+
+            Parameters
+            ----------
+            path: str
+                Cassette written by Recorder, its shards written by other processes are read after it.
+            speed: float
+                None answers at once. 1 takes as long as the recorded exchange did, 2 half as long.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+            from sumapi.cassette import Player
+
+            api = SumAPI(username='username', password='password', transport=Player('session.jsonl.gz', speed=1))
+            api.multi_request(data=df, workers=8)
+        """
+        self.path = path
+        self.speed = speed
+        self.exchanges = []
+        for cassette in ([path] if os.path.exists(path) else []) + shard_paths(path):
+            self.exchanges += read_exchanges(cassette)
+        self.reset()
+
+    def reset(self):
+        """
+            Starts again from the first exchange.
+        """
+        self._lock = threading.Lock()
+        self._by_body = defaultdict(deque)
+        self._by_path = defaultdict(deque)
+        self._used = set()
+        for index, exchange in enumerate(self.exchanges):
+            self._by_body[(exchange['path'], exchange['request_hash'])].append(index)
+            self._by_path[exchange['path']].append(index)
+
+    def adapter(self, inner):
+        """
+            Returns the adapter a session mounts, inner is not used.
+        """
+        return _ReplayAdapter(self)
+
+    def take(self, path, request_hash):
+        """
+            Returns the next unused exchange for the request, or None if there is none left.
+        """
+        with self._lock:
+            for queue in (self._by_body[(path, request_hash)], self._by_path[path]):
+                while queue:
+                    index = queue.popleft()
+                    if index not in self._used:
+                        self._used.add(index)
+                        return self.exchanges[index]
+        return None
+
+
+class _ReplayAdapter(BaseAdapter):
+    def __init__(self, player):
+        super().__init__()
+        self.player = player
+
+    def send(self, request, **kwargs):
+        path = urlsplit(request.url).path
+        exchange = self.player.take(path, body_hash(path, request.body))
+        if exchange is None:
+            raise requests.exceptions.ConnectionError(f'The cassette has no exchange left for {path}.', request=request)
+        if self.player.speed:
+            time.sleep(exchange['elapsed'] / self.player.speed)
+
+        response = Response()
+        response.status_code = exchange['status']
+        response.headers = CaseInsensitiveDict({'Content-Type': exchange['content_type'] or 'application/json'})
+        response._content = exchange['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=exchange['elapsed'])
+        return response
+
+    def close(self):
+        pass
@@ -0,0 +1,282 @@
+"""
+    The sumapi command: runs an endpoint, or mixed multi_request rows, over a JSONL or CSV file from the shell.
+
+    sumapi rows.jsonl --output evaluations.jsonl
+    sumapi reviews.csv --endpoint sentiment_analysis --concurrency 8 --packet-size 250 --output sentiment.jsonl
+    cat rows.jsonl | sumapi --rate 20 > evaluations.jsonl
+    sumapi rows.jsonl --output evaluations.jsonl --checkpoint evaluations.checkpoint   # run again to resume
+"""
+from .config import PACKET_SIZE, MAX_PACKET_BYTES
+from .endpoints import ENDPOINTS, ENDPOINTS_BY_NAME, REQUIRED
+from .lazy import LazyModule
+from collections import deque
+import argparse
+import time
+import json
+import csv
+import sys
+import os
+
+# seconds between checkpoint writes, the checkpoint is also written when the run ends or fails
+CHECKPOINT_INTERVAL = 1.0
+
+requests = LazyModule('requests')
+
+
+def read_records(file, file_format):
+    """
+        Yields the rows of a JSONL or CSV file as dicts, without reading the whole file.
+    """
+    if file_format == 'csv':
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def chunks(records, size, start=0):
+    """
+        Yields (index of the first row, rows) for groups of size rows, skipping the first start rows.
+    """
+    chunk = []
+    index = start
+    for position, record in enumerate(records):
+        if position < start:
+            continue
+        chunk.append(record)
+        if len(chunk) == size:
+            yield index, chunk
+            index += size
+            chunk = []
+    if chunk:
+        yield index, chunk
+
+
+def multi_rows(endpoint, records):
+    """
+        Turns rows for an endpoint multi_request can run into multi_request rows. 'body' may be used for 'text'.
+    """
+    domain = dict(endpoint.params)['domain']
+    return [{'body': record.get('text', record.get('body')), 'model_name': endpoint.model_name, 'domain': record.get('domain') or domain}
+            for record in records]
+
+
+def convert(value, default):
+    """
+        Turns a CSV string into the type of the default of its argument, or into a number if the default is None.
+        Raises ValueError if it is not one.
+    """
+    if not isinstance(value, str) or isinstance(default, (str, bool)) or default is REQUIRED:
+        return value
+    if isinstance(default, (int, float)):
+        return type(default)(value)
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def call_endpoint(api, endpoint, record):
+    """
+        Calls the endpoint with the fields of record named like its arguments, 'body' may be used for 'text'.
+        CSV values of number arguments are sent as numbers.
+    """
+    arguments = {}
+    for name, default in endpoint.params:
+        value = record.get(name, record.get('body') if name == 'text' else None)
+        if value not in (None, ''):
+            try:
+                arguments[name] = convert(value, default)
+            except ValueError:
+                return {'error': f'Row has a {name!r} field that is not a number: {value!r}.'}
+        elif default is REQUIRED:
+            return {'error': f'Row has no {name!r} field.'}
+    response_json = getattr(api, endpoint.name)(**arguments)
+    if isinstance(response_json, dict):
+        return response_json
+    return {'error': f'Server returned no JSON: {response_json[:200]!r}'}
+
+
+def process(api, endpoint, start, records, id_column, options):
+    """
+        Sends one chunk of rows and returns their outputs in order, each tagged with its row_id: the id_column value,
+        or the line number of the row in the input counting from 0.
+    """
+    ids = [record.pop(id_column) if id_column else start + position for position, record in enumerate(records)]
+    if endpoint is None or endpoint.model_name is not None:
+        data = records if endpoint is None else multi_rows(endpoint, records)
+        outputs = api.multi_request(data, progress=False, **options)['evaluations']
+    else:
+        outputs = [call_endpoint(api, endpoint, record) for record in records]
+    for output, row_id in zip(outputs, ids):
+        output['row_id'] = row_id
+    return outputs
+
+
+def load_checkpoint(path):
+    """
+        Returns the rows already written and the size of the output holding them, (0, 0) if there is no checkpoint.
+    """
+    if path is None or not os.path.exists(path):
+        return 0, 0
+    with open(path) as file:
+        checkpoint = json.load(file)
+    return checkpoint['rows'], checkpoint['output_bytes']
+
+
+def save_checkpoint(path, rows, output_bytes):
+    """
+        Replaces the checkpoint in one rename, so a run killed while writing it leaves the previous one.
+    """
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump({'rows': rows, 'output_bytes': output_bytes}, file)
+    os.replace(temporary, path)
+
+
+def run(api, records, output, endpoint=None, concurrency=4, packet_size=PACKET_SIZE, max_packet_bytes=MAX_PACKET_BYTES,
+        id_column=None, checkpoint=None, start=0):
+    """
+        Sends records in chunks, concurrency of them at a time, and writes every output to output as a JSON line in
+        input order as soon as the rows before it are written. At most twice concurrency chunks are held at once,
+        so memory does not grow with the input.
+
+        Parameters
+        ----------
+        api : SumAPI
+            Your client, with a pool_size of at least concurrency.
+        records: iterable
+            Rows as dicts, like the ones of read_records.
+        output: file
+            Binary file the JSON lines are written to.
+        endpoint: sumapi.endpoints.Endpoint
+            Endpoint every row is sent to. If None, rows are multi_request rows with body, model_name and domain.
+            Endpoints multi_request can run are sent in packets, others one row per request.
+        concurrency: int
+            Chunks sent at the same time.
+        packet_size: int
+            Rows in a chunk, which is sent as one multi_request packet. Endpoints sent one row per request ignore it.
+        max_packet_bytes: int
+            As for multi_request.
+        id_column: str
+            Field holding the row_id of every row, it is not sent. If None, the line number of the row is used.
+        checkpoint: str
+            File the number of rows written is kept in, with the size of output at that point.
+        start: int
+            Rows of records already written by an earlier run, they are skipped.
+
+        Returns
+        -------
+        int:
+            Number of rows written, those of the earlier run included.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    size = packet_size if endpoint is None or endpoint.model_name is not None else 1
+    options = {'packet_size': packet_size, 'max_packet_bytes': max_packet_bytes}
+    written = start
+    saved = time.monotonic()
+    pending = deque()
+
+    def write(future):
+        nonlocal written, saved
+        outputs = future.result()
+        output.write(b''.join(json.dumps(item).encode('utf-8') + b'\n' for item in outputs))
+        written += len(outputs)
+        if checkpoint is not None and time.monotonic() - saved >= CHECKPOINT_INTERVAL:
+            output.flush()
+            save_checkpoint(checkpoint, written, output.tell())
+            saved = time.monotonic()
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                for index, chunk in chunks(records, size, start):
+                    pending.append(executor.submit(process, api, endpoint, index, chunk, id_column, options))
+                    while len(pending) > 2 * concurrency or (pending and pending[0].done()):
+                        write(pending.popleft())
+                while pending:
+                    write(pending.popleft())
+            finally:
+                for future in pending:
+                    future.cancel()
+    finally:
+        output.flush()
+        if checkpoint is not None:
+            save_checkpoint(checkpoint, written, output.tell())
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='sumapi', description='Runs SumAPI over a JSONL or CSV file and writes the outputs as JSON lines.')
+    parser.add_argument('input', nargs='?', default='-', help='JSONL or CSV file, - for stdin')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help='input format, by default from the file extension, jsonl for stdin')
+    parser.add_argument('--output', default='-', help='file the JSON lines are written to, - for stdout')
+    parser.add_argument('--endpoint', choices=[endpoint.name for endpoint in ENDPOINTS],
+                        help='method every row is sent to, with fields named like its arguments. '
+                             'Without it rows are multi_request rows with body, model_name and domain.')
+    parser.add_argument('--username', default=os.environ.get('SUMAPI_USERNAME'), help='defaults to $SUMAPI_USERNAME')
+    parser.add_argument('--password', default=os.environ.get('SUMAPI_PASSWORD'), help='defaults to $SUMAPI_PASSWORD')
+    parser.add_argument('--no-log', action='store_true', help='do not let summarify store the processed data')
+    parser.add_argument('--base-url', help='host to send to instead of api.summarify.io')
+    parser.add_argument('--concurrency', type=int, default=4, help='packets or requests sent at the same time')
+    parser.add_argument('--rate', type=float, help='requests started per second at most')
+    parser.add_argument('--packet-size', type=int, default=PACKET_SIZE, help='rows in a multi_request packet')
+    parser.add_argument('--max-packet-bytes', type=int, default=MAX_PACKET_BYTES)
+    parser.add_argument('--id-column', help='field holding the row_id of every row, the line number by default')
+    parser.add_argument('--checkpoint', help='file the progress is kept in, running again with it resumes. Needs --output.')
+    args = parser.parse_args(argv)
+
+    if args.username is None or args.password is None:
+        parser.error('set --username and --password, or $SUMAPI_USERNAME and $SUMAPI_PASSWORD')
+    if args.checkpoint is not None and args.output == '-':
+        parser.error('--checkpoint needs --output, lines written to stdout after the last checkpoint cannot be taken back')
+
+    from .api import SumAPI
+    from .scheduler import Scheduler
+    scheduler = Scheduler(slots=args.concurrency, rate=args.rate) if args.rate else None
+    base_urls = None if args.base_url is None else [args.base_url.rstrip('/')]
+    # logging in before the output is opened, so a wrong password or an unreachable host leaves it as it was
+    try:
+        api = SumAPI(args.username, args.password, log=not args.no_log, pool_size=args.concurrency, base_urls=base_urls, scheduler=scheduler)
+    except (ValueError, KeyError, ConnectionError, requests.exceptions.RequestException) as e:
+        print(f'Could not log in: {e.args[0] if e.args else e}' + (' Run again with the same --checkpoint to resume.' if args.checkpoint else ''),
+              file=sys.stderr)
+        return 1
+
+    start, output_bytes = load_checkpoint(args.checkpoint)
+    file_format = args.format or ('csv' if args.input.lower().endswith('.csv') else 'jsonl')
+    source = sys.stdin if args.input == '-' else open(args.input, newline='' if file_format == 'csv' else None, encoding='utf-8')
+    if args.output == '-':
+        output = sys.stdout.buffer
+    elif start:
+        # lines written after the checkpoint are dropped and sent again
+        output = open(args.output, 'r+b')
+        output.truncate(output_bytes)
+        output.seek(output_bytes)
+    else:
+        output = open(args.output, 'wb')
+
+    began = time.perf_counter()
+    try:
+        written = run(api, read_records(source, file_format), output, ENDPOINTS_BY_NAME.get(args.endpoint), args.concurrency,
+                      args.packet_size, args.max_packet_bytes, args.id_column, args.checkpoint, start)
+    except KeyboardInterrupt:
+        print('Stopped.' + (' Run again with the same --checkpoint to resume.' if args.checkpoint else ''), file=sys.stderr)
+        return 130
+    except (ConnectionError, requests.exceptions.RequestException) as e:
+        print(f'{e}' + (' Run again with the same --checkpoint to resume.' if args.checkpoint else ''), file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout.buffer:
+            output.close()
+
+    seconds = time.perf_counter() - began
+    print(f'{written - start} rows in {seconds:.1f} s, {(written - start) / max(seconds, 1e-9):.0f} rows/s', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
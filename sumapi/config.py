@@ -1,15 +1,46 @@
 
 BASE_URL = 'https://api.summarify.io'
-URL = {
-        'tokenURL': f'{BASE_URL}/token',
-        'sentimentURL': f'{BASE_URL}/sentiment-analysis',
-        'nerURL': f'{BASE_URL}/ner',
-        'classificationURL': f'{BASE_URL}/classification',
-        'zeroshotURL': f'{BASE_URL}/zero-shot',
-        'questionURL': f'{BASE_URL}/qa',
-        'multirequestURL': f'{BASE_URL}/arguments',
-        'summarizationURL': f'{BASE_URL}/summarize',
-        'spellCheckURL': f'{BASE_URL}/spell-check',
-        'offensiveLangURL':f'{BASE_URL}/offensive-lang',
-        'nextCharacterPredictionURL': f'{BASE_URL}/next-character-prediction',
+PATHS = {
+        'tokenURL': '/token',
+        'sentimentURL': '/sentiment-analysis',
+        'nerURL': '/ner',
+        'classificationURL': '/classification',
+        'zeroshotURL': '/zero-shot',
+        'questionURL': '/qa',
+        'multirequestURL': '/arguments',
+        'summarizationURL': '/summarize',
+        'spellCheckURL': '/spell-check',
+        'offensiveLangURL': '/offensive-lang',
+        'nextCharacterPredictionURL': '/next-character-prediction',
 }
+
+
+def build_urls(base_url):
+    return {key: f'{base_url}{path}' for key, path in PATHS.items()}
+
+
+URL = build_urls(BASE_URL)
+
+# base_urls routing, HEALTH_PATH is probed on every host every PROBE_INTERVAL seconds
+HEALTH_PATH = '/'
+PROBE_INTERVAL = 10
+HOST_COOLDOWN = 30
+
+# multi_request packet limits, sizes are serialized JSON bytes
+PACKET_SIZE = 250
+MAX_PACKET_BYTES = 2 * 1024 * 1024
+MAX_ROW_BYTES = 1024 * 1024
+
+# (connect, read) timeouts in seconds, for single requests and for multi_request packets
+TIMEOUT = (10, 600)
+PACKET_TIMEOUT = (10, 3600)
+
+# seconds to sleep before each retry while the server is unavailable
+RETRY_WAITS = (600, 1200)
+
+# packets answered with these are sent again, on the next host or after a wait, the server is throttling or failing
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# packets answered with these may hold a bad row, they are split in half to find it
+ROW_ERROR_STATUSES = (400, 413, 422)
+# single requests answered with these, or a 5xx, take the account out of a SumAPIPool for a while, other errors come from the input
+ACCOUNT_ERROR_STATUSES = (401, 403, 429)
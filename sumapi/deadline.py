@@ -0,0 +1,57 @@
+"""
+    Time budgets for a whole call, including retries, token renewals and sleeps.
+"""
+import time
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    def __init__(self, seconds=None):
+        """
+            Parameters
+            ----------
+            seconds : float
+                Time budget from now. None means no deadline.
+        """
+        self.expires = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        """
+            Returns the seconds left, or None if there is no deadline. Raises DeadlineExceeded once none are left.
+        """
+        if self.expires is None:
+            return None
+        remaining = self.expires - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("The deadline passed before the request could finish.")
+        return remaining
+
+    def timeout(self, timeout):
+        """
+            Caps a (connect, read) timeout by the seconds left. A single number is used for both.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if not isinstance(timeout, (tuple, list)):
+            timeout = (timeout, timeout)
+        return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+
+    def sleep(self, seconds):
+        """
+            Sleeps, or raises DeadlineExceeded right away if the deadline would pass first.
+        """
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            raise DeadlineExceeded(f"Not enough time left to wait {seconds} seconds before retrying.")
+        time.sleep(seconds)
+
+
+def as_deadline(deadline):
+    """
+        Accepts seconds, a Deadline or None.
+    """
+    return deadline if isinstance(deadline, Deadline) else Deadline(deadline)
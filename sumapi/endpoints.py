@@ -0,0 +1,525 @@
+"""
+    The endpoints of the API as one table. The methods of SumAPI are generated from it: a plain method for each endpoint,
+    an async one, and a batch one for the endpoints multi_request can run.
+"""
+from .config import PATHS
+import functools
+
+REQUIRED = object()
+
+
+class Endpoint:
+    def __init__(self, name, key, params, payload, response, model_name=None, doc=None):
+        """
+            Parameters
+            ----------
+            name: str
+                Name of the generated method.
+            key: str
+                Name of the endpoint in config.PATHS.
+            params: tuple
+                (name, default) of every argument of the method in order, REQUIRED for arguments without a default.
+            payload: tuple
+                (field, argument) pairs, the request body sends each argument under its field name.
+            response: dict
+                Fields of the evaluation the endpoint returns and their types.
+            model_name: str
+                Model name of the endpoint in multi_request, None if multi_request cannot run it.
+            doc: str
+                Docstring of the generated method.
+        """
+        if key not in PATHS:
+            raise KeyError(f'{key} is not an endpoint in config.PATHS.')
+        self.name = name
+        self.key = key
+        self.params = params
+        self.payload = payload
+        self.response = response
+        self.model_name = model_name
+        self.doc = doc
+        self.build = compile_builder(params, payload)
+
+    def method(self):
+        """
+            Returns the method posting to the endpoint, with the arguments of params plus timeout and deadline.
+        """
+        build = self.build
+        key = self.key
+        names = ', '.join(name for name, default in self.params)
+
+        namespace = {'build': build, 'key': key}
+        exec(f'def {self.name}(self, {names}, timeout=None, deadline=None):\n'
+             f'    return self._post(key, build({names}), timeout, deadline)\n', namespace)
+        method = namespace[self.name]
+        method.__defaults__ = tuple(default for name, default in self.params if default is not REQUIRED) + (None, None)
+        method.__doc__ = self.doc
+        return method
+
+    def async_method(self):
+        """
+            Returns a coroutine method running the plain method in the event loop's thread pool.
+        """
+        name = self.name
+
+        async def method(self, *args, **kwargs):
+            # only loaded here, a caller awaiting this has imported it already
+            import asyncio
+            return await asyncio.get_running_loop().run_in_executor(None, functools.partial(getattr(self, name), *args, **kwargs))
+
+        method.__name__ = method.__qualname__ = f'{name}_async'
+        method.__doc__ = f"""
+            Same as {name}, awaitable. The request runs in the event loop's default thread pool.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+
+            api = SumAPI(username='<your_username>', password='<your_password>')
+
+            evaluation = await api.{name}_async('Bu harika bir filmdi.')
+        """
+        return method
+
+    def batch_method(self):
+        """
+            Returns the method sending a list of texts through multi_request with this endpoint's model.
+        """
+        model_name = self.model_name
+        domain = dict(self.params)['domain']
+
+        def method(self, texts, domain=domain, **kwargs):
+            return self._batch(texts, model_name, domain, **kwargs)
+
+        method.__name__ = method.__qualname__ = f'{self.name}_batch'
+        method.__doc__ = f"""
+            Same as {self.name} for a list of texts, sent in packets through multi_request.
+
+            Parameters
+            ----------
+            texts : list
+                Your sample texts.
+            domain: str
+                Model Domain, as for {self.name}.
+            kwargs:
+                Packet options passed on to multi_request, such as packet_size or sort_by_length.
+
+            Returns
+            -------
+            list:
+                One output per text, in the order of texts, shaped like the output of {self.name}.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+
+            api = SumAPI(username='<your_username>', password='<your_password')
+
+            api.{self.name}_batch(['Bu harika bir filmdi.', 'Hiç beğenmedim.'], domain='{domain}')
+        """
+        return method
+
+
+def compile_builder(params, payload):
+    """
+        Compiles a function taking the arguments of params and returning the request body as a dict.
+        The fields are fixed when the table is loaded, so building a body is one dict literal. Fields of arguments
+        that default to None are left out when they are None, as prepare_data did.
+    """
+    names = ', '.join(name for name, default in params)
+    optional = {name for name, default in params if default is None}
+    fields = ', '.join(f'{field!r}: {argument}' for field, argument in payload if argument not in optional)
+    lines = [f'def build({names}):', f'    body = {{{fields}}}']
+    for field, argument in payload:
+        if argument in optional:
+            lines += [f'    if {argument} is not None:', f'        body[{field!r}] = {argument}']
+    namespace = {}
+    exec('\n'.join(lines + ['    return body', '']), namespace)
+    return namespace['build']
+
+
+def add_methods(cls):
+    """
+        Adds the plain, async and batch method of every endpoint to cls.
+    """
+    for endpoint in ENDPOINTS:
+        setattr(cls, endpoint.name, endpoint.method())
+        setattr(cls, f'{endpoint.name}_async', endpoint.async_method())
+        if endpoint.model_name is not None:
+            setattr(cls, f'{endpoint.name}_batch', endpoint.batch_method())
+    return cls
+
+
+ENDPOINTS = [
+    Endpoint(
+        'sentiment_analysis', 'sentimentURL',
+        params=(('text', REQUIRED), ('domain', 'general')),
+        payload=(('body', 'text'), ('domain', 'domain')),
+        response={'label': str, 'score': float},
+        model_name='sentiment',
+        doc="""
+        It makes sentiment analysis prediction for the sentences / samples you send.
+
+        Parameters
+        ----------
+        text : str
+            Your sample text.
+        domain: str
+            Model Domain ['general']
+        timeout: tuple
+            (connect, read) timeouts in seconds, defaults to config.TIMEOUT.
+        deadline: float
+            Seconds the whole call may take, token renewal included. DeadlineExceeded is raised once it passes.
+
+        Returns
+        -------
+        dict:
+            body: str
+                Your sample text.
+            evaluation: dict
+                label: str
+                    Predicted label positive/negative
+                score: float
+                    Prediction probability
+
+        Examples
+        --------
+        from sumapi.api import SumAPI
+
+        api = SumAPI(username='<your_username>', password='<your_password')
+
+        api.sentiment_analysis('Bu harika bir filmdi.', domain='general')
+        """),
+    Endpoint(
+        'named_entity_recognition', 'nerURL',
+        params=(('text', REQUIRED), ('domain', 'general')),
+        payload=(('body', 'text'), ('domain', 'domain')),
+        response={'text': str, 'labels': list},
+        model_name='ner',
+        doc="""
+        It makes named entitity recognition prediction for the sentences / samples you send.
+
+        Parameters
+        ----------
+        text : str
+            Your sample text.
+        domain: str
+            Model Domain ['general']
+        timeout: tuple
+            (connect, read) timeouts in seconds, defaults to config.TIMEOUT.
+        deadline: float
+            Seconds the whole call may take, token renewal included. DeadlineExceeded is raised once it passes.
+
+        Returns
+        -------
+        dict:
+            body: str
+                Your sample text.
+            evaluation: dict
+                index_num: dict
+                    word: str
+                        Predicted word
+                    score: float
+                        Prediction probability
+                    entitity: str
+                        Predicted Entitity ['LOC','ORG','MISC','PERSON']
+                    index: integer
+                        The word's index in a sentence
+        Examples
+        --------
+        from sumapi.api import SumAPI
+
+        api = SumAPI(username='<your_username>', password='<your_password')
+
+        api.named_entity_recognition("GPT-3, Elon Musk ve Sam Altman tarafından kurulan OpenAI'in üzerinde birkaç yıldır çalışma yürüttüğü bir yapay zekâ teknolojisi.", domain='general')
+        """),
+    Endpoint(
+        'classification', 'classificationURL',
+        params=(('text', REQUIRED), ('domain', 'general')),
+        payload=(('body', 'text'), ('domain', 'domain')),
+        response={'label': str, 'score': float},
+        model_name='classification',
+        doc="""
+        It makes classification prediction for the sentences / samples you send.
+
+        Parameters
+        ----------
+        text : str
+            Your sample text.
+        domain: str
+            Model Domain ['general','finance']
+        timeout: tuple
+            (connect, read) timeouts in seconds, defaults to config.TIMEOUT.
+        deadline: float
+            Seconds the whole call may take, token renewal included. DeadlineExceeded is raised once it passes.
+
+        Returns
+        -------
+        dict:
+            body: str
+                Your sample text.
+            evaluation: dict
+                label: str
+                    Predicted class / label
+                score: float
+                    Prediction probability
+
+        Examples
+        --------
+        from sumapi.api import SumAPI
+
+        api = SumAPI(username='<your_username>', password='<your_password')
+
+        api.classification("GPT-3, Elon Musk ve Sam Altman tarafından kurulan OpenAI'in üzerinde birkaç yıldır çalışma yürüttüğü bir yapay zekâ teknolojisi", domain='general')
+        api.classification('Bankanızdan hiç memnun değilim, kredi ürününüz iyi çalışmıyor.', domain='finance')
+        """),
+    Endpoint(
+        'zero_shot_classification', 'zeroshotURL',
+        params=(('text', REQUIRED), ('categories', REQUIRED)),
+        payload=(('body', 'text'), ('categories', 'categories')),
+        response={'sequence': str, 'labels': list, 'scores': list, 'label': str},
+        model_name=None,
+        doc="""
+        It makes Zero Shot Classification prediction for the sentences / samples you send.
+
+        Parameters
+        ----------
+        text : str
+            Your sample text.
+        categories: str
+            Potential labels that may your sentence / sample be
+        timeout: tuple
+            (connect, read) timeouts in seconds, defaults to config.TIMEOUT.
+        deadline: float
+            Seconds the whole call may take, token renewal included. DeadlineExceeded is raised once it passes.
+
+        Returns
+        -------
+        dict:
+            body: str
+                Your sample text.
+            evaluation: dict
+                sequence: str
+                    Your sample text.
+                labels: list
+                    Potential labels you provide as input
+                scores: list
+                    Prediction probabilities
+                label: str
+                    Predicted label
+        Examples
+        --------
+        from sumapi.api import SumAPI
+
+        api = SumAPI(username='<your_username>', password='<your_password')
+
+        api.zero_shot_classification('Bu nasıl bir hizmet, gerçekten rezilsiniz.', categories='talep,şikayet,öneri')
+        """),
+    Endpoint(
+        'offensive_lang_detection', 'offensiveLangURL',
+        params=(('text', REQUIRED), ('domain', 'general')),
+        payload=(('body', 'text'), ('domain', 'domain')),
+        response={'label': str, 'score': float},
+        model_name=None,
+        doc="""
+        It makes Offensive Language Detection for Text.
+
+        Parameters
+        ----------
+        text : str
+            Your sample text
+        domain: str
+            Model Domain ['general']
+        timeout: tuple
+            (connect, read) timeouts in seconds, defaults to config.TIMEOUT.
+        deadline: float
+            Seconds the whole call may take, token renewal included. DeadlineExceeded is raised once it passes.
+
+        Returns
+        -------
+        dict:
+            body: str
+                Your sample text.
+            evaluation: dict
+                label: str
+                    Predicted class / label
+                score: float
+                    Prediction probability
+
+        Examples
+        --------
+        from sumapi.api import SumAPI
+
+        api = SumAPI(username='<your_username>', password='<your_password')
+
+        api.offensive_lang_detection("hapisten çıkarsa gideceği tek yer musalla taşı olur tüm teröristlerle birlikte geber", domain='general')
+        """),
+    Endpoint(
+        'question_answering', 'questionURL',
+        params=(('context', REQUIRED), ('question', REQUIRED)),
+        payload=(('context', 'context'), ('question', 'question')),
+        response={'score': float, 'answer': str},
+        model_name=None,
+        doc="""
+        It makes Question Answering with Context.
+
+        Parameters
+        ----------
+        context : str
+            The context for your question.
+        question: str
+            Your question.
+        timeout: tuple
+            (connect, read) timeouts in seconds, defaults to config.TIMEOUT.
+        deadline: float
+            Seconds the whole call may take, token renewal included. DeadlineExceeded is raised once it passes.
+
+        Returns
+        -------
+        dict:
+            body: str
+                Your question.
+            evaluation: dict
+                scores: str
+                    Prediction probability
+                answer: str
+                    Predicted Answer
+        Examples
+        --------
+        from sumapi.api import SumAPI
+
+        api = SumAPI(username='<your_username>', password='<your_password')
+
+        context =
+        ABASIYANIK, Sait Faik. Hikayeci (Adapazarı 23 Kasım 1906-İstanbul 11 Mayıs 1954). İlk öğrenimine Adapazarı’nda Rehber-i Terakki Mektebi’nde başladı. İki yıl kadar Adapazarı İdadisi’nde okudu. İstanbul Erkek Lisesi’nde devam ettiği orta öğrenimini Bursa Lisesi’nde tamamladı (1928). İstanbul Edebiyat Fakültesi’ne iki yıl devam ettikten sonra babasının isteği üzerine iktisat öğrenimi için İsviçre’ye gitti. Kısa süre sonra iktisat öğrenimini bırakarak Lozan’dan Grenoble’a geçti. Üç yıl başıboş bir edebiyat öğrenimi gördükten sonra babası tarafından geri çağrıldı (1933). Bir müddet Halıcıoğlu Ermeni Yetim Mektebi'nde Türkçe grup dersleri öğretmenliği yaptı. Ticarete atıldıysa da tutunamadı. Bir ay Haber gazetesinde adliye muhabirliği yaptı (1942). Babasının ölümü üzerine aileden kalan emlakin geliri ile avare bir hayata başladı. Evlenemedi. Yazları Burgaz adasındaki köşklerinde, kışları Şişli’deki apartmanlarında annesi ile beraber geçen bu fazla içkili bohem hayatı ömrünün sonuna kadar sürdü.
+
+
+        api.question_answering(context=context, question="Sait Faik nerede doğdu?")
+        """),
+    Endpoint(
+        'summarization', 'summarizationURL',
+        params=(('text', REQUIRED), ('percentage', None), ('word_count', None), ('domain', 'SumExtraction-TR')),
+        payload=(('body', 'text'), ('percentage', 'percentage'), ('domain', 'domain'), ('sentence_count', 'word_count')),
+        response={'summarized_text': str},
+        model_name=None,
+        doc="""
+        It makes Summarization for the sentences / samples you send.
+
+        Parameters
+        ----------
+        text : str
+            Your sample text.
+        percentage: float
+            Percentage of the text you want to summarize. It takes values between 0 and 1. 1 gives the shortest summary and 0 the longest summary.
+        domain: str
+            Model Domain ['SumAbstraction-TR', 'SumExtraction-TR', 'SumExtraction-EN', 'SumAbstraction-EN']
+                - SumExtraction-TR: Extraction Based Summarization with Statistical Algorithms for Turkish
+                - SumAbstraction-TR: Abstraction Based Summarization with Cutting Edge Algorithms on News Domain for Turkish
+                - SumExtraction-EN: Extraction Based Summarization with Statistical Algorithms for English 
+                - SumAbstraction-EN: Abstraction Based Summarization with Cutting Edge Algorithms for English
+        timeout: tuple
+            (connect, read) timeouts in seconds, defaults to config.TIMEOUT.
+        deadline: float
+            Seconds the whole call may take, token renewal included. DeadlineExceeded is raised once it passes.
+
+        Returns
+        -------
+        dict:
+            body: str
+                Your sample text.
+            evaluation: dict
+                summarized_text: str
+                    Summarized Text
+
+
+        Examples
+        --------
+        from sumapi.api import SumAPI
+
+        api = SumAPI(username='<your_username>', password='<your_password')
+
+        sample_text = "First of all, numerous software patches must be conducted to keep systems up to date. Cyber ​​attackers that use malware are trying to infiltrate company networks via abusing some undetected vulnerabilities within their software. According to a survey by security company Tripwire, one in three IT professionals said their company was infiltrated through an unpatched vulnerability. Thus, the validity of the patches should be constantly in check. Secondly, the devices that are connected to the network should be frequently monitored. Recognizing requests from devices that are connected to the main network is one of the most important areas of protection against malware. If the monitoring is missed, an evil ransomware gang can detect some vulnerabilities of the remote access doors. The more preferable scenario is having ethical hackers discover those potentially infected computers. Moreover, the most important data should be determined and an effective backup strategy should be implemented. It is very important to operate backups of important data to protect it against cyber attackers. If crypto ransomware enters the system and captures some devices, the data can be restored thanks to a recent backup, and the related devices can become operational in a short time. Yet, the first move of a hacker is almost always to cut access to those backups, so strong protection of those backups is also essential."
+
+        api.summarization(text=sample_text, percentage=0.5, domain='SumExtraction-TR')
+        api.summarization(text=sample_text, percentage=0.5, domain='SumAbstraction-TR')
+        api.summarization(text=sample_text, word_count=100, domain='SumExtraction-EN')
+        api.summarization(text=sample_text, word_count=100, domain='SumAbstraction-EN')
+        """),
+    Endpoint(
+        'spell_check', 'spellCheckURL',
+        params=(('text', REQUIRED), ('domain', 'general')),
+        payload=(('body', 'text'), ('domain', 'domain')),
+        response={'evaluation': str},
+        model_name=None,
+        doc="""
+        It makes spell checking for the sentences / samples you send.
+
+        Parameters
+        ----------
+        text : str
+            Your sample text.
+        domain: str
+            Model Domain ['general']
+        timeout: tuple
+            (connect, read) timeouts in seconds, defaults to config.TIMEOUT.
+        deadline: float
+            Seconds the whole call may take, token renewal included. DeadlineExceeded is raised once it passes.
+
+        Returns
+        -------
+        dict:
+            body: str
+                Your sample text.
+            evaluation: dict
+                evaluation: str
+                    Spell Checked Sentence
+
+        Examples
+        --------
+        from sumapi.api import SumAPI
+
+        api = SumAPI(username='<your_username>', password='<your_password>')
+
+        api.spell_check('bu hstali cumle duzelexek gibi dutuyor.', domain='general')
+        """),
+    Endpoint(
+        'next_character_prediction', 'nextCharacterPredictionURL',
+        params=(('text', REQUIRED), ('domain', 'sumgpt-small'), ('max_length', 100)),
+        payload=(('body', 'text'), ('domain', 'domain'), ('max_length', 'max_length')),
+        response={'generated_text': str},
+        model_name=None,
+        doc="""
+        It makes next character prediction for your text.
+
+        Parameters
+        ----------
+        text : str
+            Your sample text.
+        domain: str
+            Model Domain ['sumgpt-small']
+        max_length: int
+            Parameter specifies the maximum number of tokens the text generator will produce, limiting the length of the generated text.
+        timeout: tuple
+            (connect, read) timeouts in seconds, defaults to config.TIMEOUT.
+        deadline: float
+            Seconds the whole call may take, token renewal included. DeadlineExceeded is raised once it passes.
+
+        Returns
+        -------
+        dict:
+            body: str
+                Your sample text.
+            evaluation: dict
+                evaluation: str
+                    Predicted text
+
+        Examples
+        --------
+        from sumapi.api import SumAPI
+
+        api = SumAPI(username='<your_username>', password='<your_password>')
+
+        api.next_character_prediction('Mustafa Kemal Atatürk', domain='general', max_length=100)
+        """),
+]
+
+ENDPOINTS_BY_NAME = {endpoint.name: endpoint for endpoint in ENDPOINTS}
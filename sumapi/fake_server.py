@@ -0,0 +1,307 @@
+"""
+    A local stand-in for the SumAPI server, for tests and benchmarks that must not touch api.summarify.io.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from .config import URL, PATHS, build_urls
+from .endpoints import ENDPOINTS
+from unittest import mock
+import threading
+import argparse
+import unittest
+import random
+import json
+import math
+import time
+
+
+def padded_latency(base=0.005, per_char=2e-7):
+    """
+        Latency model of a server that pads every row of a batch to the longest one.
+
+        Parameters
+        ----------
+        base: float
+            Fixed seconds spent on every request.
+        per_char: float
+            Seconds spent per padded character.
+
+        Returns
+        -------
+        function:
+            Takes the list of rows of a request and returns the seconds to sleep before answering.
+    """
+    def latency(rows):
+        longest = max([len(row.get('body') or '') for row in rows] or [0])
+        return base + per_char * longest * len(rows)
+    return latency
+
+
+def lognormal_latency(median=0.05, sigma=0.5, per_row=0.0, seed=None):
+    """
+        Latency model with the long right tail of a real server: most requests take about median seconds, a few far longer.
+
+        Parameters
+        ----------
+        median: float
+            Median seconds of a request.
+        sigma: float
+            Spread of the distribution, 0 always takes median seconds and 1 makes the 99th percentile about 10 times the median.
+        per_row: float
+            Seconds added for every row of a batch.
+        seed: int
+            Seed of the random numbers, for repeatable runs.
+
+        Returns
+        -------
+        function:
+            Takes the list of rows of a request and returns the seconds to sleep before answering.
+    """
+    generator = random.Random(seed)
+    lock = threading.Lock()
+
+    def latency(rows):
+        with lock:
+            return median * math.exp(sigma * generator.gauss(0, 1)) + per_row * len(rows)
+    return latency
+
+
+class FakeServer:
+    def __init__(self, host='127.0.0.1', port=0, latency=None, reject=None, error_rate=0.0, token_ttl=None, max_body_bytes=None, max_rows=None, seed=None):
+        """
+            Serves /token, /arguments and every single request endpoint of config.PATHS from a background thread.
+            Evaluations have the fields listed for the endpoint in sumapi.endpoints.
+            Tokens it has issued stay valid until expire_tokens is called or token_ttl passes, tokens it has not issued are always accepted.
+
+            Parameters
+            ----------
+            host: str
+                Interface to listen on.
+            port: int
+                Port to listen on, 0 picks a free one.
+            latency: function
+                Takes the list of rows of a request and returns the seconds to sleep before answering.
+            reject: function
+                Takes one row and returns an error detail if the server should fail on it, else None.
+                A request holding any rejected row is answered with 422 as a whole.
+            error_rate: float
+                Share of requests, logins aside, answered with 502 as if a proxy in front of the server had failed.
+            token_ttl: float
+                Seconds a token is valid for, None for no limit.
+            max_body_bytes: int
+                Larger request bodies are answered with 413.
+            max_rows: int
+                multi_request packets with more rows are answered with 413.
+            seed: int
+                Seed of the 502 injection, for repeatable runs.
+
+            Examples
+            --------
+            from sumapi.fake_server import FakeServer, padded_latency
+
+            with FakeServer(latency=padded_latency()) as server:
+                print(server.urls())
+        """
+        self.latency = latency or (lambda rows: 0)
+        self.reject = reject or (lambda row: None)
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self.max_body_bytes = max_body_bytes
+        self.max_rows = max_rows
+        self.requests = []
+        self.logins = 0
+        self._expired = set()
+        self._issued = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def urls(self):
+        """
+            Returns a copy of config.URL pointing at this server.
+        """
+        return build_urls(self.base_url)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def login(self):
+        with self._lock:
+            self.logins += 1
+            token = f'fake-token-{self.logins}'
+            self._issued[token] = time.monotonic()
+            return token
+
+    def expire_tokens(self):
+        """
+            Makes every token issued so far invalid, as if they had timed out.
+        """
+        with self._lock:
+            self._expired.update(f'fake-token-{login}' for login in range(1, self.logins + 1))
+
+    def authorized(self, authorization):
+        token = (authorization or '').replace('Bearer ', '', 1)
+        if token in self._expired:
+            return False
+        return self.token_ttl is None or token not in self._issued or time.monotonic() - self._issued[token] < self.token_ttl
+
+    def fails(self):
+        """
+            Returns True for the share of requests, error_rate, that get a 502.
+        """
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def evaluate(self, path, rows):
+        time.sleep(self.latency(rows))
+        evaluations = []
+        for row in rows:
+            schema = _SCHEMAS.get(path) or _MODEL_SCHEMAS.get(row.get('model_name'), _MODEL_SCHEMAS['sentiment'])
+            evaluations.append({'body': row.get('body'), 'evaluation': sample_evaluation(schema, row.get('body'))})
+        return {'evaluations': evaluations}
+
+
+def sample_evaluation(schema, body):
+    """
+        Returns an evaluation with every field of schema, strings echo the body and labels are always 'positive'.
+    """
+    samples = {str: body, float: 0.99, int: 0, list: [], dict: {}}
+    evaluation = {field: samples[kind] for field, kind in schema.items()}
+    if 'label' in evaluation:
+        evaluation['label'] = 'positive'
+    return evaluation
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+_SINGLE_PATHS = {path for key, path in PATHS.items() if key not in ('tokenURL', 'multirequestURL')}
+_SCHEMAS = {PATHS[endpoint.key]: endpoint.response for endpoint in ENDPOINTS}
+_MODEL_SCHEMAS = {endpoint.model_name: endpoint.response for endpoint in ENDPOINTS if endpoint.model_name is not None}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.fake.requests.append((urlsplit(self.path).path, 0))
+        self._reply(200, {'status': 'ok'})
+
+    def do_POST(self):
+        fake = self.server.fake
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        path = urlsplit(self.path).path
+        fake.requests.append((path, len(body)))
+
+        if path == '/token':
+            self._reply(200, {'access_token': fake.login(), 'token_type': 'bearer'})
+        elif not fake.authorized(self.headers.get('Authorization')):
+            self._reply(401, {'detail': 'Could not validate credentials'})
+        elif fake.fails():
+            self._reply(502, {'detail': 'Bad Gateway'})
+        elif fake.max_body_bytes is not None and len(body) > fake.max_body_bytes:
+            self._reply(413, {'detail': f'Request body is larger than {fake.max_body_bytes} bytes.'})
+        elif path == '/arguments':
+            rows = json.loads(body)['argList']
+            details = [detail for detail in map(fake.reject, rows) if detail is not None]
+            if fake.max_rows is not None and len(rows) > fake.max_rows:
+                self._reply(413, {'detail': f'Request has more than {fake.max_rows} rows.'})
+            elif details:
+                self._reply(422, {'detail': details[0]})
+            else:
+                self._reply(200, fake.evaluate(path, rows))
+        elif path in _SINGLE_PATHS:
+            data = json.loads(body)
+            self._reply(200, fake.evaluate(path, [{'body': data.get('body', data.get('question'))}])['evaluations'][0])
+        else:
+            self._reply(404, {'detail': 'Not Found'})
+
+    def _reply(self, status, response_json):
+        content = json.dumps(response_json).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class FakeServerTestCase(unittest.TestCase):
+    """
+        A TestCase with a FakeServer in self.server for every test and config.URL pointing at it until the test ends.
+        A subclass that needs other options calls start_server from its own setUp.
+    """
+    def setUp(self):
+        self.start_server()
+
+    def start_server(self, latency=None, **options):
+        """
+            Starts a FakeServer with the given latency and options, stopped again when the test ends.
+        """
+        self.server = FakeServer(latency=latency, **options).start()
+        self.addCleanup(self.server.stop)
+        urls = mock.patch.dict(URL, self.server.urls())
+        urls.start()
+        self.addCleanup(urls.stop)
+        return self.server
+
+
+def main(argv=None):
+    """
+        Runs a fake server in the foreground, to load test a client from another process or machine.
+
+        python -m sumapi.fake_server --port 8000 --median 0.05 --sigma 0.5 --error-rate 0.01
+    """
+    parser = argparse.ArgumentParser(description='Local stand-in for the SumAPI server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--median', type=float, default=0.0, help='median seconds per request')
+    parser.add_argument('--sigma', type=float, default=0.5, help='spread of the lognormal latency')
+    parser.add_argument('--per-row', type=float, default=0.0, help='seconds added per row of a batch')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 502')
+    parser.add_argument('--token-ttl', type=float, default=None, help='seconds a token is valid for')
+    parser.add_argument('--max-body-bytes', type=int, default=None)
+    parser.add_argument('--max-rows', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    latency = lognormal_latency(args.median, args.sigma, args.per_row, args.seed) if args.median or args.per_row else None
+    server = FakeServer(args.host, args.port, latency=latency, error_rate=args.error_rate, token_ttl=args.token_ttl,
+                        max_body_bytes=args.max_body_bytes, max_rows=args.max_rows, seed=args.seed)
+    print(f'Serving on {server.base_url}', flush=True)
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
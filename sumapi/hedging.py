@@ -0,0 +1,118 @@
+"""
+    Hedged requests: if a request is slower than most, send it again and take whichever answer comes first.
+"""
+from .lazy import LazyModule
+from .processlocal import ProcessLocal
+from collections import deque
+import threading
+import time
+
+futures = LazyModule('concurrent.futures')
+
+
+class Hedger(ProcessLocal):
+    PROCESS_LOCAL = ('_lock', '_executor')
+
+    def __init__(self, percentile=0.95, budget=0.05, window=1000, min_samples=20, max_workers=32):
+        """
+            Sends a duplicate of a request that has not finished after the given percentile of recent latencies.
+            The duplicate goes to the next host when there are several base urls.
+
+            Parameters
+            ----------
+            percentile : float
+                Share of recent requests, between 0 and 1, a request may be slower than before it is hedged.
+            budget: float
+                Largest share of requests that may be hedged, 0.05 adds at most 5% extra load.
+            window: int
+                Number of recent latencies kept.
+            min_samples: int
+                Requests are not hedged until this many latencies are known.
+            max_workers: int
+                Threads sending hedged requests at the same time.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+            from sumapi.hedging import Hedger
+
+            api = SumAPI(username='<your_username>', password='<your_password>', hedge=Hedger(percentile=0.9, budget=0.05))
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.hedged = 0
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._executor = futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='sumapi-hedge')
+
+    def delay(self):
+        """
+            Returns the seconds to wait before hedging, or None while too few latencies are known.
+        """
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(self.percentile * len(latencies)))]
+
+    def _has_budget(self):
+        with self._lock:
+            return self.hedged + 1 <= self.budget * self.requests
+
+    def _take_budget(self):
+        with self._lock:
+            if self.hedged + 1 > self.budget * self.requests:
+                return False
+            self.hedged += 1
+            return True
+
+    def run(self, send):
+        """
+            Runs send(0), and send(1) as well if the first has not finished in time and the budget allows.
+            When no duplicate can be sent, too few latencies being known or the budget spent, send(0) runs on the
+            calling thread, otherwise both run on the thread pool so the first answer can be taken.
+
+            Parameters
+            ----------
+            send : function
+                Takes the attempt number and sends the request.
+
+            Returns
+            -------
+            The result of whichever attempt finished first without raising.
+        """
+        with self._lock:
+            self.requests += 1
+        start = time.perf_counter()
+        delay = self.delay()
+
+        if delay is None or not self._has_budget():
+            result = send(0)
+        else:
+            attempts = [self._executor.submit(send, 0)]
+            done, pending = futures.wait(attempts, timeout=delay)
+            if not done and self._take_budget():
+                attempts.append(self._executor.submit(send, 1))
+            result = _first_result(attempts)
+
+        with self._lock:
+            self.latencies.append(time.perf_counter() - start)
+        return result
+
+
+def _first_result(attempts):
+    """
+        Returns the result of the first future to succeed, or raises the error of the last one to fail.
+    """
+    pending = set(attempts)
+    while True:
+        done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None or not pending:
+                return future.result()
@@ -0,0 +1,184 @@
+"""
+    A job queue in a SQLite file, so several processes or machines can work through one corpus with multi_request.
+"""
+from .config import PACKET_SIZE
+from contextlib import closing
+import sqlite3
+import socket
+import uuid
+import json
+import time
+import os
+
+
+class JobQueue:
+    def __init__(self, path, lease_seconds=3600):
+        """
+            Packets of rows are stored in a SQLite file. Workers claim one packet at a time with a lease,
+            and only the worker holding the current lease can store its result. A packet whose lease runs out,
+            because its worker died or hung, goes back to the queue and is claimed by another worker.
+
+            Parameters
+            ----------
+            path : str
+                SQLite file shared by every worker. It is created if it does not exist.
+            lease_seconds: int
+                How long a worker may hold a packet. Set it above the slowest packet, retries included.
+                Machines sharing a queue need synchronized clocks.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+            from sumapi.jobs import JobQueue
+
+            queue = JobQueue('corpus.db')
+            queue.submit(df, packet_size=250)
+
+            # on every worker
+            api = SumAPI(username='<your_username>', password='<your_password')
+            JobQueue('corpus.db').work(api)
+
+            # when queue.status()['done'] equals the number of packets
+            queue.results()
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        with closing(self._connect()) as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS packets (
+                    id INTEGER PRIMARY KEY,
+                    rows TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    lease TEXT,
+                    owner TEXT,
+                    expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT)""")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    def submit(self, data, packet_size=PACKET_SIZE, id_column=None):
+        """
+            Adds the rows of data to the queue in packets of packet_size rows.
+
+            Parameters
+            ----------
+            data : pandas.dataframe or list
+                Your requests, as for multi_request.
+            packet_size: int
+                Number of rows in a packet, a packet is the unit a worker claims.
+            id_column: str
+                Column holding a unique id for every row, as for multi_request.
+
+            Returns
+            -------
+            int:
+                Number of packets added.
+        """
+        if isinstance(data, list):
+            records = [dict(record) for record in data]
+            ids = list(range(len(records))) if id_column is None else [record.pop(id_column) for record in records]
+        else:
+            ids = data.index.tolist() if id_column is None else data[id_column].tolist()
+            records = json.loads((data if id_column is None else data.drop(columns=[id_column])).to_json(orient='records'))
+
+        packets = [json.dumps([dict(record, _row_id=row_id) for record, row_id in zip(records[start:start + packet_size], ids[start:start + packet_size])])
+                   for start in range(0, len(records), packet_size)]
+        with closing(self._connect()) as connection:
+            connection.executemany('INSERT INTO packets (rows) VALUES (?)', [(packet,) for packet in packets])
+        return len(packets)
+
+    def claim(self, owner=None):
+        """
+            Leases the oldest pending packet, or one whose lease has run out.
+
+            Returns
+            -------
+            tuple:
+                Packet id, lease and rows, or None if there is nothing left to claim.
+        """
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            now = time.time()
+            row = connection.execute(
+                "SELECT id, rows FROM packets WHERE state = 'pending' OR (state = 'leased' AND expires < ?) ORDER BY id LIMIT 1",
+                (now,)).fetchone()
+            if row is None:
+                connection.execute('COMMIT')
+                return None
+            lease = uuid.uuid4().hex
+            connection.execute(
+                "UPDATE packets SET state = 'leased', lease = ?, owner = ?, expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (lease, owner, now + self.lease_seconds, row[0]))
+            connection.execute('COMMIT')
+            return row[0], lease, json.loads(row[1])
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+    def complete(self, packet_id, lease, evaluations):
+        """
+            Stores the evaluations of a packet if lease is still the current lease on it.
+
+            Returns
+            -------
+            Boolean:
+                False if the lease had run out and the packet was claimed again, the evaluations are then dropped.
+        """
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                "UPDATE packets SET state = 'done', result = ?, lease = NULL, expires = NULL WHERE id = ? AND state = 'leased' AND lease = ?",
+                (json.dumps(evaluations), packet_id, lease))
+            return cursor.rowcount == 1
+
+    def work(self, api, owner=None, **kwargs):
+        """
+            Claims and processes packets with api.multi_request until none is left to claim.
+
+            Parameters
+            ----------
+            api : SumAPI
+                Your client.
+            owner: str
+                Name of this worker, stored with its leases. Defaults to host:pid.
+            kwargs:
+                Options passed on to multi_request, such as max_row_bytes or workers.
+
+            Returns
+            -------
+            int:
+                Number of packets this worker completed.
+        """
+        owner = owner or f'{socket.gethostname()}:{os.getpid()}'
+        completed = 0
+        while True:
+            claimed = self.claim(owner)
+            if claimed is None:
+                return completed
+            packet_id, lease, rows = claimed
+            evaluations = api.multi_request(rows, packet_size=len(rows), id_column='_row_id', progress=False, **kwargs)['evaluations']
+            completed += self.complete(packet_id, lease, evaluations)
+
+    def status(self):
+        """
+            Returns the number of packets in each state, 'pending', 'leased' and 'done'.
+        """
+        with closing(self._connect()) as connection:
+            counts = dict(connection.execute('SELECT state, COUNT(*) FROM packets GROUP BY state').fetchall())
+        return {state: counts.get(state, 0) for state in ('pending', 'leased', 'done')}
+
+    def results(self):
+        """
+            Returns the evaluations of every packet in input order, as multi_request does.
+            Rows of packets that are not done yet are left out.
+        """
+        evaluations = []
+        with closing(self._connect()) as connection:
+            for (result,) in connection.execute("SELECT result FROM packets WHERE state = 'done' ORDER BY id"):
+                evaluations += json.loads(result)
+        return {'evaluations': evaluations}
@@ -0,0 +1,35 @@
+"""
+    Modules imported on first use, so importing sumapi and creating a client stay fast.
+"""
+import importlib
+
+
+class LazyModule:
+    def __init__(self, name):
+        """
+            Stands in for the module called name and imports it the first time one of its attributes is read.
+            Threads reading it for the first time at once import it only once, importlib holds a lock per module.
+
+            Parameters
+            ----------
+            name: str
+                Module to import, like 'requests'.
+
+            Examples
+            --------
+            from sumapi.lazy import LazyModule
+
+            requests = LazyModule('requests')
+            requests.Session()   # requests is imported here
+        """
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        return f'<lazy module {self._name!r}{"" if self._module is None else " (imported)"}>'
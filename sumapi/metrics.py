@@ -0,0 +1,137 @@
+"""
+    Counters and histograms of what a client sends, readable as a dict or in the Prometheus text format.
+"""
+from .processlocal import ProcessLocal
+from bisect import bisect_left
+import threading
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 600)
+ROW_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+BYTE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 2097152, 4194304)
+DEPTH_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+HELP = {
+    'requests_total': 'HTTP requests sent, by endpoint and status code.',
+    'request_seconds': 'Seconds from sending a request to reading its whole response.',
+    'sent_bytes_total': 'Request body bytes sent.',
+    'received_bytes_total': 'Response body bytes received.',
+    'retries_total': 'Requests sent again, by reason.',
+    'token_refreshes_total': 'Logins made to renew an expired token.',
+    'cache_hits_total': 'Requests answered from the cache without calling the server.',
+    'packet_rows': 'Rows in each multi_request packet.',
+    'packet_bytes': 'Body bytes of each multi_request packet.',
+    'pipeline_items_total': 'Items a pipeline stage has taken from its queue.',
+    'pipeline_busy_seconds_total': 'Seconds the workers of a pipeline stage spent running it.',
+    'pipeline_blocked_seconds_total': 'Seconds the workers of a pipeline stage waited for room in the next queue.',
+    'pipeline_queue_depth': 'Items waiting in the queue of a pipeline stage, sampled on every take.',
+}
+
+
+class Metrics(ProcessLocal):
+    PROCESS_LOCAL = ('_lock',)
+
+    def __init__(self, prefix='sumapi'):
+        """
+            Keeps counters and histograms in memory, a few dictionary updates under one lock per request.
+
+            Parameters
+            ----------
+            prefix: str
+                Prepended to every metric name in the Prometheus output.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+
+            api = SumAPI(username='<your_username>', password='<your_password>')
+            api.multi_request(data=df)
+            api.metrics.snapshot()['requests_total']
+            print(api.metrics.prometheus())
+        """
+        self.prefix = prefix
+        self.counters = {}
+        self.histograms = {}
+        self.buckets = {}
+        self.reset()
+
+    def reset(self):
+        """
+            The values are kept.
+        """
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect_left(buckets, value)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                self.buckets[name] = buckets
+                # one count per bucket, one for +Inf, then the sum
+                histogram = self.histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            histogram[index] += 1
+            histogram[-1] += value
+
+    def snapshot(self):
+        """
+            Returns
+            -------
+            dict:
+                Metric name to a list of dicts, each with the labels and either the value of a counter, or the count,
+                sum and cumulative buckets of a histogram.
+        """
+        with self._lock:
+            counters = list(self.counters.items())
+            histograms = [(key, list(histogram)) for key, histogram in self.histograms.items()]
+
+        snapshot = {}
+        for (name, labels), value in sorted(counters):
+            snapshot.setdefault(name, []).append(dict(labels, value=value))
+        for (name, labels), histogram in sorted(histograms, key=lambda item: item[0]):
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets[name] + (float('inf'),), histogram):
+                cumulative += count
+                buckets[bound] = cumulative
+            snapshot.setdefault(name, []).append(dict(labels, count=cumulative, sum=histogram[-1], buckets=buckets))
+        return snapshot
+
+    def prometheus(self):
+        """
+            Returns the metrics in the Prometheus text exposition format, to serve on a /metrics page.
+        """
+        lines = []
+        for name, series in self.snapshot().items():
+            metric = f'{self.prefix}_{name}'
+            is_histogram = 'buckets' in series[0]
+            if name in HELP:
+                lines.append(f'# HELP {metric} {HELP[name]}')
+            lines.append(f'# TYPE {metric} {"histogram" if is_histogram else "counter"}')
+            for sample in series:
+                if not is_histogram:
+                    labels = {key: value for key, value in sample.items() if key != 'value'}
+                    lines.append(f'{metric}{format_labels(labels)} {format_value(sample["value"])}')
+                    continue
+                labels = {key: value for key, value in sample.items() if key not in ('count', 'sum', 'buckets')}
+                for bound, count in sample['buckets'].items():
+                    le = '+Inf' if bound == float('inf') else format_value(bound)
+                    lines.append(f'{metric}_bucket{format_labels(dict(labels, le=le))} {count}')
+                lines.append(f'{metric}_sum{format_labels(labels)} {format_value(sample["sum"])}')
+                lines.append(f'{metric}_count{format_labels(labels)} {sample["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,126 @@
+"""
+    Middleware around the one function every request of a client goes through, token logins and multi_request packets included.
+
+    A middleware is a callable taking a Call and send, the rest of the chain. It returns a requests.Response, usually
+    the one send(call) returned, and may change the call before, change the response after, or answer without calling send.
+"""
+from collections import OrderedDict
+from .config import PATHS
+from .processlocal import ProcessLocal
+import threading
+import time
+
+
+class Call:
+    __slots__ = ('api', 'key', 'base_url', 'headers', 'data', 'timeout', 'deadline', 'priority')
+
+    def __init__(self, api, key, base_url, headers, data, timeout, deadline, priority):
+        """
+            One HTTP request about to be sent.
+
+            Parameters
+            ----------
+            api: SumAPI
+                The client sending it.
+            key: str
+                Name of the endpoint in config.PATHS, like 'sentimentURL'.
+            base_url: str
+                Host it goes to, None for config.URL.
+            headers: dict
+            data: bytes or dict
+                The JSON body, or the login form of 'tokenURL'.
+            timeout: tuple
+                (connect, read) timeout, shortened by the deadline when it is sent.
+            deadline: sumapi.deadline.Deadline
+            priority: str
+                Scheduler priority class.
+        """
+        self.api = api
+        self.key = key
+        self.base_url = base_url
+        self.headers = headers
+        self.data = data
+        self.timeout = timeout
+        self.deadline = deadline
+        self.priority = priority
+
+    @property
+    def endpoint(self):
+        return PATHS[self.key]
+
+
+def chain(middleware, send):
+    """
+        Returns send wrapped in every middleware, the first one outermost.
+    """
+    for layer in reversed(middleware):
+        send = _bind(layer, send)
+    return send
+
+
+def _bind(layer, send):
+    return lambda call: layer(call, send)
+
+
+class ResponseCache(ProcessLocal):
+    PROCESS_LOCAL = ('_lock',)
+
+    def __init__(self, maxsize=10000, ttl=None, keys=None):
+        """
+            Answers a request from memory when the same body was sent to the same endpoint before.
+            Only responses with status 200 are kept, and logins never are. Every caller gets the same response object,
+            response.json() still gives each its own copy.
+
+            Parameters
+            ----------
+            maxsize: int
+                Responses kept, the least recently used ones are dropped first.
+            ttl: float
+                Seconds a response is kept, None to keep it until it is dropped.
+            keys: list
+                Endpoints to cache, like ['sentimentURL', 'multirequestURL']. Every endpoint if None.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+            from sumapi.middleware import ResponseCache
+
+            api = SumAPI(username='<your_username>', password='<your_password>', middleware=[ResponseCache(maxsize=50000)])
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.keys = None if keys is None else set(keys)
+        self.responses = OrderedDict()
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+
+    def __call__(self, call, send):
+        if call.key == 'tokenURL' or not isinstance(call.data, bytes) or (self.keys is not None and call.key not in self.keys):
+            return send(call)
+
+        cache_key = (call.key, call.data)
+        with self._lock:
+            cached = self.responses.get(cache_key)
+            if cached is not None and self.ttl is not None and time.monotonic() - cached[0] >= self.ttl:
+                cached = None
+            if cached is not None:
+                self.responses.move_to_end(cache_key)
+        if cached is not None:
+            call.api.metrics.inc('cache_hits_total', endpoint=call.endpoint)
+            return cached[1]
+
+        response = send(call)
+        # an expired token may also be reported with status 200
+        if response.status_code == 200 and b'Could not validate credentials' not in response.content:
+            with self._lock:
+                self.responses[cache_key] = (time.monotonic(), response)
+                self.responses.move_to_end(cache_key)
+                while len(self.responses) > self.maxsize:
+                    self.responses.popitem(last=False)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self.responses.clear()
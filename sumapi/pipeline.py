@@ -0,0 +1,314 @@
+"""
+    Stages running in threads and connected by bounded queues, for the read, batch, send, parse and write loop of bulk jobs.
+"""
+from .metrics import Metrics, DEPTH_BUCKETS
+import threading
+import queue
+import time
+
+QUEUE_SIZE = 1000
+# seconds a blocked worker waits before checking whether another stage has failed
+_POLL = 0.1
+_END = object()
+
+
+class _Stopped(Exception):
+    pass
+
+
+class Stage:
+    def __init__(self, name, function, workers=1, batch_size=None, flatten=False, queue_size=None):
+        """
+            One step of a Pipeline. Its workers take items from its queue, call function and put what it returns in the
+            queue of the next stage. With one worker, items keep their order, with more they are passed on as they finish.
+
+            Parameters
+            ----------
+            name: str
+                Shown in the stats and used as the stage label of the metrics.
+            function: callable
+                Called with one item, or with a list of up to batch_size items if batch_size is set.
+                What it returns is the item passed on. The function of the last stage is the sink, what it returns is dropped.
+            workers: int
+                Threads running function at the same time.
+            batch_size: int
+                If set, function gets lists of this many items, the last one may be shorter.
+            flatten: Boolean
+                If True, function returns an iterable and each of its elements is passed on as one item.
+            queue_size: int
+                Items the queue in front of this stage holds, defaults to the queue_size of the pipeline.
+        """
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.batch_size = batch_size
+        self.flatten = flatten
+        self.queue_size = queue_size
+        self.queue = None
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.max_depth = 0
+        self._running = self.workers
+
+
+class Pipeline:
+    def __init__(self, source, stages, queue_size=QUEUE_SIZE, metrics=None):
+        """
+            Reads items from source in a thread of its own and passes them through stages. Every queue is bounded, so a
+            slow stage fills the queue in front of it and the stages before it, down to the reader, wait for room.
+            Memory holds at most the queues and the items in the hands of the workers, however long source is.
+
+            The slowest stage is the one with the highest utilization, the share of its workers' time spent in its
+            function, and usually a full queue in front of it. Add workers to it, or make the batches of the stage
+            before it larger.
+
+            Parameters
+            ----------
+            source: iterable
+                Items to process, read lazily.
+            stages: list
+                Stage objects in order, the last one is the sink.
+            queue_size: int
+                Items each queue holds.
+            metrics: sumapi.metrics.Metrics
+                Registry the stages record their items, busy and blocked seconds and queue depth in, with a stage label.
+                A new one is made if None.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+            from sumapi.pipeline import Pipeline, Stage
+            import json
+
+            api = SumAPI(username='<your_username>', password='<your_password>', pool_size=8)
+
+            def send(rows):
+                return api.multi_request(rows, packet_size=len(rows), progress=False)['evaluations']
+
+            with open('rows.jsonl') as source, open('evaluations.jsonl', 'w') as output:
+                pipeline = Pipeline(source, [
+                    Stage('parse', json.loads),
+                    Stage('send', send, workers=8, batch_size=250, flatten=True),
+                    Stage('encode', json.dumps),
+                    Stage('write', lambda line: output.write(line + '\\n')),
+                ])
+                pipeline.run()
+            print(pipeline.report())
+        """
+        if not stages:
+            raise ValueError('A pipeline needs at least one stage, the last one is the sink.')
+        self.source = source
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.metrics = metrics or Metrics()
+        self.reader = Stage('read', None)
+        self.started = None
+        self.finished = None
+
+    def run(self):
+        """
+            Processes every item of source and returns once the sink has taken the last one.
+            If a stage raises, the other stages stop and the error is raised here.
+
+            Returns
+            -------
+            int:
+                Number of items the sink took.
+        """
+        self.reader._clear()
+        for stage in self.stages:
+            stage._clear()
+            stage.queue = queue.Queue(maxsize=stage.queue_size or self.queue_size)
+        stop = threading.Event()
+        errors = []
+
+        threads = [threading.Thread(target=self._read, args=(stop, errors), name='sumapi-pipeline-read', daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads += [threading.Thread(target=self._work, args=(index, stop, errors), name=f'sumapi-pipeline-{stage.name}', daemon=True)
+                        for _ in range(stage.workers)]
+        self.started = time.perf_counter()
+        self.finished = None
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            self.finished = time.perf_counter()
+        if errors:
+            raise errors[0]
+        return self.stages[-1].items
+
+    def _read(self, stop, errors):
+        try:
+            items = iter(self.source)
+            while True:
+                start = time.perf_counter()
+                item = next(items, _END)
+                self._record(self.reader, 0 if item is _END else 1, time.perf_counter() - start)
+                if item is _END:
+                    break
+                self._put(self.reader, 0, [item], stop)
+            self._finish(self.reader, 0, stop)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def _work(self, index, stop, errors):
+        stage = self.stages[index]
+        size = stage.batch_size or 1
+        try:
+            ended = False
+            while not ended:
+                items = []
+                while len(items) < size:
+                    depth = stage.queue.qsize()
+                    item = _get(stage.queue, stop)
+                    if item is _END:
+                        ended = True
+                        break
+                    self._observe_depth(stage, depth)
+                    items.append(item)
+                if not items:
+                    break
+
+                start = time.perf_counter()
+                result = stage.function(items if stage.batch_size else items[0])
+                outputs = list(result) if stage.flatten else [result]
+                self._record(stage, len(items), time.perf_counter() - start)
+                if index + 1 < len(self.stages):
+                    self._put(stage, index + 1, outputs, stop)
+            self._finish(stage, index + 1, stop)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def _put(self, stage, index, items, stop):
+        """
+            Puts items in the queue of stage index, the time it waits for room is counted as blocked.
+        """
+        destination = self.stages[index].queue
+        start = time.perf_counter()
+        for item in items:
+            _put(destination, item, stop)
+        blocked = time.perf_counter() - start
+        with stage._lock:
+            stage.blocked_seconds += blocked
+        self.metrics.inc('pipeline_blocked_seconds_total', blocked, stage=stage.name)
+
+    def _finish(self, stage, index, stop):
+        """
+            Tells every worker of stage index that the stream has ended, once the last worker of stage has finished.
+        """
+        with stage._lock:
+            stage._running -= 1
+            last = stage._running == 0
+        if last and index < len(self.stages):
+            for _ in range(self.stages[index].workers):
+                _put(self.stages[index].queue, _END, stop)
+
+    def _record(self, stage, items, seconds):
+        with stage._lock:
+            stage.items += items
+            stage.busy_seconds += seconds
+        if items:
+            self.metrics.inc('pipeline_items_total', items, stage=stage.name)
+        self.metrics.inc('pipeline_busy_seconds_total', seconds, stage=stage.name)
+
+    def _observe_depth(self, stage, depth):
+        with stage._lock:
+            stage.depth_total += depth
+            stage.depth_samples += 1
+            stage.max_depth = max(stage.max_depth, depth)
+        self.metrics.observe('pipeline_queue_depth', depth, DEPTH_BUCKETS, stage=stage.name)
+
+    def stats(self):
+        """
+            Can be called while the pipeline runs, from another thread.
+
+            Returns
+            -------
+            list:
+                One dict per stage, the reader first.
+                stage: str
+                workers: int
+                items: int
+                    Items taken from the queue, or read from source.
+                items_per_second: float
+                utilization: float
+                    Share of the workers' time spent in the function, near 1 for the slowest stage.
+                blocked: float
+                    Share of the workers' time spent waiting for room in the next queue.
+                queue_depth: float
+                    Mean items waiting in the queue in front of the stage.
+                max_queue_depth: int
+                queue_size: int
+        """
+        if self.started is None:
+            return []
+        elapsed = max((self.finished or time.perf_counter()) - self.started, 1e-9)
+        stats = []
+        for stage in [self.reader] + self.stages:
+            with stage._lock:
+                stats.append({
+                    'stage': stage.name,
+                    'workers': stage.workers,
+                    'items': stage.items,
+                    'items_per_second': stage.items / elapsed,
+                    'utilization': stage.busy_seconds / (elapsed * stage.workers),
+                    'blocked': stage.blocked_seconds / (elapsed * stage.workers),
+                    'queue_depth': stage.depth_total / stage.depth_samples if stage.depth_samples else 0.0,
+                    'max_queue_depth': stage.max_depth,
+                    'queue_size': 0 if stage is self.reader else stage.queue.maxsize})
+        return stats
+
+    def report(self):
+        """
+            Returns the stats as a table, the stage with the highest utilization marked as the bottleneck.
+        """
+        stats = self.stats()
+        if not stats:
+            return 'The pipeline has not run.'
+        slowest = max(stats, key=lambda stage: stage['utilization'])
+        lines = [f'{"stage":<16} {"workers":>7} {"items":>10} {"items/s":>10} {"busy":>6} {"blocked":>8} {"queue":>13}']
+        for stage in stats:
+            queue_column = '' if stage is stats[0] else f'{stage["queue_depth"]:.0f}/{stage["queue_size"]}'
+            lines.append(f'{stage["stage"]:<16} {stage["workers"]:>7} {stage["items"]:>10} {stage["items_per_second"]:>10.0f} '
+                         f'{stage["utilization"]:>6.0%} {stage["blocked"]:>8.0%} {queue_column:>13}'
+                         f'{"  <- bottleneck" if stage is slowest else ""}')
+        return '\n'.join(lines)
+
+
+def _get(source, stop):
+    while True:
+        if stop.is_set():
+            raise _Stopped()
+        try:
+            return source.get(timeout=_POLL)
+        except queue.Empty:
+            pass
+
+
+def _put(destination, item, stop):
+    while True:
+        if stop.is_set():
+            raise _Stopped()
+        try:
+            destination.put(item, timeout=_POLL)
+            return
+        except queue.Full:
+            pass
@@ -0,0 +1,201 @@
+"""
+    A client that spreads requests over several API accounts.
+"""
+from .api import SumAPI, _instances
+from .routing import Router
+from .hedging import Hedger
+from .deadline import DeadlineExceeded, as_deadline
+from .lazy import LazyModule
+from .config import PACKET_TIMEOUT, RETRY_WAITS, ACCOUNT_ERROR_STATUSES
+from .scheduler import BULK
+from .metrics import Metrics
+from .tracing import Tracer
+import threading
+import time
+
+requests = LazyModule('requests')
+
+
+class SumAPIPool(SumAPI):
+    def __init__(self, credentials, log=True, pool_size=10, cooldown=60, base_urls=None, hedge=None, scheduler=None, metrics=None, trace=None, middleware=None, transport=None, login='now'):
+        """
+            Logs in with every account and sends each request, and each multi_request packet, with the account that has
+            the fewest requests in flight for its weight. An account whose request cannot connect, is refused or
+            throttled, or gets a 5xx, is left out for cooldown seconds, and the request is sent again with another account.
+            Errors caused by the input are returned at once.
+
+            It has the endpoint methods, multi_request, analyze and add_middleware of SumAPI. Tokens, headers and sessions
+            belong to each account, use api.clients[index] for them.
+
+            Parameters
+            ----------
+            credentials : list
+                (username, password) or (username, password, weight) for every account.
+                An account with weight 2 is given twice as many requests in flight as one with weight 1.
+            log: Boolean
+                Same as for SumAPI, used for every account.
+            pool_size: int
+                Number of connections kept open for every account.
+            cooldown: float
+                Seconds an account is left out after a failure.
+            base_urls: list
+                Same as for SumAPI, one router is shared by every account.
+            hedge: Boolean or sumapi.hedging.Hedger
+                Same as for SumAPI, one hedger is shared by every account.
+            scheduler: sumapi.scheduler.Scheduler
+                Same as for SumAPI, shared by every account.
+            metrics: sumapi.metrics.Metrics
+                Same as for SumAPI, every account records in it.
+            trace: Boolean or sumapi.tracing.Tracer
+                Same as for SumAPI, every account records in api.tracer.
+            middleware: list
+                Same as for SumAPI, every account goes through the same middleware, so they share a ResponseCache.
+            transport: sumapi.cassette.Recorder or sumapi.cassette.Player
+                Same as for SumAPI, every account records to or plays from the same cassette.
+            login: str
+                Same as for SumAPI, used for every account. 'background' logs in with all of them at once.
+
+            Examples
+            --------
+            from sumapi.pool import SumAPIPool
+
+            api = SumAPIPool([('<username_1>', '<password_1>'), ('<username_2>', '<password_2>', 2)])
+
+            api.sentiment_analysis('Bu harika bir filmdi.')
+            api.multi_request(data=df, workers=8)
+        """
+        self.log = log
+        self.pool_size = pool_size
+        self.transport = transport
+        self.router = base_urls if base_urls is None or isinstance(base_urls, Router) else Router(base_urls)
+        self.hedger = Hedger() if hedge is True else hedge or None
+        self.scheduler = scheduler
+        self.metrics = metrics or Metrics()
+        self.tracer = Tracer() if trace is True else trace or None
+        self.middleware = list(middleware or [])
+        self.clients = [SumAPI(credential[0], credential[1], log=log, pool_size=pool_size, base_urls=self.router, hedge=self.hedger, scheduler=scheduler,
+                               metrics=self.metrics, trace=self.tracer, middleware=self.middleware, transport=transport, login=login)
+                        for credential in credentials]
+        self.weights = [credential[2] if len(credential) > 2 else 1 for credential in credentials]
+        self.cooldown = cooldown
+        self.outstanding = [0] * len(self.clients)
+        self.blocked_until = [0.0] * len(self.clients)
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_connections()
+        _instances.add(self)
+
+    def _reset_connections(self):
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        raise AttributeError('Every account of a SumAPIPool has its own session, use api.clients[index].session.')
+
+    @property
+    def token(self):
+        raise AttributeError('Every account of a SumAPIPool has its own token, use api.clients[index].token.')
+
+    @property
+    def headers(self):
+        raise AttributeError('Every account of a SumAPIPool has its own headers, use api.clients[index].headers.')
+
+    def add_middleware(self, layer):
+        """
+            Adds a middleware inside the ones already added, for every account.
+        """
+        self.middleware.append(layer)
+        for client in self.clients:
+            client.add_middleware(layer)
+
+    def timeout_check(self, response_json, headers=None, deadline=None):
+        """
+            Renews the token of the account the request was sent with, found by its headers, or of every account if
+            headers is None. Returns True if the response says the token has expired.
+        """
+        if not isinstance(response_json, dict) or response_json.get('detail') != 'Could not validate credentials':
+            return False
+        clients = [client for client in self.clients if headers is None or client._headers is headers]
+        for client in clients:
+            client._refresh_token(headers, deadline)
+        return True
+
+    def _acquire(self, exclude=()):
+        """
+            Picks the available account with the fewest requests in flight for its weight.
+            If every account is cooling down, the one that comes back first is used.
+        """
+        with self._lock:
+            now = time.monotonic()
+            indexes = [index for index in range(len(self.clients)) if index not in exclude] or list(range(len(self.clients)))
+            available = [index for index in indexes if self.blocked_until[index] <= now]
+            if available:
+                index = min(available, key=lambda index: (self.outstanding[index] + 1) / self.weights[index])
+            else:
+                index = min(indexes, key=lambda index: self.blocked_until[index])
+            self.outstanding[index] += 1
+            return index
+
+    def _release(self, index, failed):
+        with self._lock:
+            self.outstanding[index] -= 1
+            if failed:
+                self.blocked_until[index] = time.monotonic() + self.cooldown
+
+    def _dispatch(self, send, failed):
+        """
+            Runs send with one account after another until one succeeds or every account has been tried.
+            An account is released whatever send raises. Connection errors and timeouts move on to the next account,
+            a passed deadline is raised at once, there is no time left to try another.
+        """
+        tried = []
+        while True:
+            index = self._acquire(exclude=tried)
+            tried.append(index)
+            account_failed = True
+            try:
+                result = send(self.clients[index])
+                account_failed = failed(result)
+            except DeadlineExceeded:
+                raise
+            except (ConnectionError, requests.exceptions.RequestException):
+                if len(tried) == len(self.clients):
+                    raise
+                continue
+            finally:
+                self._release(index, account_failed)
+            if not account_failed or len(tried) == len(self.clients):
+                return result
+
+    def _post_response(self, key, data, timeout=None, deadline=None):
+        deadline = as_deadline(deadline)
+        return self._dispatch(lambda client: client._post_response(key, data, timeout, deadline), lambda result: account_failed(result[0]))
+
+    def _post_packet(self, body, timeout=PACKET_TIMEOUT, deadline=None, priority=BULK, waits=None):
+        """
+            Sends a packet with one account after another, each giving up at once when the server is unavailable to it.
+            Only when every account has failed does it sleep for each of waits seconds, RETRY_WAITS if None, and try again.
+        """
+        deadline = as_deadline(deadline)
+        waits = list(RETRY_WAITS if waits is None else waits)
+        while True:
+            try:
+                return self._dispatch(lambda client: client._post_packet(body, timeout, deadline, priority, waits=()), lambda result: False)
+            except ConnectionError:
+                self._back_off(waits, deadline)
+
+
+def account_failed(response):
+    """
+        A single request failed the account if it was refused, throttled or the server failed. Other errors, like a
+        413 for a text too long, are caused by the input and are returned to the caller without trying another account.
+    """
+    return response.status_code in ACCOUNT_ERROR_STATUSES or response.status_code >= 500
@@ -0,0 +1,24 @@
+"""
+    Objects a client shares between its threads, whose locks, queues and threads must not be shared with another process.
+"""
+
+
+class ProcessLocal:
+    """
+        Base of the objects a client resets in a forked child. reset() makes the attributes named in PROCESS_LOCAL,
+        they are left out when the object is pickled and made again when it is unpickled, in a spawned worker.
+    """
+    PROCESS_LOCAL = ()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in self.PROCESS_LOCAL:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.reset()
+
+    def reset(self):
+        pass
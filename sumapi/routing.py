@@ -0,0 +1,125 @@
+"""
+    Picks which of several SumAPI hosts a request goes to.
+"""
+from .config import HEALTH_PATH, PROBE_INTERVAL, HOST_COOLDOWN
+from .lazy import LazyModule
+from .processlocal import ProcessLocal
+import threading
+import weakref
+import time
+import os
+
+requests = LazyModule('requests')
+
+
+class Router(ProcessLocal):
+    PROCESS_LOCAL = ('_lock', '_stop')
+
+    def __init__(self, base_urls, alpha=0.3, probe_interval=PROBE_INTERVAL, cooldown=HOST_COOLDOWN):
+        """
+            Keeps an exponentially weighted moving average (EWMA) of the latency of every host for every endpoint, and
+            orders hosts by the one of the endpoint a request goes to, so slow multi_request packets do not make a host
+            look slow for single calls. Health probes keep one of their own, used for endpoints a host has not served yet.
+            A host that refuses a connection, or answers a health probe with a 5xx, is put last for cooldown seconds.
+            Hosts are probed in a background thread, so a host that comes back, or gets faster, is noticed without traffic.
+
+            Parameters
+            ----------
+            base_urls : list
+                Base urls of the hosts, like 'https://api.summarify.io'.
+            alpha: float
+                Weight of the newest latency in the average, between 0 and 1.
+            probe_interval: float
+                Seconds between health probes, 0 turns them off.
+            cooldown: float
+                Seconds a failed host is put last.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+
+            api = SumAPI(username='<your_username>', password='<your_password>', base_urls=['https://mirror.example.com', 'https://api.summarify.io'])
+        """
+        self.base_urls = list(base_urls)
+        self.alpha = alpha
+        self.probe_interval = probe_interval
+        self.cooldown = cooldown
+        self.latency = {base_url: None for base_url in self.base_urls}
+        self.endpoint_latency = {}
+        self.down_until = {base_url: 0.0 for base_url in self.base_urls}
+        self.reset()
+        _routers.add(self)
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        _routers.add(self)
+
+    def reset(self):
+        """
+            Starts health probes, a forked child does not have the thread of its parent.
+        """
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if self.probe_interval:
+            threading.Thread(target=_probe_loop, args=(weakref.ref(self), self._stop, self.probe_interval), daemon=True).start()
+
+    def close(self):
+        self._stop.set()
+
+    def order(self, key=None):
+        """
+            Returns the base urls to try for the endpoint named key, fastest healthy host first.
+            Hosts without a measurement yet count as fastest.
+        """
+        now = time.monotonic()
+        with self._lock:
+            latency = self.endpoint_latency.get(key, {})
+            return sorted(self.base_urls, key=lambda base_url: (self.down_until[base_url] > now, latency.get(base_url) or self.latency[base_url] or 0.0))
+
+    def observe(self, base_url, seconds, key=None):
+        """
+            Adds a latency of the endpoint named key to the average of the host, key None for a health probe.
+        """
+        with self._lock:
+            latency = self.latency if key is None else self.endpoint_latency.setdefault(key, {})
+            previous = latency.get(base_url)
+            latency[base_url] = seconds if previous is None else self.alpha * seconds + (1 - self.alpha) * previous
+            self.down_until[base_url] = 0.0
+
+    def failed(self, base_url):
+        with self._lock:
+            self.down_until[base_url] = time.monotonic() + self.cooldown
+
+    def probe(self, timeout=5):
+        for base_url in self.base_urls:
+            start = time.perf_counter()
+            try:
+                response = requests.get(base_url + HEALTH_PATH, timeout=timeout)
+            except requests.exceptions.RequestException:
+                self.failed(base_url)
+                continue
+            if response.status_code >= 500:
+                self.failed(base_url)
+            else:
+                self.observe(base_url, time.perf_counter() - start)
+
+
+def _probe_loop(router_ref, stop, interval):
+    while not stop.wait(interval):
+        router = router_ref()
+        if router is None:
+            return
+        router.probe()
+        del router
+
+
+_routers = weakref.WeakSet()
+
+
+def _after_fork():
+    for router in list(_routers):
+        router.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,121 @@
+"""
+    Shares the connections of one client between interactive calls and bulk traffic.
+"""
+from .deadline import DeadlineExceeded
+from .processlocal import ProcessLocal
+from contextlib import contextmanager
+import itertools
+import threading
+import heapq
+import time
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+
+
+class Scheduler(ProcessLocal):
+    PROCESS_LOCAL = ('_condition', '_queue', '_counter', '_finish', '_virtual_time', '_tokens', '_refilled')
+
+    def __init__(self, slots=10, weights=None, rate=None, burst=None):
+        """
+            Lets at most slots requests run at once, and at most rate requests start per second.
+            Waiting interactive requests always go first. Other priority classes share what is left by weighted fair
+            queueing, so a class with weight 3 gets three slots for every one a class with weight 1 gets.
+
+            Parameters
+            ----------
+            slots: int
+                Requests running at the same time, usually the pool_size of the client.
+            weights: dict
+                Weight of every priority class other than 'interactive', classes not listed have weight 1.
+            rate: float
+                Requests started per second, None for no limit.
+            burst: int
+                Requests that may start at once after an idle period, defaults to slots.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+            from sumapi.scheduler import Scheduler
+
+            api = SumAPI(username='<your_username>', password='<your_password>', pool_size=16, scheduler=Scheduler(slots=16, rate=50))
+            api.multi_request(data=df, workers=16)   # bulk packets
+            api.classification('Bu harika bir filmdi.')   # goes ahead of queued packets
+        """
+        self.slots = slots
+        self.weights = weights or {}
+        self.rate = rate
+        self.burst = burst or slots
+        self.running = 0
+        self.reset()
+
+    def reset(self):
+        """
+            Empties the queue, no request of this process is waiting or running yet.
+        """
+        self._condition = threading.Condition()
+        self._queue = []
+        self._counter = itertools.count()
+        self._finish = {}
+        self._virtual_time = 0.0
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self.running = 0
+
+    def _refill(self):
+        if self.rate is not None:
+            now = time.monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+
+    def acquire(self, priority=INTERACTIVE, timeout=None):
+        """
+            Waits for a slot. Raises DeadlineExceeded if none is free within timeout seconds.
+        """
+        with self._condition:
+            if priority == INTERACTIVE:
+                ticket = (0, 0.0, next(self._counter))
+            else:
+                finish = max(self._virtual_time, self._finish.get(priority, 0.0)) + 1.0 / self.weights.get(priority, 1)
+                self._finish[priority] = finish
+                ticket = (1, finish, next(self._counter))
+            heapq.heappush(self._queue, ticket)
+
+            expires = None if timeout is None else time.monotonic() + timeout
+            while True:
+                self._refill()
+                wait = None
+                if self._queue[0] == ticket and self.running < self.slots:
+                    if self.rate is None or self._tokens >= 1:
+                        break
+                    wait = (1 - self._tokens) / self.rate
+                if expires is not None:
+                    left = expires - time.monotonic()
+                    if left <= 0:
+                        self._queue.remove(ticket)
+                        heapq.heapify(self._queue)
+                        self._condition.notify_all()
+                        raise DeadlineExceeded("The deadline passed while waiting for a free connection.")
+                    wait = left if wait is None else min(wait, left)
+                self._condition.wait(wait)
+
+            heapq.heappop(self._queue)
+            if ticket[0] == 1:
+                self._virtual_time = ticket[1]
+            if self.rate is not None:
+                self._tokens -= 1
+            self.running += 1
+            self._condition.notify_all()
+
+    def release(self):
+        with self._condition:
+            self.running -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority=INTERACTIVE, timeout=None):
+        self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
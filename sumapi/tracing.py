@@ -0,0 +1,115 @@
+"""
+    Times the phases of every request and packet, and exports them in the Chrome trace event format.
+"""
+from .processlocal import ProcessLocal
+from contextlib import contextmanager, nullcontext
+import threading
+import json
+import time
+import os
+
+_NO_SPAN = nullcontext()
+
+
+class Tracer(ProcessLocal):
+    PROCESS_LOCAL = ('_lock',)
+
+    def __init__(self, max_events=1000000):
+        """
+            Records a span for each phase of a call, on the thread that ran it:
+
+            prepare      turning the DataFrame or list into records
+            encode       serializing rows and packets to JSON
+            queue        waiting for a scheduler slot
+            wait         from sending the request until the response headers arrive, connecting and sending included
+            download     reading the response body
+            decode       parsing the response JSON
+            retry-sleep  sleeping before a packet is sent again
+
+            requests does not report when the connection is made and the body is sent, so those are part of wait.
+            A new connection shows up as a longer wait on the first request of a thread.
+
+            Parameters
+            ----------
+            max_events: int
+                Spans kept, later ones are dropped so a long run cannot use up the memory.
+
+            Examples
+            --------
+            from sumapi.api import SumAPI
+
+            api = SumAPI(username='<your_username>', password='<your_password>', trace=True)
+            api.multi_request(data=df, workers=4)
+            api.tracer.save('multi_request.trace.json')   # open in chrome://tracing or ui.perfetto.dev
+            api.tracer.summary()
+        """
+        self.max_events = max_events
+        self.events = []
+        self.reset()
+
+    def reset(self):
+        """
+            The spans are kept.
+        """
+        self._lock = threading.Lock()
+
+    def add(self, name, start, end, **args):
+        """
+            Records a span between two time.perf_counter() readings.
+        """
+        event = {
+            'name': name,
+            'ph': 'X',
+            'ts': start * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args}
+        with self._lock:
+            if len(self.events) < self.max_events:
+                self.events.append(event)
+
+    @contextmanager
+    def span(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter(), **args)
+
+    def chrome_trace(self):
+        """
+            Returns
+            -------
+            dict:
+                The spans in the Chrome trace event format.
+        """
+        with self._lock:
+            events = list(self.events)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.chrome_trace(), file)
+
+    def summary(self):
+        """
+            Returns
+            -------
+            dict:
+                Phase name to the number of spans and their total seconds, the largest total first.
+        """
+        totals = {}
+        with self._lock:
+            for event in self.events:
+                total = totals.setdefault(event['name'], {'count': 0, 'seconds': 0.0})
+                total['count'] += 1
+                total['seconds'] += event['dur'] / 1e6
+        return dict(sorted(totals.items(), key=lambda item: -item[1]['seconds']))
+
+
+def span(tracer, name, **args):
+    """
+        Returns tracer.span(name), or a context manager that does nothing when tracing is off.
+    """
+    return _NO_SPAN if tracer is None else tracer.span(name, **args)
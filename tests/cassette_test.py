@@ -0,0 +1,101 @@
+from sumapi.api import SumAPI
+from sumapi.cassette import Recorder, Player
+from sumapi.bulk import bulk_request
+from sumapi.config import URL
+from sumapi.fake_server import FakeServer
+from unittest import mock
+import unittest
+import requests
+import tempfile
+import gzip
+import json
+import zlib
+import time
+import os
+from types import SimpleNamespace
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'session.jsonl.gz')
+        self.data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(20)]
+
+        with FakeServer(latency=lambda rows: 0.05) as server, mock.patch.dict(URL, server.urls()), Recorder(self.path) as recorder:
+            api = SumAPI(username='username', password='secret-password', transport=recorder)
+            self.single = api.sentiment_analysis('Bu harika bir filmdi.')
+            self.multi = api.multi_request(self.data, packet_size=5, workers=2, progress=False)
+            self.token = api.token
+
+    def test_credentials_are_redacted(self):
+        with gzip.open(self.path, 'rt') as file:
+            cassette = file.read()
+
+        self.assertEqual(len(cassette.splitlines()), 6)
+        self.assertNotIn('secret-password', cassette)
+        self.assertNotIn(self.token, cassette)
+        self.assertIn('REDACTED', cassette)
+
+    def test_cassette_is_one_gzip_stream(self):
+        with open(self.path, 'rb') as file:
+            stream = zlib.decompressobj(wbits=31)
+            stream.decompress(file.read())
+
+        self.assertTrue(stream.eof)
+        self.assertEqual(stream.unused_data, b'')
+
+    def test_token_response_that_is_not_json(self):
+        path = os.path.join(os.path.dirname(self.path), 'token.jsonl')
+        request = SimpleNamespace(url='http://127.0.0.1/token', method='POST', body=b'username=username&password=secret-password')
+        response = SimpleNamespace(status_code=200, content=b'<html>secret-token</html>', headers={'Content-Type': 'text/html'})
+
+        with Recorder(path) as recorder:
+            recorder.record(request, response, 0.01)
+
+        with open(path) as file:
+            exchange = json.loads(file.read())
+        self.assertEqual(exchange['body'], 'REDACTED')
+
+    def test_worker_processes_record_to_shards(self):
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(40)]
+        for name in ('bulk.jsonl', 'bulk.jsonl.gz'):
+            path = os.path.join(os.path.dirname(self.path), name)
+            with FakeServer() as server, mock.patch.dict(URL, server.urls()), Recorder(path) as recorder:
+                api = SumAPI(username='username', password='password', transport=recorder)
+                recorded = bulk_request(api, data, processes=2, shard_size=10, packet_size=5)
+
+            player = Player(path)
+            self.assertEqual([exchange['path'] for exchange in player.exchanges], ['/token'] + ['/arguments'] * 8)
+            api = SumAPI(username='username', password='password', transport=player)
+            self.assertEqual(bulk_request(api, data, processes=2, shard_size=10, packet_size=5), recorded)
+
+    def test_replay_as_fast_as_possible(self):
+        api = SumAPI(username='username', password='password', transport=Player(self.path))
+
+        start = time.perf_counter()
+        single = api.sentiment_analysis('Bu harika bir filmdi.')
+        multi = api.multi_request(self.data, packet_size=5, workers=2, progress=False)
+
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(single, self.single)
+        self.assertEqual(multi, self.multi)
+
+    def test_replay_at_recorded_speed(self):
+        api = SumAPI(username='username', password='password', transport=Player(self.path, speed=1))
+
+        start = time.perf_counter()
+        api.multi_request(self.data, packet_size=5, progress=False)
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.2)
+
+    def test_cassette_runs_out(self):
+        api = SumAPI(username='username', password='password', transport=Player(self.path))
+        api.sentiment_analysis('Bu harika bir filmdi.')
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            api.sentiment_analysis('Bu harika bir filmdi.')
+
+
+if __name__ == '__main__':
+    unittest.main()
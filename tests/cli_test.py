@@ -0,0 +1,158 @@
+from sumapi.cli import main, run, save_checkpoint, call_endpoint
+from sumapi.api import SumAPI
+from sumapi.config import URL
+from sumapi.endpoints import ENDPOINTS_BY_NAME
+from sumapi.fake_server import FakeServerTestCase
+from unittest import mock
+import unittest
+import tempfile
+import json
+import csv
+import io
+import os
+
+
+class TestCli(FakeServerTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.start_server()
+        self.credentials = ['--username', 'username', '--password', 'password']
+        self.rows = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(53)]
+
+    def write_jsonl(self, name, rows):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.writelines(json.dumps(row) + '\n' for row in rows)
+        return path
+
+    def read_jsonl(self, path):
+        with open(path, encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_mixed_rows_in_input_order(self):
+        source = self.write_jsonl('rows.jsonl', self.rows)
+        output = os.path.join(self.directory, 'out.jsonl')
+
+        self.assertEqual(main([source, '--output', output, '--packet-size', '5', '--concurrency', '4'] + self.credentials), 0)
+
+        outputs = self.read_jsonl(output)
+        self.assertEqual([item['body'] for item in outputs], [row['body'] for row in self.rows])
+        self.assertEqual([item['row_id'] for item in outputs], list(range(len(self.rows))))
+        self.assertEqual(len([path for path, size in self.server.requests if path == '/arguments']), 11)
+
+    def test_endpoint_from_csv(self):
+        source = os.path.join(self.directory, 'reviews.csv')
+        with open(source, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=['id', 'text'])
+            writer.writeheader()
+            writer.writerows({'id': f'review-{index}', 'text': f'review {index}'} for index in range(7))
+        output = os.path.join(self.directory, 'out.jsonl')
+
+        main([source, '--endpoint', 'sentiment_analysis', '--id-column', 'id', '--output', output] + self.credentials)
+
+        outputs = self.read_jsonl(output)
+        self.assertEqual([item['row_id'] for item in outputs], [f'review-{index}' for index in range(7)])
+        self.assertEqual([item['body'] for item in outputs], [f'review {index}' for index in range(7)])
+
+    def test_csv_numbers_are_sent_as_numbers(self):
+        api = mock.Mock()
+        api.summarization.return_value = {}
+
+        call_endpoint(api, ENDPOINTS_BY_NAME['summarization'], {'text': 'Bu harika bir filmdi.', 'percentage': '0.5', 'word_count': '100'})
+        self.assertEqual(call_endpoint(api, ENDPOINTS_BY_NAME['next_character_prediction'], {'text': 'Bu', 'max_length': 'long'}),
+                         {'error': "Row has a 'max_length' field that is not a number: 'long'."})
+
+        api.summarization.assert_called_once_with(text='Bu harika bir filmdi.', percentage=0.5, word_count=100)
+
+    def test_base_url_leaves_config_alone(self):
+        source = self.write_jsonl('rows.jsonl', self.rows[:3])
+        output = os.path.join(self.directory, 'out.jsonl')
+        urls = dict(URL)
+
+        with mock.patch.dict(URL, {key: 'http://127.0.0.1:9/unused' for key in URL}):
+            main([source, '--output', output, '--base-url', self.server.base_url + '/'] + self.credentials)
+            self.assertEqual(set(URL.values()), {'http://127.0.0.1:9/unused'})
+
+        self.assertEqual(len(self.read_jsonl(output)), 3)
+        self.assertEqual(URL, urls)
+
+    def test_refused_connection_is_reported(self):
+        source = self.write_jsonl('rows.jsonl', [{'text': 'Bu'}])
+        output = os.path.join(self.directory, 'out.jsonl')
+        checkpoint = os.path.join(self.directory, 'out.checkpoint')
+
+        with mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            code = main([source, '--endpoint', 'next_character_prediction', '--base-url', 'http://127.0.0.1:9',
+                         '--output', output, '--checkpoint', checkpoint] + self.credentials)
+
+        self.assertEqual(code, 1)
+        self.assertIn('Run again with the same --checkpoint to resume.', stderr.getvalue())
+
+    def test_stdout_holds_only_json_lines(self):
+        source = self.write_jsonl('rows.jsonl', self.rows)
+        self.server.error_rate = 0.5
+        stdout = io.TextIOWrapper(io.BytesIO())
+
+        with mock.patch('sys.stdout', stdout), mock.patch('sys.stderr', new_callable=io.StringIO) as stderr, \
+                mock.patch('sumapi.api.RETRY_WAITS', (0,) * 20):
+            main([source, '--packet-size', '5'] + self.credentials)
+
+        stdout.flush()
+        lines = stdout.buffer.getvalue().decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)['row_id'] for line in lines], list(range(len(self.rows))))
+        self.assertIn('sleeping', stderr.getvalue())
+
+    def test_wrong_password_leaves_the_output_alone(self):
+        source = self.write_jsonl('rows.jsonl', self.rows)
+        output = os.path.join(self.directory, 'out.jsonl')
+        with open(output, 'w') as file:
+            file.write('earlier run\n')
+        wrong = ValueError('There is an error in the login information. Try again by checking your username and password.')
+
+        with mock.patch.object(SumAPI, '_get_token', side_effect=wrong), mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            code = main([source, '--output', output] + self.credentials)
+
+        self.assertEqual(code, 1)
+        self.assertIn('Could not log in: There is an error in the login information.', stderr.getvalue())
+        with open(output) as file:
+            self.assertEqual(file.read(), 'earlier run\n')
+
+    def test_missing_fields_are_reported_per_row(self):
+        source = self.write_jsonl('questions.jsonl', [{'question': 'Sait Faik nerede doğdu?'}])
+        output = os.path.join(self.directory, 'out.jsonl')
+
+        main([source, '--endpoint', 'question_answering', '--output', output] + self.credentials)
+
+        self.assertEqual(self.read_jsonl(output), [{'error': "Row has no 'context' field.", 'row_id': 0}])
+
+    def test_resume_from_checkpoint(self):
+        source = self.write_jsonl('rows.jsonl', self.rows)
+        output = os.path.join(self.directory, 'out.jsonl')
+        checkpoint = os.path.join(self.directory, 'out.checkpoint')
+        api = SumAPI(username='username', password='password')
+        with open(output, 'wb') as file:
+            run(api, iter(self.rows[:20]), file, packet_size=10, checkpoint=checkpoint)
+            file.write(b'{"body": "half written')
+        self.server.requests.clear()
+
+        main([source, '--output', output, '--checkpoint', checkpoint, '--packet-size', '10'] + self.credentials)
+
+        outputs = self.read_jsonl(output)
+        self.assertEqual([item['body'] for item in outputs], [row['body'] for row in self.rows])
+        self.assertEqual([item['row_id'] for item in outputs], list(range(len(self.rows))))
+        self.assertEqual(len([path for path, size in self.server.requests if path == '/arguments']), 4)
+        with open(checkpoint) as file:
+            self.assertEqual(json.load(file)['rows'], len(self.rows))
+
+    def test_checkpoint_needs_an_output_file(self):
+        source = self.write_jsonl('rows.jsonl', self.rows)
+        save_checkpoint(os.path.join(self.directory, 'out.checkpoint'), 0, 0)
+
+        with self.assertRaises(SystemExit), mock.patch('sys.stderr'):
+            main([source, '--checkpoint', os.path.join(self.directory, 'out.checkpoint')] + self.credentials)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+from sumapi.api import SumAPI, DeadlineExceeded
+from sumapi.config import URL, build_urls
+from sumapi.fake_server import FakeServerTestCase
+from unittest import mock
+import unittest
+import requests
+import time
+
+
+class TestDeadlines(FakeServerTestCase):
+    def setUp(self):
+        self.start_server(latency=lambda rows: 0.3)
+        self.api = SumAPI(username='username', password='password')
+
+    def test_single_call_deadline(self):
+        start = time.perf_counter()
+        with self.assertRaises(DeadlineExceeded):
+            self.api.sentiment_analysis('Bu harika bir filmdi.', deadline=0.1)
+        self.assertLess(time.perf_counter() - start, 0.25)
+
+    def test_single_call_read_timeout(self):
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            self.api.classification('Bu harika bir filmdi.', timeout=(1, 0.1))
+
+    def test_single_number_timeout_is_capped(self):
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            self.api.classification('Bu harika bir filmdi.', timeout=0.1, deadline=5)
+
+    def test_lazy_login_respects_deadline(self):
+        api = SumAPI(username='username', password='password', login='lazy')
+        login = self.server.login
+        self.server.login = lambda: time.sleep(0.5) or login()
+
+        start = time.perf_counter()
+        with self.assertRaises(DeadlineExceeded):
+            api.sentiment_analysis('Bu harika bir filmdi.', deadline=0.1)
+        self.assertLess(time.perf_counter() - start, 0.4)
+
+    def test_multi_request_marks_rows_past_the_deadline(self):
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(6)]
+
+        response = self.api.multi_request(data, packet_size=2, deadline=0.5)
+
+        evaluations = response['evaluations']
+        self.assertIn('evaluation', evaluations[0])
+        self.assertIn('error', evaluations[-1])
+
+    def test_retry_sleep_respects_deadline(self):
+        data = [{'body': 'row', 'model_name': 'sentiment', 'domain': 'general'}]
+        self.server.stop()
+
+        start = time.perf_counter()
+        with mock.patch.dict(URL, build_urls('http://127.0.0.1:9')):
+            response = self.api.multi_request(data, deadline=5)
+
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertIn('error', response['evaluations'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+from sumapi.api import SumAPI
+from sumapi.endpoints import ENDPOINTS, ENDPOINTS_BY_NAME
+from sumapi.fake_server import FakeServerTestCase
+import unittest
+import asyncio
+import inspect
+
+
+class TestEndpoints(FakeServerTestCase):
+    def setUp(self):
+        self.start_server()
+        self.api = SumAPI(username='username', password='password')
+
+    def test_builders_match_prepare_data(self):
+        cases = {
+            'sentiment_analysis': (('Bu harika bir filmdi.', 'general'), {'body': 'Bu harika bir filmdi.', 'domain': 'general'}),
+            'zero_shot_classification': (('Rezilsiniz.', 'talep,şikayet'), {'body': 'Rezilsiniz.', 'categories': 'talep,şikayet'}),
+            'question_answering': (('Sait Faik Adapazarı doğumlu.', 'Sait Faik nerede doğdu?'), {'context': 'Sait Faik Adapazarı doğumlu.', 'question': 'Sait Faik nerede doğdu?'}),
+            'next_character_prediction': (('Mustafa', 'sumgpt-small', 50), {'body': 'Mustafa', 'domain': 'sumgpt-small', 'max_length': 50}),
+        }
+        for name, (args, body) in cases.items():
+            self.assertEqual(ENDPOINTS_BY_NAME[name].build(*args), body)
+        self.assertEqual(ENDPOINTS_BY_NAME['summarization'].build('text', None, None, 'SumExtraction-TR'),
+                         self.api.prepare_data(body='text', domain='SumExtraction-TR'))
+
+    def test_optional_fields_left_out_when_none(self):
+        build = ENDPOINTS_BY_NAME['summarization'].build
+
+        self.assertEqual(build('text', 0.5, None, 'SumExtraction-TR'), {'body': 'text', 'domain': 'SumExtraction-TR', 'percentage': 0.5})
+        self.assertEqual(build('text', None, 100, 'SumExtraction-EN'), {'body': 'text', 'domain': 'SumExtraction-EN', 'sentence_count': 100})
+
+    def test_generated_signatures(self):
+        signature = inspect.signature(SumAPI.summarization)
+        self.assertEqual(list(signature.parameters), ['self', 'text', 'percentage', 'word_count', 'domain', 'timeout', 'deadline'])
+        self.assertEqual(signature.parameters['domain'].default, 'SumExtraction-TR')
+        self.assertIn('Summarization', SumAPI.summarization.__doc__)
+        for endpoint in ENDPOINTS:
+            self.assertTrue(inspect.iscoroutinefunction(getattr(SumAPI, f'{endpoint.name}_async')))
+        self.assertEqual(sorted(name for name in dir(SumAPI) if name.endswith('_batch') and not name.startswith('_')),
+                         ['classification_batch', 'named_entity_recognition_batch', 'sentiment_analysis_batch'])
+
+    def test_sync_async_and_batch(self):
+        async def gather():
+            return await asyncio.gather(*(self.api.sentiment_analysis_async(f'text {index}') for index in range(5)))
+
+        self.assertEqual(self.api.spell_check('bu hstali cumle')['body'], 'bu hstali cumle')
+        self.assertEqual([response['body'] for response in asyncio.run(gather())], [f'text {index}' for index in range(5)])
+        self.assertEqual([row['body'] for row in self.api.classification_batch(['a', 'b'], domain='finance')], ['a', 'b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+from sumapi.api import SumAPI
+from sumapi.fake_server import FakeServerTestCase, lognormal_latency
+import unittest
+import statistics
+import time
+
+
+class TestFakeServer(FakeServerTestCase):
+    def setUp(self):
+        # every test starts a server with options of its own
+        pass
+
+    def start(self, **options):
+        self.start_server(**options)
+        return SumAPI(username='username', password='password')
+
+    def test_every_endpoint_has_its_schema(self):
+        api = self.start()
+
+        self.assertEqual(set(api.question_answering('Sait Faik Adapazarı doğumlu.', 'Nerede doğdu?')['evaluation']), {'score', 'answer'})
+        self.assertEqual(set(api.zero_shot_classification('Rezilsiniz.', 'talep,şikayet')['evaluation']), {'sequence', 'labels', 'scores', 'label'})
+        self.assertEqual(api.summarization('Uzun bir metin.', percentage=0.5)['evaluation'], {'summarized_text': 'Uzun bir metin.'})
+        ner = api.analyze(['Mustafa Kemal'], models=['ner'])[0]['ner']
+        self.assertEqual(set(ner), {'text', 'labels'})
+
+    def test_token_ttl(self):
+        api = self.start(token_ttl=0.2)
+
+        api.spell_check('bir')
+        time.sleep(0.3)
+        api.spell_check('iki')
+
+        self.assertEqual(self.server.logins, 2)
+
+    def test_502_injection(self):
+        api = self.start(error_rate=1.0)
+
+        self.assertEqual(api.sentiment_analysis('Bu harika bir filmdi.'), {'detail': 'Bad Gateway'})
+
+    def test_payload_limits(self):
+        api = self.start(max_body_bytes=2000, max_rows=3)
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(4)]
+
+        self.assertEqual(api.spell_check('x' * 3000)['detail'], 'Request body is larger than 2000 bytes.')
+        evaluations = api.multi_request(data, progress=False)['evaluations']
+        self.assertTrue(all('evaluation' in evaluation for evaluation in evaluations))
+        self.assertEqual(len([path for path, size in self.server.requests if path == '/arguments']), 3)
+
+    def test_lognormal_latency(self):
+        latency = lognormal_latency(median=0.05, sigma=0.5, seed=1)
+        samples = [latency([{}]) for _ in range(2000)]
+
+        self.assertAlmostEqual(statistics.median(samples), 0.05, delta=0.005)
+        self.assertGreater(max(samples), 0.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+from sumapi.api import SumAPI
+from sumapi.fake_server import FakeServerTestCase
+from sumapi.hedging import Hedger
+import unittest
+import itertools
+import threading
+import time
+
+
+class TestHedging(FakeServerTestCase):
+    def setUp(self):
+        calls = itertools.count(1)
+        self.start_server(latency=lambda rows: 1.0 if next(calls) % 10 == 0 else 0.005)
+
+    def test_slow_requests_are_hedged(self):
+        hedger = Hedger(percentile=0.5, budget=0.5, min_samples=5)
+        api = SumAPI(username='username', password='password', hedge=hedger)
+
+        start = time.perf_counter()
+        for index in range(30):
+            self.assertEqual(api.sentiment_analysis(f'text {index}')['body'], f'text {index}')
+
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertGreater(hedger.hedged, 0)
+        self.assertLessEqual(hedger.hedged, 0.5 * hedger.requests)
+
+    def test_budget_caps_hedging(self):
+        hedger = Hedger(percentile=0.5, budget=0, min_samples=5)
+        api = SumAPI(username='username', password='password', hedge=hedger)
+
+        for index in range(12):
+            api.sentiment_analysis(f'text {index}')
+
+        self.assertEqual(hedger.hedged, 0)
+        self.assertEqual(len(self.server.requests), 13)
+
+    def test_unhedged_requests_run_on_the_calling_thread(self):
+        hedger = Hedger(percentile=0.5, budget=0, min_samples=5)
+        hedger.latencies.extend([0.01] * 5)
+        threads = []
+
+        for _ in range(3):
+            hedger.run(lambda attempt: threads.append(threading.current_thread()))
+
+        self.assertEqual(threads, [threading.current_thread()] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
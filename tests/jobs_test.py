@@ -0,0 +1,56 @@
+from sumapi.api import SumAPI
+from sumapi.config import URL
+from sumapi.fake_server import FakeServer
+from sumapi.jobs import JobQueue
+from multiprocessing import get_context
+from unittest import mock
+import unittest
+import tempfile
+import os
+
+
+def work(path, api):
+    return JobQueue(path).work(api)
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'jobs.db')
+        self.data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(95)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_expired_lease_is_claimed_again(self):
+        queue = JobQueue(self.path, lease_seconds=0)
+        queue.submit(self.data[:3], packet_size=3)
+
+        packet_id, lease, rows = queue.claim('dead worker')
+        retry_id, retry_lease, retry_rows = queue.claim('live worker')
+
+        self.assertEqual((packet_id, rows), (retry_id, retry_rows))
+        self.assertFalse(queue.complete(packet_id, lease, []))
+        self.assertTrue(queue.complete(retry_id, retry_lease, [{'row_id': 0}]))
+        self.assertFalse(queue.complete(retry_id, retry_lease, [{'row_id': 0}]))
+        self.assertIsNone(queue.claim('live worker'))
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+    def test_workers_in_several_processes(self):
+        queue = JobQueue(self.path)
+        self.assertEqual(queue.submit(self.data, packet_size=10), 10)
+
+        with FakeServer() as server, mock.patch.dict(URL, server.urls()):
+            api = SumAPI(username='username', password='password')
+            with get_context('fork').Pool(3) as pool:
+                completed = pool.starmap(work, [(self.path, api)] * 3)
+
+        self.assertEqual(sum(completed), 10)
+        self.assertEqual(queue.status(), {'pending': 0, 'leased': 0, 'done': 10})
+        evaluations = queue.results()['evaluations']
+        self.assertEqual([row['row_id'] for row in evaluations], list(range(95)))
+        self.assertEqual([row['body'] for row in evaluations], [row['body'] for row in self.data])
+
+
+if __name__ == '__main__':
+    unittest.main()
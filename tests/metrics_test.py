@@ -0,0 +1,75 @@
+from sumapi.api import SumAPI
+from sumapi.fake_server import FakeServerTestCase
+from sumapi.metrics import Metrics
+import unittest
+import pickle
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = Metrics()
+        for value in (0.001, 0.02, 0.02, 7):
+            metrics.observe('request_seconds', value, buckets=(0.01, 0.1, 1), endpoint='/ner')
+
+        sample = metrics.snapshot()['request_seconds'][0]
+        self.assertEqual(sample['endpoint'], '/ner')
+        self.assertEqual(sample['count'], 4)
+        self.assertAlmostEqual(sample['sum'], 7.041)
+        self.assertEqual(list(sample['buckets'].values()), [1, 3, 3, 4])
+
+    def test_prometheus_format(self):
+        metrics = Metrics()
+        metrics.inc('requests_total', endpoint='/ner', status='200')
+        metrics.inc('requests_total', endpoint='/ner', status='200')
+        metrics.observe('request_seconds', 0.5, buckets=(1,), endpoint='say "hi"')
+
+        text = metrics.prometheus()
+
+        self.assertIn('# TYPE sumapi_requests_total counter\n', text)
+        self.assertIn('sumapi_requests_total{endpoint="/ner",status="200"} 2\n', text)
+        self.assertIn('sumapi_request_seconds_bucket{endpoint="say \\"hi\\"",le="1"} 1\n', text)
+        self.assertIn('sumapi_request_seconds_bucket{endpoint="say \\"hi\\"",le="+Inf"} 1\n', text)
+        self.assertIn('sumapi_request_seconds_sum{endpoint="say \\"hi\\""} 0.5\n', text)
+
+    def test_pickle_keeps_values(self):
+        metrics = Metrics()
+        metrics.inc('token_refreshes_total')
+
+        copy = pickle.loads(pickle.dumps(metrics))
+        copy.inc('token_refreshes_total')
+
+        self.assertEqual(copy.snapshot()['token_refreshes_total'], [{'value': 2}])
+
+
+class TestClientMetrics(FakeServerTestCase):
+    def setUp(self):
+        self.start_server()
+        self.api = SumAPI(username='username', password='password')
+
+    def test_requests_bytes_and_refreshes(self):
+        self.api.sentiment_analysis('Bu harika bir filmdi.')
+        self.server.expire_tokens()
+        self.api.sentiment_analysis('Bu harika bir filmdi.')
+
+        snapshot = self.api.metrics.snapshot()
+        requests = {(sample['endpoint'], sample['status']): sample['value'] for sample in snapshot['requests_total']}
+        self.assertEqual(requests[('/sentiment-analysis', '200')], 2)
+        self.assertEqual(requests[('/sentiment-analysis', '401')], 1)
+        self.assertEqual(requests[('/token', '200')], 2)
+        self.assertEqual(snapshot['token_refreshes_total'], [{'value': 1}])
+        self.assertEqual(snapshot['retries_total'], [{'endpoint': '/sentiment-analysis', 'reason': 'token', 'value': 1}])
+        self.assertTrue(all(sample['value'] > 0 for sample in snapshot['sent_bytes_total']))
+        self.assertTrue(all(sample['value'] > 0 for sample in snapshot['received_bytes_total']))
+
+    def test_packet_sizes(self):
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(10)]
+
+        self.api.multi_request(data, packet_size=4, progress=False)
+
+        packet_rows = self.api.metrics.snapshot()['packet_rows'][0]
+        self.assertEqual(packet_rows['count'], 3)
+        self.assertEqual(packet_rows['sum'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
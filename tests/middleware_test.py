@@ -0,0 +1,63 @@
+from sumapi.api import SumAPI
+from sumapi.fake_server import FakeServerTestCase
+from sumapi.middleware import ResponseCache, chain
+import unittest
+
+
+class TestMiddleware(FakeServerTestCase):
+    def test_chain_order(self):
+        order = []
+
+        def layer(name):
+            def middleware(call, send):
+                order.append(name)
+                return send(call)
+            return middleware
+
+        send = chain([layer('outer'), layer('inner')], lambda call: order.append('send'))
+        send(None)
+
+        self.assertEqual(order, ['outer', 'inner', 'send'])
+
+    def test_every_request_goes_through(self):
+        calls = []
+
+        def record(call, send):
+            calls.append(call.endpoint)
+            return send(call)
+
+        api = SumAPI(username='username', password='password', middleware=[record])
+        api.sentiment_analysis('Bu harika bir filmdi.')
+        api.multi_request([{'body': 'row', 'model_name': 'sentiment', 'domain': 'general'}], progress=False)
+
+        self.assertEqual(calls, ['/token', '/sentiment-analysis', '/arguments'])
+
+    def test_response_cache(self):
+        api = SumAPI(username='username', password='password', middleware=[ResponseCache()])
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(4)]
+
+        first = api.sentiment_analysis('Bu harika bir filmdi.')
+        second = api.sentiment_analysis('Bu harika bir filmdi.')
+        api.multi_request(data, progress=False)
+        response = api.multi_request(data, progress=False)
+
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual([row['row_id'] for row in response['evaluations']], [0, 1, 2, 3])
+        self.assertEqual(len([path for path, size in self.server.requests if path != '/token']), 2)
+        hits = {sample['endpoint']: sample['value'] for sample in api.metrics.snapshot()['cache_hits_total']}
+        self.assertEqual(hits, {'/sentiment-analysis': 1, '/arguments': 1})
+
+    def test_response_cache_skips_errors(self):
+        api = SumAPI(username='username', password='password', middleware=[ResponseCache()])
+        self.server.expire_tokens()
+
+        api.sentiment_analysis('Bu harika bir filmdi.')
+        api.sentiment_analysis('Bu harika bir filmdi.')
+
+        self.assertEqual(self.server.logins, 2)
+        self.assertEqual(len([path for path, size in self.server.requests if path != '/token']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+from sumapi.api import SumAPI, packetize, encode_row
+from sumapi.config import URL
+from sumapi.fake_server import FakeServer
+from unittest import mock
+import unittest
+import requests
+import json
+from types import SimpleNamespace
+import pandas as pd
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.status_code = 200
+        self._json = {'evaluations': [{'body': row['body'], 'evaluation': {'label': 'positive'}} for row in json.loads(body)['argList']]}
+        self.request = SimpleNamespace(body=body)
+        self.content = json.dumps(self._json).encode()
+
+    def json(self):
+        return self._json
+
+
+class TestMultiRequest(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.object(SumAPI, '_get_token', return_value={'access_token': 'token', 'token_type': 'bearer'}):
+            self.api = SumAPI(username='username', password='password')
+
+    def test_packetize_row_limit(self):
+        packets = list(packetize(list(range(5)), [10] * 5, 2, 1000))
+        self.assertEqual(packets, [[0, 1], [2, 3], [4]])
+
+    def test_packetize_byte_limit(self):
+        packets = list(packetize(list(range(4)), [100, 100, 500, 10], 250, 300))
+        self.assertEqual(packets, [[0, 1], [2], [3]])
+
+    def test_packet_bodies_respect_byte_limit(self):
+        df = pd.DataFrame([{'body': 'x' * size, 'model_name': 'sentiment', 'domain': 'general'} for size in [10, 5000, 20, 3000, 10]])
+        bodies = []
+
+        def post(url, headers=None, data=None, timeout=None):
+            bodies.append(data)
+            return FakeResponse(data)
+
+        with mock.patch.object(self.api.session, 'post', side_effect=post):
+            response = self.api.multi_request(df, packet_size=250, max_packet_bytes=6000)
+
+        self.assertTrue(all(len(body) <= 6000 for body in bodies))
+        self.assertEqual([row['body'] for row in response['evaluations']], list(df['body']))
+
+    def test_oversized_row_is_flagged(self):
+        df = pd.DataFrame([{'body': 'x' * size, 'model_name': 'sentiment', 'domain': 'general'} for size in [10, 5000, 20]])
+        bodies = []
+
+        def post(url, headers=None, data=None, timeout=None):
+            bodies.append(data)
+            return FakeResponse(data)
+
+        with mock.patch.object(self.api.session, 'post', side_effect=post):
+            response = self.api.multi_request(df, max_row_bytes=1000)
+
+        self.assertEqual(len(bodies), 1)
+        self.assertEqual(len(json.loads(bodies[0])['argList']), 2)
+        self.assertIn('error', response['evaluations'][1])
+        self.assertEqual(response['evaluations'][2]['evaluation']['label'], 'positive')
+
+    def test_encode_row_size_is_bytes(self):
+        row = encode_row({'body': 'Bu güzel bir filmdi.'})
+        self.assertEqual(len(row), len(row.encode('utf-8')))
+
+    def test_sort_by_length_keeps_order(self):
+        df = pd.DataFrame([{'body': 'x' * size, 'model_name': 'sentiment', 'domain': 'general'} for size in [300, 1, 200, 2, 100, 3]])
+
+        with FakeServer() as server, mock.patch.dict(URL, server.urls()):
+            response = self.api.multi_request(df, packet_size=3, sort_by_length=True)
+            self.assertEqual(len(server.requests), 2)
+
+        self.assertEqual([row['body'] for row in response['evaluations']], list(df['body']))
+
+    def test_failed_packet_is_bisected(self):
+        df = pd.DataFrame([{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(16)])
+        reject = lambda row: 'Invalid row' if row['body'] == 'row 5' else None
+
+        with FakeServer(reject=reject) as server, mock.patch.dict(URL, server.urls()):
+            response = self.api.multi_request(df, packet_size=16)
+            self.assertEqual(len(server.requests), 9)
+
+        evaluations = response['evaluations']
+        self.assertEqual(evaluations[5], {'body': 'row 5', 'error': 'Server returned 422: Invalid row', 'row_id': 5})
+        self.assertTrue(all('evaluation' in row for index, row in enumerate(evaluations) if index != 5))
+
+    def test_server_wide_errors_are_retried_not_bisected(self):
+        rows = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(250)]
+        for status in (429, 503):
+            calls = []
+
+            def post(url, headers=None, data=None, timeout=None):
+                calls.append(data)
+                response = FakeResponse(data)
+                response.status_code = status
+                return response
+
+            with mock.patch.object(self.api.session, 'post', side_effect=post), mock.patch('sumapi.api.RETRY_WAITS', (0, 0)), \
+                    mock.patch('builtins.print'):
+                evaluations = self.api.multi_request(rows, packet_size=250)['evaluations']
+            self.assertEqual(len(calls), 3)
+            self.assertTrue(all('Error with Connection' in evaluation['error'] for evaluation in evaluations))
+
+    def test_packet_failing_every_retry_keeps_the_other_packets(self):
+        rows = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(20)]
+        rows[13]['body'] = 'poison'
+
+        def post(url, headers=None, data=None, timeout=None):
+            response = FakeResponse(data)
+            if b'poison' in data:
+                response.status_code = 500
+            return response
+
+        with mock.patch.object(self.api.session, 'post', side_effect=post), mock.patch('sumapi.api.RETRY_WAITS', (0,)), \
+                mock.patch('builtins.print'):
+            evaluations = self.api.multi_request(rows, packet_size=5, workers=2)['evaluations']
+
+        self.assertEqual([index for index, evaluation in enumerate(evaluations) if 'error' in evaluation], [10, 11, 12, 13, 14])
+        self.assertTrue(all(evaluation['evaluation']['label'] == 'positive' for evaluation in evaluations[:10] + evaluations[15:]))
+
+    def test_other_errors_are_given_to_every_row(self):
+        rows = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(8)]
+        calls = []
+
+        def post(url, headers=None, data=None, timeout=None):
+            calls.append(data)
+            response = FakeResponse(data)
+            response.status_code = 403
+            response._json = {'detail': 'Forbidden'}
+            return response
+
+        with mock.patch.object(self.api.session, 'post', side_effect=post):
+            evaluations = self.api.multi_request(rows, packet_size=8)['evaluations']
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([row['error'] for row in evaluations], ['Server returned 403: Forbidden'] * 8)
+
+    def test_row_ids_and_idempotency_keys(self):
+        df = pd.DataFrame([{'id': f'doc-{index}', 'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(4)])
+        calls = []
+
+        def post(url, headers=None, data=None, timeout=None):
+            calls.append((headers['Idempotency-Key'], data))
+            if len(calls) == 1:
+                raise requests.exceptions.ConnectionError()
+            return FakeResponse(data)
+
+        with mock.patch.object(self.api.session, 'post', side_effect=post), mock.patch('sumapi.api.time.sleep'):
+            response = self.api.multi_request(df, packet_size=2, id_column='id')
+
+        self.assertEqual(calls[0], calls[1])
+        self.assertNotEqual(calls[1][0], calls[2][0])
+        self.assertNotIn('id', json.loads(calls[0][1])['argList'][0])
+        self.assertEqual([row['row_id'] for row in response['evaluations']], list(df['id']))
+
+    def test_duplicate_row_ids(self):
+        df = pd.DataFrame([{'id': 1, 'body': 'a'}, {'id': 1, 'body': 'b'}])
+        with self.assertRaises(ValueError):
+            self.api.multi_request(df, id_column='id')
+
+    def test_batch_helper(self):
+        texts = [f'text {index}' for index in range(5)]
+
+        with FakeServer() as server, mock.patch.dict(URL, server.urls()):
+            evaluations = self.api.sentiment_analysis_batch(texts, packet_size=2)
+            self.assertEqual(len(server.requests), 3)
+
+        self.assertEqual([row['body'] for row in evaluations], texts)
+        self.assertEqual(evaluations[0]['evaluation']['label'], 'positive')
+
+    def test_analyze_joins_models_per_text(self):
+        texts = ['first text', 'second text', 'bad text']
+        reject = lambda row: 'Invalid row' if row['body'] == 'bad text' and row['model_name'] == 'ner' else None
+
+        with FakeServer(reject=reject) as server, mock.patch.dict(URL, server.urls()):
+            results = self.api.analyze(texts, models={'sentiment': 'general', 'ner': 'general'})
+
+        self.assertEqual([result['body'] for result in results], texts)
+        self.assertEqual(results[0]['sentiment']['label'], 'positive')
+        self.assertEqual(results[2]['ner'], {'error': 'Server returned 422: Invalid row'})
+        self.assertIn('label', results[2]['sentiment'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+from sumapi.pipeline import Pipeline, Stage
+from sumapi.api import SumAPI
+from sumapi.config import URL
+from sumapi.fake_server import FakeServer
+from unittest import mock
+import unittest
+import threading
+import time
+
+
+class TestPipeline(unittest.TestCase):
+    def test_items_keep_their_order_with_one_worker(self):
+        sunk = []
+        pipeline = Pipeline(range(500), [Stage('square', lambda item: item * item), Stage('sink', sunk.append)], queue_size=10)
+
+        self.assertEqual(pipeline.run(), 500)
+        self.assertEqual(sunk, [item * item for item in range(500)])
+
+    def test_batches_and_flatten(self):
+        batches = []
+        sunk = []
+
+        def send(items):
+            batches.append(len(items))
+            return [item + 1 for item in items]
+
+        pipeline = Pipeline(range(95), [Stage('send', send, batch_size=10, flatten=True), Stage('sink', sunk.append)])
+        pipeline.run()
+
+        self.assertEqual(batches, [10] * 9 + [5])
+        self.assertEqual(sunk, list(range(1, 96)))
+
+    def test_parallel_stage(self):
+        lock = threading.Lock()
+        sunk = []
+
+        def slow(item):
+            time.sleep(0.01)
+            return item
+
+        def sink(item):
+            with lock:
+                sunk.append(item)
+
+        start = time.perf_counter()
+        Pipeline(range(100), [Stage('slow', slow, workers=10), Stage('sink', sink, workers=2)]).run()
+
+        self.assertLess(time.perf_counter() - start, 0.8)
+        self.assertEqual(sorted(sunk), list(range(100)))
+
+    def test_backpressure_bounds_items_in_flight(self):
+        read = [0]
+        ahead = []
+
+        def source():
+            for item in range(300):
+                read[0] += 1
+                yield item
+
+        def sink(item):
+            time.sleep(0.001)
+            ahead.append(read[0] - item)
+
+        Pipeline(source(), [Stage('pass', lambda item: item, queue_size=5), Stage('sink', sink, queue_size=5)]).run()
+
+        # two queues of 5, an item in the hands of each worker and one in the reader's
+        self.assertLessEqual(max(ahead), 5 + 5 + 3)
+
+    def test_error_stops_every_stage(self):
+        def fail(item):
+            if item == 50:
+                raise ValueError('bad item')
+            return item
+
+        pipeline = Pipeline(range(10 ** 6), [Stage('fail', fail), Stage('sink', lambda item: time.sleep(0.001))], queue_size=5)
+        with self.assertRaises(ValueError):
+            pipeline.run()
+        self.assertLess(pipeline.stats()[0]['items'], 100)
+
+    def test_stats_point_at_the_slowest_stage(self):
+        pipeline = Pipeline(range(50), [
+            Stage('fast', lambda item: item),
+            Stage('slow', lambda item: time.sleep(0.005)),
+        ], queue_size=5)
+        pipeline.run()
+
+        stats = {stage['stage']: stage for stage in pipeline.stats()}
+        self.assertEqual([stage['items'] for stage in stats.values()], [50, 50, 50])
+        self.assertGreater(stats['slow']['utilization'], 0.8)
+        self.assertGreater(stats['slow']['queue_depth'], stats['fast']['queue_depth'])
+        self.assertGreater(stats['fast']['blocked'], 0.5)
+        self.assertIn('slow', [line for line in pipeline.report().splitlines() if 'bottleneck' in line][0])
+
+        snapshot = pipeline.metrics.snapshot()
+        self.assertEqual({sample['stage']: sample['value'] for sample in snapshot['pipeline_items_total']}, {'read': 50, 'fast': 50, 'slow': 50})
+        self.assertEqual({sample['stage'] for sample in snapshot['pipeline_queue_depth']}, {'fast', 'slow'})
+
+    def test_multi_request_stage(self):
+        rows = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(230)]
+        evaluations = []
+        with FakeServer() as server, mock.patch.dict(URL, server.urls()):
+            api = SumAPI(username='username', password='password', pool_size=4)
+            send = lambda batch: api.multi_request(batch, packet_size=len(batch), progress=False)['evaluations']
+            Pipeline(rows, [Stage('send', send, workers=4, batch_size=50, flatten=True), Stage('sink', evaluations.append)]).run()
+
+        self.assertEqual(sorted(evaluation['body'] for evaluation in evaluations), sorted(row['body'] for row in rows))
+        self.assertEqual(len([path for path, size in server.requests if path == '/arguments']), 5)
+
+    def test_needs_a_stage(self):
+        with self.assertRaises(ValueError):
+            Pipeline(range(3), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
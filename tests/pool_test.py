@@ -0,0 +1,117 @@
+from sumapi.fake_server import FakeServerTestCase
+from sumapi.pool import SumAPIPool
+from unittest import mock
+import unittest
+import requests
+from types import SimpleNamespace
+
+
+class TestSumAPIPool(FakeServerTestCase):
+    def setUp(self):
+        self.start_server(latency=lambda rows: 0.01)
+        self.api = SumAPIPool([('first', 'password'), ('second', 'password', 3)])
+
+    def test_weighted_least_outstanding(self):
+        picks = [self.api._acquire() for _ in range(8)]
+
+        self.assertEqual(picks.count(0), 2)
+        self.assertEqual(picks.count(1), 6)
+
+    def test_input_errors_do_not_fail_the_account(self):
+        self.server.max_body_bytes = 200
+
+        response = self.api.sentiment_analysis('Bu harika bir filmdi. ' * 20)
+
+        self.assertIn('larger than 200 bytes', response['detail'])
+        self.assertEqual(len([path for path, size in self.server.requests if path != '/token']), 1)
+        self.assertEqual(self.api.blocked_until, [0.0, 0.0])
+        self.assertEqual(self.api.outstanding, [0, 0])
+
+    def test_throttled_account_is_skipped(self):
+        throttled = SimpleNamespace(status_code=429, json=lambda: {'detail': 'Too Many Requests'})
+        # the second account has the larger weight, so it is picked first
+        self.api.clients[1]._send_any = lambda *args, **kwargs: throttled
+
+        self.assertEqual(self.api.sentiment_analysis('Bu harika bir filmdi.')['body'], 'Bu harika bir filmdi.')
+        self.assertGreater(self.api.blocked_until[1], 0)
+        self.assertEqual(self.api.outstanding, [0, 0])
+
+    def test_connection_error_fails_over_and_releases(self):
+        def refuse(*args, **kwargs):
+            raise requests.exceptions.ConnectionError('Connection refused')
+        # the second account has the larger weight, so it is picked first
+        self.api.clients[1]._send_now = refuse
+
+        for _ in range(3):
+            self.assertEqual(self.api.sentiment_analysis('Bu harika bir filmdi.')['body'], 'Bu harika bir filmdi.')
+        self.assertEqual(self.api.outstanding, [0, 0])
+        self.assertGreater(self.api.blocked_until[1], 0)
+
+    def test_passed_deadline_releases(self):
+        with mock.patch('sumapi.deadline.time.monotonic', side_effect=[0, 10, 10, 10, 10]):
+            with self.assertRaises(TimeoutError):
+                self.api.sentiment_analysis('Bu harika bir filmdi.', deadline=1)
+        self.assertEqual(self.api.outstanding, [0, 0])
+
+    def test_unavailable_account_gives_its_packet_to_the_next(self):
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(5)]
+        sent = []
+        self.api.clients[1]._send = lambda *args, **kwargs: sent.append(1) or SimpleNamespace(status_code=502)
+
+        with mock.patch('sumapi.deadline.Deadline.sleep') as sleep:
+            response = self.api.multi_request(data, packet_size=5)
+
+        self.assertEqual([row['body'] for row in response['evaluations']], [row['body'] for row in data])
+        self.assertEqual(sent, [1])
+        sleep.assert_not_called()
+
+    def test_backs_off_once_every_account_has_failed(self):
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(5)]
+        for client in self.api.clients:
+            client._send = lambda *args, **kwargs: SimpleNamespace(status_code=503)
+
+        with mock.patch('sumapi.pool.RETRY_WAITS', (1,)), mock.patch('sumapi.deadline.Deadline.sleep') as sleep, \
+                mock.patch('builtins.print'):
+            evaluations = self.api.multi_request(data, packet_size=5)['evaluations']
+
+        self.assertTrue(all('error' in evaluation for evaluation in evaluations))
+        sleep.assert_called_once_with(1)
+        self.assertEqual(self.api.outstanding, [0, 0])
+
+    def test_multi_request_packets_use_every_account(self):
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(40)]
+        used = []
+        for index, client in enumerate(self.api.clients):
+            post_packet = client._post_packet
+            client._post_packet = lambda *args, index=index, post_packet=post_packet, **kwargs: used.append(index) or post_packet(*args, **kwargs)
+
+        response = self.api.multi_request(data, packet_size=5, workers=4)
+
+        self.assertEqual([row['body'] for row in response['evaluations']], [row['body'] for row in data])
+        self.assertEqual(set(used), {0, 1})
+        self.assertEqual(self.server.logins, 2)
+
+    def test_shared_surface(self):
+        api = SumAPIPool([('first', 'password'), ('second', 'password')], hedge=True, login='lazy')
+        seen = []
+        api.add_middleware(lambda call, send: seen.append(call.key) or send(call))
+
+        self.assertEqual(api.sentiment_analysis('Bu harika bir filmdi.')['body'], 'Bu harika bir filmdi.')
+        self.assertEqual(seen, ['tokenURL', 'sentimentURL'])
+        self.assertTrue(all(len(client.middleware) == 1 for client in api.clients))
+        self.assertEqual({id(client.hedger) for client in api.clients}, {id(api.hedger)})
+        with self.assertRaisesRegex(AttributeError, 'clients'):
+            api.token
+
+    def test_timeout_check_renews_the_account_of_the_headers(self):
+        stale = self.api.clients[1].headers
+        first = self.api.clients[0].headers
+
+        self.assertTrue(self.api.timeout_check({'detail': 'Could not validate credentials'}, stale))
+        self.assertIsNot(self.api.clients[1].headers, stale)
+        self.assertIs(self.api.clients[0].headers, first)
+        self.assertFalse(self.api.timeout_check({'body': 'Bu harika bir filmdi.'}, first))
+
+
+if __name__ == '__main__':
+    unittest.main()
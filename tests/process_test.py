@@ -0,0 +1,69 @@
+from sumapi.api import SumAPI
+from sumapi.fake_server import FakeServerTestCase
+from sumapi.bulk import bulk_request
+from multiprocessing import get_context
+import unittest
+import tempfile
+import pickle
+import json
+import os
+import pandas as pd
+
+
+def classify(api, text):
+    return api.sentiment_analysis(text)['body']
+
+
+class TestProcesses(FakeServerTestCase):
+    def setUp(self):
+        self.start_server()
+        self.api = SumAPI(username='username', password='password')
+        self.api.sentiment_analysis('warm up the connection pool')
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+    def test_fork_gets_new_pool_and_keeps_token(self):
+        parent_session = self.api.session
+        pid = os.fork()
+        if pid == 0:
+            ok = self.api.session is not parent_session and self.api.sentiment_analysis('child')['body'] == 'child'
+            os._exit(0 if ok else 1)
+
+        self.assertEqual(os.waitpid(pid, 0)[1], 0)
+        self.assertEqual(self.server.logins, 1)
+
+    def test_pickle_keeps_token(self):
+        api = pickle.loads(pickle.dumps(self.api))
+
+        self.assertEqual(api.headers, self.api.headers)
+        self.assertIsNot(api.session, self.api.session)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+    def test_pool_workers_do_not_log_in(self):
+        with get_context('fork').Pool(4) as pool:
+            bodies = pool.starmap(classify, [(self.api, f'text {index}') for index in range(20)])
+
+        self.assertEqual(bodies, [f'text {index}' for index in range(20)])
+        self.assertEqual(self.server.logins, 1)
+
+    def test_bulk_request_keeps_input_order(self):
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(200)]
+
+        response = bulk_request(self.api, data, processes=3, shard_size=30, packet_size=7)
+
+        self.assertEqual([row['body'] for row in response['evaluations']], [row['body'] for row in data])
+        self.assertEqual([row['row_id'] for row in response['evaluations']], list(range(200)))
+        self.assertEqual(self.server.logins, 1)
+
+    def test_bulk_request_to_file(self):
+        df = pd.DataFrame([{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(50)], index=range(100, 150))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = bulk_request(self.api, df, processes=2, output=os.path.join(directory, 'out.jsonl'))
+            with open(path) as lines:
+                evaluations = [json.loads(line) for line in lines]
+
+        self.assertEqual([row['row_id'] for row in evaluations], list(range(100, 150)))
+
+
+if __name__ == '__main__':
+    unittest.main()
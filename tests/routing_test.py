@@ -0,0 +1,54 @@
+from sumapi.api import SumAPI
+from sumapi.fake_server import FakeServer
+from sumapi.routing import Router
+import unittest
+
+
+class TestRouting(unittest.TestCase):
+    def setUp(self):
+        self.slow = FakeServer(latency=lambda rows: 0.05).start()
+        self.fast = FakeServer().start()
+        self.router = Router([self.slow.base_url, self.fast.base_url], probe_interval=0)
+
+    def tearDown(self):
+        self.slow.stop()
+        self.fast.stop()
+
+    def test_requests_move_to_the_fastest_host(self):
+        self.router.observe(self.slow.base_url, 0.05)
+        api = SumAPI(username='username', password='password', base_urls=self.router)
+        for _ in range(10):
+            api.sentiment_analysis('Bu harika bir filmdi.')
+
+        self.assertEqual(len(self.slow.requests), 0)
+        self.assertEqual(len(self.fast.requests), 11)
+
+    def test_failover_on_connection_error(self):
+        api = SumAPI(username='username', password='password', base_urls=self.router)
+        self.router.observe(self.fast.base_url, 0.001)
+        self.router.observe(self.slow.base_url, 0.05)
+        self.fast.stop()
+
+        response = api.multi_request([{'body': 'Bu harika bir filmdi.', 'model_name': 'sentiment', 'domain': 'general'}])
+
+        self.assertEqual(response['evaluations'][0]['evaluation']['label'], 'positive')
+        self.assertEqual(self.router.order()[0], self.slow.base_url)
+
+    def test_latency_is_kept_per_endpoint(self):
+        self.router.observe(self.slow.base_url, 0.01, 'sentimentURL')
+        self.router.observe(self.fast.base_url, 0.02, 'sentimentURL')
+        for _ in range(5):
+            self.router.observe(self.slow.base_url, 2.0, 'multirequestURL')
+
+        self.assertEqual(self.router.order('sentimentURL')[0], self.slow.base_url)
+        self.assertEqual(self.router.order('multirequestURL')[0], self.fast.base_url)
+
+    def test_probe_updates_latency(self):
+        self.router.probe()
+
+        self.assertIsNotNone(self.router.latency[self.slow.base_url])
+        self.assertIsNotNone(self.router.latency[self.fast.base_url])
+
+
+if __name__ == '__main__':
+    unittest.main()
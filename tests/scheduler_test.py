@@ -0,0 +1,93 @@
+from sumapi.api import SumAPI, DeadlineExceeded
+from sumapi.fake_server import FakeServerTestCase
+from sumapi.scheduler import Scheduler, INTERACTIVE, BULK
+import unittest
+import threading
+import time
+
+
+class TestScheduler(unittest.TestCase):
+    def queue_behind_one_slot(self, scheduler, priorities):
+        """
+            Holds the only slot, queues one waiter per priority, frees the slot and returns the order they ran in.
+        """
+        order = []
+        scheduler.acquire()
+
+        def wait(index, priority):
+            with scheduler.slot(priority):
+                order.append(index)
+
+        threads = []
+        for index, priority in enumerate(priorities):
+            threads.append(threading.Thread(target=wait, args=(index, priority)))
+            threads[-1].start()
+            while len(scheduler._queue) <= index:
+                time.sleep(0.001)
+        scheduler.release()
+        for thread in threads:
+            thread.join()
+        return order
+
+    def test_interactive_goes_first(self):
+        order = self.queue_behind_one_slot(Scheduler(slots=1), [BULK, BULK, BULK, INTERACTIVE])
+        self.assertEqual(order, [3, 0, 1, 2])
+
+    def test_weighted_fair_queueing(self):
+        priorities = ['nightly'] * 8 + ['backfill'] * 8
+        order = self.queue_behind_one_slot(Scheduler(slots=1, weights={'nightly': 3}), priorities)
+
+        first_eight = [priorities[index] for index in order[:8]]
+        self.assertEqual(first_eight.count('nightly'), 6)
+
+    def test_rate_limit(self):
+        scheduler = Scheduler(slots=10, rate=20, burst=1)
+
+        start = time.perf_counter()
+        for _ in range(6):
+            with scheduler.slot(BULK):
+                pass
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.24)
+
+    def test_timeout(self):
+        scheduler = Scheduler(slots=1)
+        scheduler.acquire()
+
+        with self.assertRaises(DeadlineExceeded):
+            scheduler.acquire(BULK, timeout=0.05)
+        self.assertEqual(scheduler._queue, [])
+
+
+class TestSchedulerClient(FakeServerTestCase):
+    def setUp(self):
+        self.start_server(latency=lambda rows: 0.05)
+        self.api = SumAPI(username='username', password='password', scheduler=Scheduler(slots=2))
+
+    def test_interactive_call_during_multi_request(self):
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(40)]
+        thread = threading.Thread(target=self.api.multi_request, args=(data,), kwargs={'packet_size': 1, 'workers': 8, 'progress': False})
+        thread.start()
+        time.sleep(0.2)
+
+        start = time.perf_counter()
+        response = self.api.sentiment_analysis('Bu harika bir filmdi.')
+        elapsed = time.perf_counter() - start
+        thread.join()
+
+        self.assertEqual(response['body'], 'Bu harika bir filmdi.')
+        self.assertLess(elapsed, 0.2)
+
+    def test_deadline_covers_the_wait(self):
+        self.api.scheduler.acquire()
+        self.api.scheduler.acquire()
+        try:
+            with self.assertRaises(DeadlineExceeded):
+                self.api.sentiment_analysis('Bu harika bir filmdi.', deadline=0.1)
+        finally:
+            self.api.scheduler.release()
+            self.api.scheduler.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
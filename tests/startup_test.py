@@ -0,0 +1,61 @@
+from sumapi.api import SumAPI
+from sumapi.fake_server import FakeServerTestCase
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import unittest
+import subprocess
+import json
+import time
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStartup(FakeServerTestCase):
+    def test_import_and_lazy_client_load_no_heavy_modules(self):
+        program = ("import sys, json; import sumapi.api; sumapi.api.SumAPI('username', 'password', login='lazy'); "
+                   "print(json.dumps([name for name in ('requests', 'tqdm', 'asyncio', 'concurrent.futures') if name in sys.modules]))")
+        environment = dict(os.environ, PYTHONPATH=ROOT)
+        output = subprocess.run([sys.executable, '-c', program], capture_output=True, text=True, env=environment, check=True).stdout
+        self.assertEqual(json.loads(output), [])
+
+    def test_lazy_login_on_first_request(self):
+        api = SumAPI(username='username', password='password', login='lazy')
+        self.assertEqual(self.server.requests, [])
+
+        self.assertEqual(api.sentiment_analysis('Bu harika bir filmdi.')['body'], 'Bu harika bir filmdi.')
+        self.assertEqual(self.server.logins, 1)
+
+    def test_concurrent_first_requests_log_in_once(self):
+        api = SumAPI(username='username', password='password', login='lazy', pool_size=8)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            bodies = list(executor.map(lambda index: api.sentiment_analysis(f'row {index}')['body'], range(32)))
+
+        self.assertEqual(bodies, [f'row {index}' for index in range(32)])
+        self.assertEqual(self.server.logins, 1)
+
+    def test_background_login(self):
+        api = SumAPI(username='username', password='password', login='background')
+        deadline = time.monotonic() + 5
+        while self.server.logins == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(api.sentiment_analysis('Bu harika bir filmdi.')['body'], 'Bu harika bir filmdi.')
+        self.assertEqual(self.server.logins, 1)
+
+    def test_failed_lazy_login_is_raised_by_the_first_request_and_retried(self):
+        token = {'access_token': 'fake-token-1', 'token_type': 'bearer'}
+        with mock.patch.object(SumAPI, '_get_token', side_effect=[ValueError('There is an error in the login information.'), token]):
+            api = SumAPI(username='username', password='wrong', login='lazy')
+            with self.assertRaises(ValueError):
+                api.sentiment_analysis('Bu harika bir filmdi.')
+            self.assertEqual(api.token, 'fake-token-1')
+
+    def test_unknown_login_mode(self):
+        with self.assertRaises(ValueError):
+            SumAPI(username='username', password='password', login='later')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+from sumapi.api import SumAPI
+from sumapi.fake_server import FakeServerTestCase
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+import threading
+
+
+class TestSharedInstance(FakeServerTestCase):
+    def setUp(self):
+        self.start_server(latency=lambda rows: 0.001)
+        self.api = SumAPI(username='username', password='password', pool_size=64)
+
+    def test_64_threads_share_one_instance(self):
+        # Tokens expire while no request is in flight, so a retry never meets a second expiry.
+        expire = threading.Barrier(64, action=self.server.expire_tokens)
+
+        def work(thread):
+            responses = []
+            for call in range(20):
+                responses.append(self.api.sentiment_analysis(f'thread {thread} call {call}'))
+                if call in (4, 9, 14):
+                    expire.wait()
+            return responses
+
+        with ThreadPoolExecutor(max_workers=64) as executor:
+            responses = list(executor.map(work, range(64)))
+
+        for thread, calls in enumerate(responses):
+            self.assertEqual([response['body'] for response in calls], [f'thread {thread} call {call}' for call in range(20)])
+        self.assertEqual(self.server.logins, 4)
+
+    def test_concurrent_multi_request_keeps_order(self):
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(100)]
+        self.server.expire_tokens()
+
+        response = self.api.multi_request(data, packet_size=5, workers=8)
+
+        self.assertEqual([row['body'] for row in response['evaluations']], [row['body'] for row in data])
+        self.assertEqual([row['row_id'] for row in response['evaluations']], list(range(100)))
+        self.assertEqual(self.server.logins, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
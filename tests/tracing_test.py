@@ -0,0 +1,49 @@
+from sumapi.api import SumAPI
+from sumapi.fake_server import FakeServerTestCase
+import unittest
+import tempfile
+import json
+import os
+
+
+class TestTracer(FakeServerTestCase):
+    def setUp(self):
+        self.start_server(latency=lambda rows: 0.02)
+        self.api = SumAPI(username='username', password='password', trace=True)
+
+    def test_off_by_default(self):
+        api = SumAPI(username='username', password='password')
+        api.sentiment_analysis('Bu harika bir filmdi.')
+        self.assertIsNone(api.tracer)
+
+    def test_single_call_phases(self):
+        self.api.sentiment_analysis('Bu harika bir filmdi.')
+
+        names = [event['name'] for event in self.api.tracer.events]
+        for name in ('call', 'wait', 'download', 'decode'):
+            self.assertIn(name, names)
+        wait = [event for event in self.api.tracer.events if event['name'] == 'wait'][-1]
+        self.assertGreaterEqual(wait['dur'], 20000)
+        self.assertEqual(wait['args']['endpoint'], '/sentiment-analysis')
+
+    def test_multi_request_phases_and_export(self):
+        data = [{'body': f'row {index}', 'model_name': 'sentiment', 'domain': 'general'} for index in range(10)]
+
+        self.api.multi_request(data, packet_size=5, workers=2, progress=False)
+
+        summary = self.api.tracer.summary()
+        self.assertEqual(summary['prepare']['count'], 1)
+        self.assertEqual(summary['encode']['count'], 3)
+        self.assertEqual(summary['decode']['count'], 2)
+        self.assertEqual(next(iter(summary)), 'wait')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            self.api.tracer.save(path)
+            with open(path) as file:
+                trace = json.load(file)
+        self.assertTrue(all(event['ph'] == 'X' and event['dur'] >= 0 for event in trace['traceEvents']))
+
+
+if __name__ == '__main__':
+    unittest.main()